@@ -2,167 +2,256 @@
 生成台灣餐廳美食本地數據
 =======================
 生成台北、台中、台南、高雄各地區餐廳的模擬數據
+
+每一欄都以整批陣列抽樣（評分、評論數、價格區間、平均消費、標籤、店名），
+分批寫入 CSV，數百萬家餐廳也只需數秒。分布與原本逐筆生成的版本相同。
+
+使用方式：
+    python generate_local_data.py                        # 每個城市 50 家（範例數據）
+    python generate_local_data.py --per-city 250000      # 共 100 萬家，負載測試用
+    python generate_local_data.py --per-city 250000 --output data/restaurants_large.csv
 """
 
-import pandas as pd
-import numpy as np
+import argparse
 import os
 
-np.random.seed(42)
-
-# 餐廳類型列表
-CUISINE_TYPES = [
-    '台式料理', '日式料理', '義式料理', '美式料理',
-    '中式料理', '韓式料理', '泰式料理', '咖啡廳',
-    '火鍋', '燒烤', '小吃', '甜點店'
-]
-
-# 價格區間
-PRICE_RANGES = ['平價', '中價位', '高價位']
-
-# 城市
-CITIES = ['台北', '台中', '台南', '高雄']
-
-def generate_restaurant_name(cuisine_type, index):
-    """生成餐廳名稱"""
-    prefixes = ['老', '阿', '小', '大', '正宗', '道地', '美味', '香濃']
-    suffixes = ['餐廳', '食堂', '館', '屋', '小館', '料理']
-
-    if cuisine_type == '咖啡廳':
-        names = ['星巴克', 'Cafe', 'Coffee', '咖啡館', '咖啡廳', 'Brew']
-        return f"{np.random.choice(names)}{index}"
-    elif cuisine_type == '小吃':
-        names = ['夜市', '老店', '名店', '傳統', '古早味']
-        return f"{np.random.choice(names)}{cuisine_type}{index}"
-    elif cuisine_type == '甜點店':
-        names = ['甜心', '夢幻', '蜜糖', '香甜', '烘焙']
-        return f"{np.random.choice(names)}{cuisine_type}{index}"
-    else:
-        prefix = np.random.choice(prefixes)
-        suffix = np.random.choice(suffixes)
-        return f"{prefix}{cuisine_type}{suffix}{index}"
-
-def generate_restaurants_for_city(city, num_restaurants=50):
-    """為單一城市生成餐廳數據"""
-    print(f"正在生成 {city} 的餐廳數據...")
-
-    restaurants = []
-
-    for i in range(num_restaurants):
-        # 隨機選擇餐廳類型
-        cuisine_type = np.random.choice(CUISINE_TYPES)
-
-        # 生成餐廳名稱
-        name = generate_restaurant_name(cuisine_type, i+1)
-
-        # 生成評分（1.0 - 5.0，偏向高分）
-        # 使用 beta 分佈讓評分更真實（大多數餐廳在 3.5-4.5 之間）
-        rating_base = np.random.beta(8, 2) * 4 + 1  # 偏向高分
-        rating = round(rating_base, 1)
-        rating = np.clip(rating, 1.0, 5.0)
-
-        # 生成評論數（10-1000）
-        # 評分高的餐廳通常評論數也多
-        review_count_base = int(np.random.exponential(100))
-        review_count = min(review_count_base + int((rating - 1) * 50), 1000)
-        review_count = max(review_count, 10)
-
-        # 根據餐廳類型決定價格區間
-        if cuisine_type in ['小吃', '台式料理']:
-            price_range = np.random.choice(PRICE_RANGES, p=[0.7, 0.25, 0.05])
-        elif cuisine_type in ['日式料理', '義式料理', '韓式料理']:
-            price_range = np.random.choice(PRICE_RANGES, p=[0.2, 0.5, 0.3])
-        elif cuisine_type in ['火鍋', '燒烤']:
-            price_range = np.random.choice(PRICE_RANGES, p=[0.3, 0.5, 0.2])
+import numpy as np
+import pandas as pd
+
+from restaurant_schema import CITIES, CUISINE_TYPES, PRICE_RANGES
+
+SEED = 42
+PER_CITY = 50                  # 每個城市的餐廳數
+CHUNK_SIZE = 200_000           # 每批生成並寫入的筆數
+OUTPUT_FILE = 'data/restaurants.csv'
+
+# 店名用字
+PREFIXES = ['老', '阿', '小', '大', '正宗', '道地', '美味', '香濃']
+SUFFIXES = ['餐廳', '食堂', '館', '屋', '小館', '料理']
+CAFE_NAMES = ['星巴克', 'Cafe', 'Coffee', '咖啡館', '咖啡廳', 'Brew']
+SNACK_NAMES = ['夜市', '老店', '名店', '傳統', '古早味']
+DESSERT_NAMES = ['甜心', '夢幻', '蜜糖', '香甜', '烘焙']
+
+# 根據餐廳類型決定價格區間機率（平價、中價位、高價位）
+PRICE_PROBABILITIES = {
+    '小吃': [0.7, 0.25, 0.05],
+    '台式料理': [0.7, 0.25, 0.05],
+    '日式料理': [0.2, 0.5, 0.3],
+    '義式料理': [0.2, 0.5, 0.3],
+    '韓式料理': [0.2, 0.5, 0.3],
+    '火鍋': [0.3, 0.5, 0.2],
+    '燒烤': [0.3, 0.5, 0.2],
+}
+DEFAULT_PRICE_PROBABILITY = [0.4, 0.4, 0.2]
+
+# 各價格區間的平均消費：(平均, 標準差, 下限, 上限)
+PRICE_LEVELS = [(150, 30, 80, 250), (400, 80, 250, 700), (800, 150, 700, 1500)]
+
+# 各城市市中心（緯度, 經度）；餐廳位置以市中心為圓心常態分布，
+# 七成集中在市區（標準差約 2 公里），三成分散在郊區（約 6 公里）
+CITY_CENTERS = {
+    '台北': (25.0418, 121.5436),
+    '台中': (24.1477, 120.6736),
+    '台南': (22.9908, 120.2133),
+    '高雄': (22.6273, 120.3014),
+}
+LOCATION_SPREAD = [(0.7, 0.02), (0.3, 0.06)]     # (比例, 標準差（度）)
+
+
+def _name_stems():
+    """
+    每種餐廳類型所有可能的店名（不含編號）
+
+    Returns:
+        (店名陣列, 各類型的起始位置, 各類型的店名數)；同一類型的店名機率相同，
+        等同分別隨機選字首與字尾
+    """
+    stems, offsets, counts = [], [], []
+    for cuisine in CUISINE_TYPES:
+        if cuisine == '咖啡廳':
+            names = CAFE_NAMES
+        elif cuisine == '小吃':
+            names = [f'{name}{cuisine}' for name in SNACK_NAMES]
+        elif cuisine == '甜點店':
+            names = [f'{name}{cuisine}' for name in DESSERT_NAMES]
         else:
-            price_range = np.random.choice(PRICE_RANGES, p=[0.4, 0.4, 0.2])
-
-        # 計算平均消費（元）
-        if price_range == '平價':
-            avg_price = int(np.random.normal(150, 30))
-            avg_price = np.clip(avg_price, 80, 250)
-        elif price_range == '中價位':
-            avg_price = int(np.random.normal(400, 80))
-            avg_price = np.clip(avg_price, 250, 700)
-        else:  # 高價位
-            avg_price = int(np.random.normal(800, 150))
-            avg_price = np.clip(avg_price, 700, 1500)
-
-        # 生成特色標籤
-        tags = []
-        if rating >= 4.5:
-            tags.append('高評價')
-        if review_count > 500:
-            tags.append('超人氣')
-        if price_range == '平價':
-            tags.append('平價美食')
-        if cuisine_type in ['台式料理', '小吃']:
-            tags.append('在地美食')
-
-        restaurants.append({
-            'Restaurant_Name': name,
-            'City': city,
-            'Cuisine_Type': cuisine_type,
-            'Rating': rating,
-            'Review_Count': review_count,
-            'Price_Range': price_range,
-            'Avg_Price': avg_price,
-            'Tags': ', '.join(tags) if tags else '無'
-        })
-
-    return restaurants
-
-print("="*60)
-print("台灣餐廳美食數據生成工具")
-print("="*60)
-
-# 生成所有城市的餐廳數據
-all_restaurants = []
-
-for city in CITIES:
-    city_restaurants = generate_restaurants_for_city(city, num_restaurants=50)
-    all_restaurants.extend(city_restaurants)
-
-# 建立 DataFrame
-df = pd.DataFrame(all_restaurants)
-
-# 建立 data 資料夾
-os.makedirs('data', exist_ok=True)
-
-# 儲存數據
-df.to_csv('data/restaurants.csv', index=False, encoding='utf-8-sig')
-
-print(f"\n[OK] 已儲存: data/restaurants.csv")
-print(f"  - 總餐廳數: {len(df)} 家")
-print(f"  - 城市數: {df['City'].nunique()} 個")
-print(f"  - 餐廳類型: {df['Cuisine_Type'].nunique()} 種")
-print()
-
-# 顯示統計摘要
-print("="*60)
-print("數據統計摘要")
-print("="*60)
-
-print("\n各城市餐廳數：")
-for city in CITIES:
-    count = len(df[df['City'] == city])
-    print(f"  {city}: {count} 家")
-
-print("\n餐廳類型分布（前5名）：")
-cuisine_counts = df['Cuisine_Type'].value_counts().head(5)
-for cuisine, count in cuisine_counts.items():
-    print(f"  {cuisine}: {count} 家")
-
-print("\n價格區間分布：")
-for price_range in PRICE_RANGES:
-    count = len(df[df['Price_Range'] == price_range])
-    percentage = count / len(df) * 100
-    print(f"  {price_range}: {count} 家 ({percentage:.1f}%)")
-
-print(f"\n平均評分: {df['Rating'].mean():.2f} 星")
-print(f"平均消費: ${df['Avg_Price'].mean():.0f} 元")
-
-print("\n" + "="*60)
-print("數據生成完成！")
-print("="*60)
-print("\n可以開始執行 main.py 進行分析！")
+            names = [f'{prefix}{cuisine}{suffix}' for prefix in PREFIXES for suffix in SUFFIXES]
+        offsets.append(len(stems))
+        counts.append(len(names))
+        stems.extend(names)
+    return np.array(stems), np.array(offsets), np.array(counts)
+
+
+def _build_tags(rating, review_count, price, cuisine):
+    """四個條件組成 16 種標籤組合，查表得到每家餐廳的標籤字串"""
+    local = np.isin(cuisine, [CUISINE_TYPES.index('台式料理'), CUISINE_TYPES.index('小吃')])
+    flags = [rating >= 4.5, review_count > 500, price == 0, local]
+    labels = ['高評價', '超人氣', '平價美食', '在地美食']
+
+    table = []
+    for combo in range(2 ** len(labels)):
+        tags = [label for bit, label in enumerate(labels) if combo >> bit & 1]
+        table.append(', '.join(tags) if tags else '無')
+    combo = sum(flag.astype(np.int64) << bit for bit, flag in enumerate(flags))
+    return np.array(table)[combo]
+
+
+def generate_restaurants(start, stop, per_city=PER_CITY, cities=CITIES, rng=None):
+    """
+    生成第 start 至 stop - 1 家餐廳（依城市排列，每個城市 per_city 家）
+
+    Args:
+        start, stop: 全部餐廳中的範圍
+        per_city: 每個城市的餐廳數
+        cities: 城市列表
+        rng: numpy Generator
+
+    Returns:
+        DataFrame（欄位同 restaurants.csv）
+    """
+    rng = np.random.default_rng(SEED) if rng is None else rng
+    n = stop - start
+    row = np.arange(start, stop)
+    city = row // per_city
+    number = row % per_city + 1
+
+    # 隨機選擇餐廳類型
+    cuisine = rng.integers(len(CUISINE_TYPES), size=n)
+
+    # 生成評分（1.0 - 5.0，偏向高分）
+    # 使用 beta 分佈讓評分更真實（大多數餐廳在 3.5-4.5 之間）
+    rating = np.clip(np.round(rng.beta(8, 2, size=n) * 4 + 1, 1), 1.0, 5.0)
+
+    # 生成評論數（10-1000），評分高的餐廳通常評論數也多
+    review_count = (rng.exponential(100, size=n).astype(np.int64)
+                    + ((rating - 1) * 50).astype(np.int64))
+    review_count = np.clip(review_count, 10, 1000)
+
+    # 根據餐廳類型決定價格區間：依各類型的累積機率分段
+    probabilities = np.array([PRICE_PROBABILITIES.get(c, DEFAULT_PRICE_PROBABILITY)
+                              for c in CUISINE_TYPES])
+    cumulative = np.cumsum(probabilities, axis=1)[:, :-1]
+    price = (rng.random(n)[:, None] >= cumulative[cuisine]).sum(axis=1)
+
+    # 計算平均消費（元）
+    mean, std, low, high = (np.array(level)[price] for level in zip(*PRICE_LEVELS))
+    avg_price = np.clip(rng.normal(mean, std).astype(np.int64), low, high)
+
+    # 店名 = 類型對應的字首字尾組合 + 城市內編號
+    stems, offsets, counts = _name_stems()
+    stem = stems[offsets[cuisine] + (rng.random(n) * counts[cuisine]).astype(np.int64)]
+    names = np.char.add(stem, number.astype(str))
+
+    # 經緯度：市中心 + 常態分布的偏移（經度方向依緯度修正，使分布為圓形）
+    center = np.array([CITY_CENTERS[c] for c in cities])[city]
+    weights, spreads = zip(*LOCATION_SPREAD)
+    spread = np.array(spreads)[rng.choice(len(spreads), size=n, p=weights)]
+    offset = rng.normal(size=(n, 2)) * spread[:, None]
+    latitude = np.round(center[:, 0] + offset[:, 0], 6)
+    longitude = np.round(center[:, 1] + offset[:, 1] / np.cos(np.radians(center[:, 0])), 6)
+
+    return pd.DataFrame({
+        'Restaurant_Name': names,
+        'City': np.array(cities)[city],
+        'Latitude': latitude,
+        'Longitude': longitude,
+        'Cuisine_Type': np.array(CUISINE_TYPES)[cuisine],
+        'Rating': rating,
+        'Review_Count': review_count,
+        'Price_Range': np.array(PRICE_RANGES)[price],
+        'Avg_Price': avg_price,
+        'Tags': _build_tags(rating, review_count, price, cuisine),
+    })
+
+
+def generate_data(per_city=PER_CITY, cities=CITIES, output=OUTPUT_FILE,
+                  chunk_size=CHUNK_SIZE, seed=SEED):
+    """
+    分批生成並寫入 CSV
+
+    每批以 (seed, 批次編號) 建立亂數產生器，相同的 seed 與 chunk_size 產生相同的數據
+
+    Returns:
+        摘要 dict：總數、各城市 / 類型 / 價格區間的家數、評分與消費總和
+    """
+    total = per_city * len(cities)
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    summary = {'count': 0, 'rating_sum': 0.0, 'price_sum': 0.0,
+               'City': pd.Series(0, index=cities),
+               'Cuisine_Type': pd.Series(0, index=CUISINE_TYPES),
+               'Price_Range': pd.Series(0, index=PRICE_RANGES)}
+
+    for chunk, start in enumerate(range(0, total, chunk_size)):
+        stop = min(start + chunk_size, total)
+        rng = np.random.default_rng([seed, chunk])
+        df = generate_restaurants(start, stop, per_city, cities, rng)
+        df.to_csv(output, mode='w' if chunk == 0 else 'a', header=chunk == 0,
+                  index=False, encoding='utf-8-sig' if chunk == 0 else 'utf-8')
+
+        summary['count'] += len(df)
+        summary['rating_sum'] += df['Rating'].sum()
+        summary['price_sum'] += df['Avg_Price'].sum()
+        for column in ['City', 'Cuisine_Type', 'Price_Range']:
+            counts = df[column].value_counts()
+            summary[column] += counts.reindex(summary[column].index, fill_value=0)
+        if total > chunk_size:
+            print(f"  已生成 {stop:,} / {total:,} 家")
+
+    return summary
+
+
+def print_summary(summary, output=OUTPUT_FILE):
+    """輸出生成結果摘要"""
+    count = summary['count']
+    print(f"\n[OK] 已儲存: {output}")
+    print(f"  - 總餐廳數: {count:,} 家")
+    print(f"  - 城市數: {(summary['City'] > 0).sum()} 個")
+    print(f"  - 餐廳類型: {(summary['Cuisine_Type'] > 0).sum()} 種")
+    print()
+
+    # 顯示統計摘要
+    print("="*60)
+    print("數據統計摘要")
+    print("="*60)
+
+    print("\n各城市餐廳數：")
+    for city, city_count in summary['City'].items():
+        print(f"  {city}: {int(city_count):,} 家")
+
+    print("\n餐廳類型分布（前5名）：")
+    cuisine_counts = summary['Cuisine_Type'].sort_values(ascending=False, kind='stable').head(5)
+    for cuisine, cuisine_count in cuisine_counts.items():
+        print(f"  {cuisine}: {int(cuisine_count):,} 家")
+
+    print("\n價格區間分布：")
+    for price_range, price_count in summary['Price_Range'].items():
+        percentage = price_count / count * 100
+        print(f"  {price_range}: {int(price_count):,} 家 ({percentage:.1f}%)")
+
+    print(f"\n平均評分: {summary['rating_sum'] / count:.2f} 星")
+    print(f"平均消費: ${summary['price_sum'] / count:.0f} 元")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='台灣餐廳美食數據生成工具')
+    parser.add_argument('--per-city', type=int, default=PER_CITY, help='每個城市的餐廳數')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='輸出 CSV 路徑')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='每批生成並寫入的筆數')
+    parser.add_argument('--seed', type=int, default=SEED, help='亂數種子')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("台灣餐廳美食數據生成工具")
+    print("="*60)
+    print(f"正在生成 {'、'.join(CITIES)} 的餐廳數據（每個城市 {args.per_city:,} 家）...")
+
+    summary = generate_data(args.per_city, CITIES, args.output, args.chunk_size, args.seed)
+    print_summary(summary, args.output)
+
+    print("\n" + "="*60)
+    print("數據生成完成！")
+    print("="*60)
+    print("\n可以開始執行 main.py 進行分析！")
@@ -0,0 +1,480 @@
+"""
+餐廳彙總立方體
+==============
+一次掃描餐廳數據，建立 城市 × 餐廳類型 × 價格區間 的彙總立方體。
+每個格子保存：
+
+- 餐廳數
+- Rating、Avg_Price、Review_Count 的總和、平方和，以及兩兩乘積的總和
+- Rating、Avg_Price、Review_Count 的固定區間直方圖（評分每 0.1 星、價格與評論數每 1 一格，即精確分布）
+- 高評價（4.5 星以上）餐廳數、最高評分與其所在的資料列、店名
+- Rating、Avg_Price、Review_Count 的 KLL 分位數草圖（restaurant_sketch.py）
+
+所有統計報告與圖表都從立方體取值（平均、標準差、交叉表、相關係數、分位數、
+箱型圖統計量），不必對原始數據重複執行 groupby、crosstab 或 df[df['City'] == city]。
+
+立方體可以合併：分批讀取 CSV 時每批建立一個立方體再合併（merge），
+結果與一次讀入整個檔案相同，記憶體用量只與每批大小有關。
+"""
+
+import hashlib
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from restaurant_schema import CATEGORY_ORDERS, CHUNK_SIZE, DATA_FILE, PRICE_RANGES, map_chunks
+from restaurant_sketch import group_sketches, merge_sketches
+
+DIMENSIONS = ['City', 'Cuisine_Type', 'Price_Range']
+METRICS = ['Rating', 'Avg_Price', 'Review_Count']
+HIGH_RATING = 4.5
+
+# 直方圖區間邊界（超出範圍的值計入最前或最後一格）
+HISTOGRAM_EDGES = {
+    'Rating': np.round(np.arange(0.95, 5.06, 0.1), 2),    # 以 1.0、1.1、…、5.0 為中心
+    'Avg_Price': np.arange(3002) - 0.5,                     # 整數，每 1 元一格（0-3000）
+    'Review_Count': np.arange(5002) - 0.5,                  # 整數，每 1 則一格（0-5000）
+}
+
+
+def _encode(values, dim, labels=None):
+    """
+    欄位轉成類別代碼
+
+    指定 labels 時依其順序，數據中其他的值依字母順序接在後面。
+    否則 Categorical 欄位沿用其類別順序（略過數據中沒有出現的類別）；城市
+    依出現順序、價格區間依 PRICE_RANGES、其餘依字母排序（與 groupby 預設相同）
+    """
+    if labels is not None:
+        known = set(labels)
+        extra = sorted(str(v) for v in pd.unique(values.dropna()) if v not in known)
+        categories = list(labels) + extra
+    elif isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories)) > 0
+        remap = np.full(len(used) + 1, -1, dtype=np.int64)
+        remap[:-1][used] = np.arange(used.sum())
+        return list(values.cat.categories[used]), remap[codes]
+    elif dim == 'City':
+        categories = list(pd.unique(values))
+    elif dim == 'Price_Range':
+        present = set(pd.unique(values))
+        categories = [p for p in PRICE_RANGES if p in present]
+        categories += sorted(present - set(PRICE_RANGES))
+    else:
+        categories = sorted(pd.unique(values))
+    return categories, pd.Categorical(values, categories=categories).codes
+
+
+def _histogram_bins(values, edges):
+    """每個值所在的直方圖區間"""
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+
+def _histogram_quantiles(counts, edges, qs):
+    """
+    由直方圖計算分位數
+
+    每個值以所在區間的中心代表，再依 np.percentile 預設的線性內插取值；
+    評分每 0.1 星一格，結果與 np.percentile 相同
+
+    Args:
+        counts: (..., 區間數)
+        edges: 區間邊界
+        qs: 分位數列表（0-1）
+
+    Returns:
+        (..., len(qs))，沒有資料者為 NaN
+    """
+    centers = np.round((edges[:-1] + edges[1:]) / 2, 6)
+    cumulative = np.cumsum(counts, axis=-1)
+    total = cumulative[..., -1:]
+    last = counts.shape[-1] - 1
+
+    def value_at(rank):
+        # 排序後第 rank 個值（0 起算）所在區間的中心
+        i = np.minimum((cumulative <= rank).sum(axis=-1, keepdims=True), last)
+        return centers[i]
+
+    result = np.full(counts.shape[:-1] + (len(qs),), np.nan)
+    for j, q in enumerate(qs):
+        position = q * np.maximum(total - 1, 0)
+        below = np.floor(position)
+        low, high = value_at(below), value_at(np.ceil(position))
+        value = low + (position - below) * (high - low)
+        result[..., j] = np.where(total > 0, value, np.nan)[..., 0]
+    return result
+
+
+class RestaurantCube:
+    """
+    城市 × 餐廳類型 × 價格區間 的彙總立方體
+
+    Args:
+        labels: {維度: 類別列表}
+        stats: {統計量名稱: ndarray(城市數, 類型數, 價格區間數[, 直方圖區間數])}
+        top_names: {最高評分資料列: 店名}
+        sketches: {指標: object ndarray(城市數, 類型數, 價格區間數)}，每格一個 QuantileSketch
+                  （沒有餐廳的格子為 None）
+    """
+
+    def __init__(self, labels, stats, top_names=None, sketches=None):
+        self.labels = labels
+        self.stats = stats
+        self.top_names = top_names or {}
+        self.sketches = sketches or {}
+
+    def _by(self, by):
+        if by is None:
+            return []
+        return [by] if isinstance(by, str) else list(by)
+
+    def _reduce(self, values, by):
+        """加總 by 以外的維度，回傳依 by 順序排列的陣列（直方圖區間維度保留在最後）"""
+        by = self._by(by)
+        axes = tuple(i for i, dim in enumerate(DIMENSIONS) if dim not in by)
+        kept = [dim for dim in DIMENSIONS if dim in by]
+        values = values.sum(axis=axes)
+        order = [kept.index(dim) for dim in by]
+        return np.transpose(values, order + list(range(len(kept), values.ndim)))
+
+    def _wrap(self, values, by):
+        """陣列包成帶標籤的 Series / DataFrame"""
+        by = self._by(by)
+        if not by:
+            return values.item()
+        if len(by) == 1:
+            return pd.Series(values, index=pd.Index(self.labels[by[0]], name=by[0]))
+        if len(by) == 2:
+            return pd.DataFrame(values, index=pd.Index(self.labels[by[0]], name=by[0]),
+                                columns=pd.Index(self.labels[by[1]], name=by[1]))
+        index = pd.MultiIndex.from_product([self.labels[dim] for dim in by], names=by)
+        return pd.Series(values.reshape(-1), index=index)
+
+    def count(self, by=None):
+        """餐廳數"""
+        return self._wrap(self._reduce(self.stats['count'], by), by)
+
+    def sum(self, metric, by=None):
+        """總和"""
+        return self._wrap(self._reduce(self.stats[f'{metric}_sum'], by), by)
+
+    def mean(self, metric, by=None):
+        """平均（沒有餐廳的組合為 NaN）"""
+        n = self._reduce(self.stats['count'], by)
+        total = self._reduce(self.stats[f'{metric}_sum'], by)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._wrap(total / n, by)
+
+    def std(self, metric, by=None, ddof=1):
+        """標準差（由總和與平方和計算）"""
+        n = self._reduce(self.stats['count'], by)
+        total = self._reduce(self.stats[f'{metric}_sum'], by)
+        total_sq = self._reduce(self.stats[f'{metric}_sumsq'], by)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (total_sq - total ** 2 / n) / (n - ddof)
+        return self._wrap(np.sqrt(np.clip(var, 0, None)), by)
+
+    def high_rated(self, by=None):
+        """高評價餐廳數"""
+        return self._wrap(self._reduce(self.stats['high_rated'], by), by)
+
+    def crosstab(self, index, columns, normalize=False):
+        """
+        兩個維度的交叉表（等同 pd.crosstab）
+
+        Args:
+            normalize: 'index' 表示每列換算成比例
+        """
+        table = self.count([index, columns])
+        if normalize == 'index':
+            table = table.div(table.sum(axis=1), axis=0)
+        return table
+
+    def corr(self, metrics=METRICS):
+        """相關係數矩陣（由總和、平方和、乘積和計算）"""
+        n = self.stats['count'].sum()
+        total = {m: self.stats[f'{m}_sum'].sum() for m in metrics}
+        cov = np.empty((len(metrics), len(metrics)))
+        for i, a in enumerate(metrics):
+            for j, b in enumerate(metrics):
+                if i == j:
+                    cross = self.stats[f'{a}_sumsq'].sum()
+                else:
+                    key = f'{a}*{b}_sum' if f'{a}*{b}_sum' in self.stats else f'{b}*{a}_sum'
+                    cross = self.stats[key].sum()
+                cov[i, j] = cross - total[a] * total[b] / n
+        std = np.sqrt(np.diag(cov))
+        return pd.DataFrame(cov / np.outer(std, std), index=metrics, columns=metrics)
+
+    def histogram(self, metric, by=None):
+        """
+        直方圖
+
+        Returns:
+            (區間邊界, 各區間數量)；by 不為 None 時數量為 (各組..., 區間數) 陣列
+        """
+        return HISTOGRAM_EDGES[metric], self._reduce(self.stats[f'{metric}_hist'], by)
+
+    def quantile(self, metric, q=0.5, by=None):
+        """由直方圖計算的分位數（範圍內的數據與 np.percentile 相同）"""
+        edges, counts = self.histogram(metric, by)
+        return self._wrap(_histogram_quantiles(counts, edges, [q])[..., 0], by)
+
+    def sketch(self, metric, by=None):
+        """
+        合併各格的分位數草圖
+
+        Returns:
+            by 為 None 時回傳一個 QuantileSketch；否則為依 by 排列的 Series / DataFrame
+        """
+        by = self._by(by)
+        cells = self.sketches[metric]
+        kept = [DIMENSIONS.index(dim) for dim in by]
+        rest = [i for i in range(len(DIMENSIONS)) if i not in kept]
+        shape = tuple(cells.shape[i] for i in kept)
+        groups = np.transpose(cells, kept + rest).reshape(int(np.prod(shape)), -1)
+        merged = np.empty(len(groups), dtype=object)
+        for i, group in enumerate(groups):
+            merged[i] = merge_sketches(group)
+        return self._wrap(merged.reshape(shape), by) if by else merged[0]
+
+    def box_stats(self, metric, by, whis=1.5):
+        """
+        各組的箱型圖統計量（可直接傳給 ax.bxp）
+
+        四分位數、鬚線與離群點取自合併後的分位數草圖，不需要各組的全部數值；
+        平均取自總和（精確值）
+
+        Returns:
+            dict 列表，每組一個（沒有資料的組略過）
+        """
+        means = self.mean(metric, by)
+        stats = []
+        for label, sketch in self.sketch(metric, by).items():
+            box = sketch.box_stats(label, whis)
+            if box is not None:
+                box['mean'] = means[label]
+                stats.append(box)
+        return stats
+
+    def top_rated(self, by=None):
+        """
+        最高評分及其資料列位置（同分取最先出現者，與 idxmax 相同）
+
+        Returns:
+            DataFrame：Rating（最高評分）、Row（在原始數據中的位置）、Name（店名）
+        """
+        by = self._by(by)
+        axes = tuple(i for i, dim in enumerate(DIMENSIONS) if dim not in by)
+        best = self.stats['Rating_max']
+        rows = self.stats['Rating_argmax']
+        group_best = best.max(axis=axes, keepdims=True)
+        first = np.where(best == group_best, rows, np.iinfo(np.int64).max).min(axis=axes)
+        kept = [dim for dim in DIMENSIONS if dim in by]
+        order = [kept.index(dim) for dim in by]
+        group_best = np.transpose(group_best.max(axis=axes), order)
+        first = np.transpose(first, order)
+        if not by:
+            row = int(first)
+            return pd.Series({'Rating': group_best.item(), 'Row': row,
+                              'Name': self.top_names.get(row)})
+        result = pd.DataFrame({'Rating': self._wrap(group_best, by), 'Row': self._wrap(first, by)})
+        result['Name'] = [self.top_names.get(int(row)) for row in result['Row']]
+        return result
+
+    def fingerprint(self):
+        """彙總內容的雜湊（相同數據建立的立方體雜湊相同，圖表可據此判斷是否需要重畫）"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(sorted(self.labels.items())).encode())
+        for key in sorted(self.stats):
+            digest.update(key.encode())
+            digest.update(np.ascontiguousarray(self.stats[key]).tobytes())
+        digest.update(repr(sorted(self.top_names.items())).encode())
+        for metric in sorted(self.sketches):
+            digest.update(metric.encode())
+            for sketch in self.sketches[metric].flat:
+                if sketch is None:
+                    digest.update(b'-')
+                else:
+                    sketch.update_digest(digest)
+        return digest.hexdigest()
+
+    def _expanded(self, labels):
+        """依較大的 labels 補零擴充（最高評分補 -inf、資料列補最大值）"""
+        index = [[labels[dim].index(label) for label in self.labels[dim]] for dim in DIMENSIONS]
+        shape = tuple(len(labels[dim]) for dim in DIMENSIONS)
+        stats = {}
+        for key, values in self.stats.items():
+            if key == 'Rating_max':
+                fill = -np.inf
+            elif key == 'Rating_argmax':
+                fill = np.iinfo(np.int64).max
+            else:
+                fill = 0
+            expanded = np.full(shape + values.shape[3:], fill, dtype=values.dtype)
+            expanded[np.ix_(*index)] = values
+            stats[key] = expanded
+        return stats
+
+    def _expanded_sketches(self, metric, labels):
+        """依較大的 labels 擴充草圖陣列（新的格子為 None）"""
+        index = [[labels[dim].index(label) for label in self.labels[dim]] for dim in DIMENSIONS]
+        expanded = np.empty(tuple(len(labels[dim]) for dim in DIMENSIONS), dtype=object)
+        expanded[np.ix_(*index)] = self.sketches[metric]
+        return expanded
+
+    def merge(self, other):
+        """
+        合併兩個立方體（例如分批讀取的兩批數據），回傳新的立方體
+
+        類別依 self 的順序，other 中新出現的類別接在後面
+        """
+        labels = {dim: list(self.labels[dim]) + [label for label in other.labels[dim]
+                                                 if label not in self.labels[dim]]
+                  for dim in DIMENSIONS}
+        a, b = self._expanded(labels), other._expanded(labels)
+        stats = {key: a[key] + b[key] for key in a if key not in ('Rating_max', 'Rating_argmax')}
+        stats['Rating_max'] = np.maximum(a['Rating_max'], b['Rating_max'])
+        missing = np.iinfo(np.int64).max
+        stats['Rating_argmax'] = np.minimum(
+            np.where(a['Rating_max'] == stats['Rating_max'], a['Rating_argmax'], missing),
+            np.where(b['Rating_max'] == stats['Rating_max'], b['Rating_argmax'], missing))
+        rows = set(stats['Rating_argmax'].reshape(-1).tolist())
+        names = {row: name for row, name in {**self.top_names, **other.top_names}.items()
+                 if row in rows}
+        sketches = {}
+        for metric in self.sketches:
+            a_cells, b_cells = self._expanded_sketches(metric, labels), other._expanded_sketches(metric, labels)
+            cells = np.empty(a_cells.shape, dtype=object)
+            for i, (a_cell, b_cell) in enumerate(zip(a_cells.flat, b_cells.flat)):
+                cells.flat[i] = a_cell if b_cell is None else b_cell if a_cell is None else a_cell.merge(b_cell)
+            sketches[metric] = cells
+        return RestaurantCube(labels, stats, names, sketches)
+
+    def compact(self):
+        """移除沒有任何餐廳的類別"""
+        counts = self.stats['count']
+        keep = []
+        for i in range(len(DIMENSIONS)):
+            axes = tuple(j for j in range(len(DIMENSIONS)) if j != i)
+            keep.append(np.flatnonzero(counts.sum(axis=axes) > 0))
+        labels = {dim: [self.labels[dim][i] for i in index] for dim, index in zip(DIMENSIONS, keep)}
+        stats = {key: values[np.ix_(*keep)] for key, values in self.stats.items()}
+        sketches = {metric: cells[np.ix_(*keep)] for metric, cells in self.sketches.items()}
+        return RestaurantCube(labels, stats, self.top_names, sketches)
+
+
+def build_cube(df, high_rating=HIGH_RATING, labels=None, row_offset=0):
+    """
+    一次掃描 df 建立彙總立方體
+
+    Args:
+        df: 餐廳數據（需含 DIMENSIONS 與 METRICS 欄位）
+        high_rating: 高評價門檻
+        labels: {維度: 類別列表}，指定時各維度依此順序（分批建立時使各批一致）
+        row_offset: df 第一列在完整數據中的位置（分批建立時使用）
+
+    Returns:
+        RestaurantCube
+    """
+    dim_labels, codes = {}, []
+    for dim in DIMENSIONS:
+        dim_labels[dim], dim_codes = _encode(df[dim], dim, None if labels is None else labels[dim])
+        codes.append(np.asarray(dim_codes, dtype=np.int64))
+
+    shape = tuple(len(dim_labels[dim]) for dim in DIMENSIONS)
+    valid = np.all([c >= 0 for c in codes], axis=0)
+    cell = np.ravel_multi_index([c[valid] for c in codes], shape)
+    size = int(np.prod(shape))
+    values = {m: df[m].to_numpy(dtype=float)[valid] for m in METRICS}
+
+    def total(weights=None):
+        return np.bincount(cell, weights=weights, minlength=size)
+
+    stats = {'count': total().astype(np.int64)}
+    for m in METRICS:
+        stats[f'{m}_sum'] = total(values[m])
+        stats[f'{m}_sumsq'] = total(values[m] ** 2)
+    for a, b in combinations(METRICS, 2):
+        stats[f'{a}*{b}_sum'] = total(values[a] * values[b])
+    stats['high_rated'] = total(values['Rating'] >= high_rating).astype(np.int64)
+    for m, edges in HISTOGRAM_EDGES.items():
+        bins = len(edges) - 1
+        flat = cell * bins + _histogram_bins(values[m], edges)
+        stats[f'{m}_hist'] = np.bincount(flat, minlength=size * bins).reshape(size, bins)
+
+    # 每格的最高評分與最先出現的資料列
+    rating = values['Rating']
+    rows = np.flatnonzero(valid) + row_offset
+    best = np.full(size, -np.inf)
+    np.maximum.at(best, cell, rating)
+    missing = np.iinfo(np.int64).max
+    first = np.full(size, missing)
+    is_best = rating == best[cell]
+    np.minimum.at(first, cell[is_best], rows[is_best])
+    stats['Rating_max'] = best
+    stats['Rating_argmax'] = first
+
+    top_names = {}
+    if 'Restaurant_Name' in df.columns:
+        found = first[first != missing]
+        names = df['Restaurant_Name'].iloc[found - row_offset].astype(str)
+        top_names = dict(zip(found.tolist(), names.tolist()))
+
+    # float32 欄位（評分）先捨入，草圖中的代表值才會是 4.3 而不是 4.300000190734863
+    sketches = {m: group_sketches(np.round(values[m], 6), cell, size).reshape(shape) for m in METRICS}
+    stats = {key: value.reshape(shape + value.shape[1:]) for key, value in stats.items()}
+    return RestaurantCube(dim_labels, stats, top_names, sketches)
+
+
+def stream_cube(chunks, high_rating=HIGH_RATING):
+    """
+    逐批建立並合併立方體
+
+    Args:
+        chunks: 可迭代的 DataFrame（例如 restaurant_schema.read_chunks 的結果），
+                索引為在完整數據中的列號
+
+    Returns:
+        RestaurantCube（已移除沒有餐廳的類別）
+    """
+    labels = {dim: list(CATEGORY_ORDERS.get(dim, [])) for dim in DIMENSIONS}
+    cube = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        part = build_cube(chunk, high_rating, labels, row_offset=int(chunk.index[0]))
+        cube = part if cube is None else cube.merge(part)
+        labels = cube.labels
+    if cube is None:
+        raise ValueError("沒有任何數據")
+    return cube.compact()
+
+
+def _chunk_cube(chunk, high_rating, labels):
+    """map_chunks 在各行程中執行：一批數據的立方體"""
+    if len(chunk) == 0:
+        return None
+    return build_cube(chunk, high_rating, labels, row_offset=int(chunk.index[0]))
+
+
+def load_cube(path=DATA_FILE, chunksize=CHUNK_SIZE, workers=None, high_rating=HIGH_RATING):
+    """
+    分批讀取 CSV 建立立方體
+
+    workers 大於 1 時由多個行程各自讀取、彙總不同段落（含分位數草圖），主行程只合併
+    各段的立方體；結果與 stream_cube 相同（草圖為近似值，合併順序相同時也相同）
+
+    Returns:
+        RestaurantCube（已移除沒有餐廳的類別）
+    """
+    labels = {dim: list(CATEGORY_ORDERS.get(dim, [])) for dim in DIMENSIONS}
+    cube = None
+    for part in map_chunks(_chunk_cube, path, chunksize, workers, (high_rating, labels)):
+        if part is not None:
+            cube = part if cube is None else cube.merge(part)
+    if cube is None:
+        raise ValueError("沒有任何數據")
+    return cube.compact()
@@ -0,0 +1,517 @@
+"""
+餐廳分析圖表登錄表
+==================
+每張圖表以名稱登錄（@register），是一個可以單獨執行的工作：輸入彙總立方體，
+輸出一個 PNG 檔。render() 只處理指定的圖表，可以交給多個行程平行繪製，
+並以「立方體內容 + 繪圖程式碼」的雜湊判斷輸出是否需要更新：
+
+    rating          評分分布分析.png
+    price           價格分析.png
+    cuisine         餐廳類型分析.png
+    city            城市比較.png
+    correlation     相關性分析.png
+    city_histogram  城市餐廳數量直方圖.png
+
+雜湊記錄在輸出資料夾的 .figures.json；數據與程式碼都沒有變動、檔案也還在時直接略過。
+PDF 報表收錄本次指定的所有圖表，其中任一張需要更新時才重新輸出。
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+from matplotlib.backends.backend_pdf import PdfPages
+
+import restaurant_cube
+import restaurant_sketch
+from restaurant_cube import build_cube
+from restaurant_schema import PRICE_RANGES
+
+OUTPUT_DIR = 'output'
+REPORT_FILE = '台灣餐廳美食分析報告.pdf'
+MANIFEST_FILE = '.figures.json'
+DPI = 300
+
+# 設定中文字型
+plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'Arial Unicode MS', 'sans-serif']
+plt.rcParams['axes.unicode_minus'] = False
+
+# 設定視覺化風格
+sns.set_style("whitegrid")
+sns.set_palette("husl")
+
+
+class FigureSpec:
+    """
+    登錄的圖表
+
+    Args:
+        name: 圖表名稱（命令列使用）
+        filename: 輸出檔名
+        title: 顯示名稱
+        plot: 繪圖函式 plot(df=None, cube=None)，回傳 matplotlib Figure
+    """
+
+    def __init__(self, name, filename, title, plot):
+        self.name = name
+        self.filename = filename
+        self.title = title
+        self.plot = plot
+
+
+FIGURES = {}
+
+
+def register(name, filename, title):
+    """把繪圖函式登錄為圖表（依登錄順序排列）"""
+    def decorator(plot):
+        if name in FIGURES:
+            raise ValueError(f"圖表名稱重複: {name}")
+        FIGURES[name] = FigureSpec(name, filename, title, plot)
+        return plot
+    return decorator
+
+
+def _plot_histogram(ax, edges, counts, max_bins, **kwargs):
+    """以預先統計的直方圖繪製（去除前後沒有資料的區間，並合併成最多 max_bins 個區間）"""
+    present = np.flatnonzero(counts)
+    counts = counts[present[0]:present[-1] + 1]
+    edges = edges[present[0]:present[-1] + 2]
+    factor = int(np.ceil(len(counts) / max_bins))
+    counts = np.add.reduceat(counts, np.arange(0, len(counts), factor))
+    edges = np.append(edges[:-1:factor], edges[-1])
+    ax.hist(edges[:-1], bins=edges, weights=counts, **kwargs)
+
+
+@register('rating', '評分分布分析.png', '評分分布分析圖')
+def plot_rating_distribution(df=None, cube=None):
+    """繪製評分分布圖"""
+    cube = build_cube(df) if cube is None else cube
+    mean_rating = cube.mean('Rating')
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('餐廳評分分布分析', fontsize=20, fontweight='bold', y=0.995)
+
+    # 1. 評分直方圖
+    ax1 = axes[0, 0]
+    edges, counts = cube.histogram('Rating')
+    _plot_histogram(ax1, edges, counts, 20, color='skyblue', edgecolor='black', alpha=0.7)
+    ax1.axvline(mean_rating, color='red', linestyle='--', linewidth=2,
+                label=f'平均: {mean_rating:.2f}星')
+    ax1.set_xlabel('評分（星）', fontsize=12)
+    ax1.set_ylabel('餐廳數量', fontsize=12)
+    ax1.set_title('評分分布直方圖', fontsize=14, fontweight='bold')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # 2. 各城市評分箱型圖
+    ax2 = axes[0, 1]
+    bp = ax2.bxp(cube.box_stats('Rating', 'City'), patch_artist=True)
+    for patch in bp['boxes']:
+        patch.set_facecolor('lightgreen')
+    ax2.set_ylabel('評分（星）', fontsize=12)
+    ax2.set_title('各城市評分分布', fontsize=14, fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # 3. 餐廳類型平均評分
+    ax3 = axes[1, 0]
+    cuisine_rating = cube.mean('Rating', 'Cuisine_Type').sort_values(ascending=True)
+    colors = plt.cm.viridis(np.linspace(0.3, 0.9, len(cuisine_rating)))
+    bars = ax3.barh(cuisine_rating.index, cuisine_rating.values, color=colors, edgecolor='black')
+    ax3.set_xlabel('平均評分（星）', fontsize=12)
+    ax3.set_title('各餐廳類型平均評分', fontsize=14, fontweight='bold')
+    ax3.grid(True, alpha=0.3, axis='x')
+
+    # 在長條圖上顯示數值
+    for i, (idx, value) in enumerate(cuisine_rating.items()):
+        ax3.text(value + 0.05, i, f'{value:.2f}', va='center', fontsize=10)
+
+    # 4. 評分區間餐廳數量
+    ax4 = axes[1, 1]
+    rating_ranges = ['1.0-2.0', '2.0-3.0', '3.0-4.0', '4.0-5.0']
+    # 由評分直方圖（每 0.1 星一格）合併成四個區間（最後一個區間含 5.0）
+    edges, counts = cube.histogram('Rating')
+    centers = np.round((edges[:-1] + edges[1:]) / 2, 1)
+    range_counts, _ = np.histogram(centers, bins=[1.0, 2.0, 3.0, 4.0, 5.0], weights=counts)
+    colors = ['#ff6b6b', '#feca57', '#48dbfb', '#1dd1a1']
+    wedges, texts, autotexts = ax4.pie(range_counts, labels=rating_ranges, autopct='%1.1f%%',
+                                         colors=colors, startangle=90)
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(11)
+        autotext.set_fontweight('bold')
+    ax4.set_title('評分區間分布', fontsize=14, fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+@register('price', '價格分析.png', '價格分析圖')
+def plot_price_analysis(df=None, cube=None):
+    """繪製價格分析圖"""
+    cube = build_cube(df) if cube is None else cube
+    mean_price = cube.mean('Avg_Price')
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('餐廳價格分析', fontsize=20, fontweight='bold', y=0.995)
+
+    # 1. 價格分布直方圖
+    ax1 = axes[0, 0]
+    edges, counts = cube.histogram('Avg_Price')
+    _plot_histogram(ax1, edges, counts, 30, color='coral', edgecolor='black', alpha=0.7)
+    ax1.axvline(mean_price, color='red', linestyle='--', linewidth=2,
+                label=f'平均: ${mean_price:.0f}元')
+    ax1.set_xlabel('平均消費（元）', fontsize=12)
+    ax1.set_ylabel('餐廳數量', fontsize=12)
+    ax1.set_title('價格分布直方圖', fontsize=14, fontweight='bold')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # 2. 價格區間與評分關係
+    ax2 = axes[0, 1]
+    bp = ax2.bxp(cube.box_stats('Rating', 'Price_Range'), patch_artist=True)
+    colors_box = ['lightblue', 'lightgreen', 'lightyellow']
+    for patch, color in zip(bp['boxes'], colors_box):
+        patch.set_facecolor(color)
+    ax2.set_ylabel('評分（星）', fontsize=12)
+    ax2.set_title('價格區間與評分關係', fontsize=14, fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # 3. 各城市平均消費比較
+    ax3 = axes[1, 0]
+    city_price = cube.mean('Avg_Price', 'City').sort_values(ascending=False)
+    colors = ['#e74c3c', '#3498db', '#2ecc71', '#f39c12']
+    bars = ax3.bar(city_price.index, city_price.values, color=colors, edgecolor='black', alpha=0.8)
+    ax3.set_ylabel('平均消費（元）', fontsize=12)
+    ax3.set_title('各城市平均消費', fontsize=14, fontweight='bold')
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # 在長條圖上顯示數值
+    for i, (city, price) in enumerate(city_price.items()):
+        ax3.text(i, price + 10, f'${price:.0f}', ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # 4. 餐廳類型平均價格
+    ax4 = axes[1, 1]
+    cuisine_price = cube.mean('Avg_Price', 'Cuisine_Type').sort_values(ascending=True)
+    colors = plt.cm.Oranges(np.linspace(0.4, 0.9, len(cuisine_price)))
+    bars = ax4.barh(cuisine_price.index, cuisine_price.values, color=colors, edgecolor='black')
+    ax4.set_xlabel('平均消費（元）', fontsize=12)
+    ax4.set_title('各餐廳類型平均價格', fontsize=14, fontweight='bold')
+    ax4.grid(True, alpha=0.3, axis='x')
+
+    # 在長條圖上顯示數值
+    for i, (idx, value) in enumerate(cuisine_price.items()):
+        ax4.text(value + 10, i, f'${value:.0f}', va='center', fontsize=10)
+
+    plt.tight_layout()
+    return fig
+
+
+@register('cuisine', '餐廳類型分析.png', '餐廳類型分析圖')
+def plot_cuisine_analysis(df=None, cube=None):
+    """繪製餐廳類型分析圖"""
+    cube = build_cube(df) if cube is None else cube
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('餐廳類型分析', fontsize=20, fontweight='bold', y=0.995)
+
+    # 1. 餐廳類型數量
+    ax1 = axes[0, 0]
+    cuisine_counts = cube.count('Cuisine_Type').sort_values(ascending=False)
+    colors = plt.cm.Set3(np.linspace(0, 1, len(cuisine_counts)))
+    wedges, texts, autotexts = ax1.pie(cuisine_counts.values, labels=cuisine_counts.index,
+                                         autopct='%1.1f%%', colors=colors, startangle=90)
+    for autotext in autotexts:
+        autotext.set_color('black')
+        autotext.set_fontsize(9)
+        autotext.set_fontweight('bold')
+    ax1.set_title('餐廳類型分布', fontsize=14, fontweight='bold')
+
+    # 2. 各城市餐廳類型分布
+    ax2 = axes[0, 1]
+    city_cuisine = cube.crosstab('City', 'Cuisine_Type')
+    city_cuisine.plot(kind='bar', stacked=True, ax=ax2, colormap='tab20')
+    ax2.set_ylabel('餐廳數量', fontsize=12)
+    ax2.set_xlabel('城市', fontsize=12)
+    ax2.set_title('各城市餐廳類型分布', fontsize=14, fontweight='bold')
+    ax2.legend(title='餐廳類型', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
+    ax2.grid(True, alpha=0.3, axis='y')
+    plt.setp(ax2.xaxis.get_majorticklabels(), rotation=0)
+
+    # 3. 餐廳類型評論數比較
+    ax3 = axes[1, 0]
+    cuisine_reviews = cube.mean('Review_Count', 'Cuisine_Type').sort_values(ascending=True)
+    colors = plt.cm.Blues(np.linspace(0.4, 0.9, len(cuisine_reviews)))
+    bars = ax3.barh(cuisine_reviews.index, cuisine_reviews.values, color=colors, edgecolor='black')
+    ax3.set_xlabel('平均評論數', fontsize=12)
+    ax3.set_title('各餐廳類型平均評論數', fontsize=14, fontweight='bold')
+    ax3.grid(True, alpha=0.3, axis='x')
+
+    # 在長條圖上顯示數值
+    for i, (idx, value) in enumerate(cuisine_reviews.items()):
+        ax3.text(value + 5, i, f'{value:.0f}', va='center', fontsize=10)
+
+    # 4. 價格區間內餐廳類型分布
+    ax4 = axes[1, 1]
+    price_cuisine = cube.crosstab('Price_Range', 'Cuisine_Type').reindex(PRICE_RANGES)
+    price_cuisine.plot(kind='bar', ax=ax4, colormap='Spectral')
+    ax4.set_ylabel('餐廳數量', fontsize=12)
+    ax4.set_xlabel('價格區間', fontsize=12)
+    ax4.set_title('各價格區間餐廳類型分布', fontsize=14, fontweight='bold')
+    ax4.legend(title='餐廳類型', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
+    ax4.grid(True, alpha=0.3, axis='y')
+    plt.setp(ax4.xaxis.get_majorticklabels(), rotation=0)
+
+    plt.tight_layout()
+    return fig
+
+
+@register('city', '城市比較.png', '城市比較圖')
+def plot_city_comparison(df=None, cube=None):
+    """繪製城市比較圖"""
+    cube = build_cube(df) if cube is None else cube
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('城市綜合比較', fontsize=20, fontweight='bold', y=0.995)
+
+    cities = cube.labels['City']
+
+    # 1. 各城市餐廳數量
+    ax1 = axes[0, 0]
+    city_counts = cube.count('City')
+    colors = ['#e74c3c', '#3498db', '#2ecc71', '#f39c12']
+    bars = ax1.bar(city_counts.index, city_counts.values, color=colors, edgecolor='black', alpha=0.8)
+    ax1.set_ylabel('餐廳數量', fontsize=12)
+    ax1.set_title('各城市餐廳數量', fontsize=14, fontweight='bold')
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    for i, (city, count) in enumerate(city_counts.items()):
+        ax1.text(i, count + 1, f'{count}家', ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # 2. 各城市平均評分
+    ax2 = axes[0, 1]
+    city_rating = cube.mean('Rating', 'City')
+    bars = ax2.bar(city_rating.index, city_rating.values, color=colors, edgecolor='black', alpha=0.8)
+    ax2.set_ylabel('平均評分（星）', fontsize=12)
+    ax2.set_title('各城市平均評分', fontsize=14, fontweight='bold')
+    ax2.set_ylim([0, 5])
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    for i, (city, rating) in enumerate(city_rating.items()):
+        ax2.text(i, rating + 0.1, f'{rating:.2f}星', ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # 3. 各城市價格區間分布
+    ax3 = axes[1, 0]
+    city_price_dist = cube.crosstab('City', 'Price_Range', normalize='index') * 100
+    city_price_dist = city_price_dist.reindex(columns=PRICE_RANGES, fill_value=0)
+    city_price_dist.plot(kind='bar', stacked=True, ax=ax3,
+                         color=['lightblue', 'lightgreen', 'lightyellow'],
+                         edgecolor='black')
+    ax3.set_ylabel('百分比 (%)', fontsize=12)
+    ax3.set_xlabel('城市', fontsize=12)
+    ax3.set_title('各城市價格區間分布', fontsize=14, fontweight='bold')
+    ax3.legend(title='價格區間', loc='upper right')
+    ax3.grid(True, alpha=0.3, axis='y')
+    plt.setp(ax3.xaxis.get_majorticklabels(), rotation=0)
+
+    # 4. 各城市高評價餐廳比例
+    ax4 = axes[1, 1]
+    high_rated_ratio = (cube.high_rated('City') / city_counts * 100).tolist()
+
+    bars = ax4.bar(cities, high_rated_ratio, color=colors, edgecolor='black', alpha=0.8)
+    ax4.set_ylabel('高評價餐廳比例 (%)', fontsize=12)
+    ax4.set_title('各城市高評價餐廳比例 (4.5星以上)', fontsize=14, fontweight='bold')
+    ax4.grid(True, alpha=0.3, axis='y')
+
+    for i, ratio in enumerate(high_rated_ratio):
+        ax4.text(i, ratio + 1, f'{ratio:.1f}%', ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+@register('correlation', '相關性分析.png', '相關性熱力圖')
+def plot_correlation_heatmap(df=None, cube=None):
+    """繪製相關性熱力圖"""
+    cube = build_cube(df) if cube is None else cube
+    fig, ax = plt.subplots(1, 1, figsize=(10, 8))
+
+    # 選擇數值欄位
+    numeric_cols = ['Rating', 'Review_Count', 'Avg_Price']
+    corr_data = cube.corr(numeric_cols)
+
+    # 繪製熱力圖
+    sns.heatmap(corr_data, annot=True, fmt='.3f', cmap='coolwarm',
+                center=0, square=True, linewidths=1, cbar_kws={"shrink": 0.8},
+                ax=ax, vmin=-1, vmax=1)
+
+    ax.set_title('評分、評論數、價格相關性分析', fontsize=16, fontweight='bold', pad=20)
+
+    # 設定標籤
+    labels = ['評分', '評論數', '平均價格']
+    ax.set_xticklabels(labels, rotation=45, ha='right')
+    ax.set_yticklabels(labels, rotation=0)
+
+    plt.tight_layout()
+    return fig
+
+
+@register('city_histogram', '城市餐廳數量直方圖.png', '城市餐廳數量直方圖')
+def plot_city_restaurant_histogram(df=None, cube=None):
+    """繪製城市對應餐廳數量的直方圖"""
+    cube = build_cube(df) if cube is None else cube
+    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
+
+    # 統計各城市餐廳數量
+    city_counts = cube.count('City').sort_values(ascending=False)
+
+    # 設定顏色
+    colors = ['#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c']
+    bar_colors = colors[:len(city_counts)]
+
+    # 繪製直方圖
+    bars = ax.bar(city_counts.index, city_counts.values,
+                   color=bar_colors, edgecolor='black', alpha=0.85, linewidth=2)
+
+    # 設定標籤和標題
+    ax.set_xlabel('城市', fontsize=14, fontweight='bold')
+    ax.set_ylabel('餐廳數量', fontsize=14, fontweight='bold')
+    ax.set_title('各城市餐廳數量分布直方圖', fontsize=18, fontweight='bold', pad=20)
+
+    # 在每個長條上方顯示數值
+    for i, (city, count) in enumerate(city_counts.items()):
+        ax.text(i, count + 1, f'{count}家',
+                ha='center', va='bottom', fontsize=12, fontweight='bold')
+
+    # 加入網格線
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--')
+    ax.set_axisbelow(True)
+
+    # 設定 y 軸範圍，留一些空間給數值標籤
+    max_count = city_counts.max()
+    ax.set_ylim(0, max_count * 1.15)
+
+    # 加入統計資訊文字框
+    total_restaurants = cube.count()
+    avg_per_city = total_restaurants / len(city_counts)
+    info_text = f'總餐廳數: {total_restaurants} 家\n平均每城市: {avg_per_city:.1f} 家'
+
+    ax.text(0.98, 0.97, info_text,
+            transform=ax.transAxes, fontsize=11,
+            verticalalignment='top', horizontalalignment='right',
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
+
+    plt.tight_layout()
+    return fig
+
+
+def _code_fingerprint():
+    """繪圖與彙總程式碼的雜湊（程式碼變動時所有圖表都需要重畫）"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(matplotlib.__version__.encode())
+    for module in (restaurant_cube, restaurant_sketch):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    with open(__file__, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _job_key(*parts):
+    return hashlib.blake2b('\0'.join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _init_worker():
+    plt.switch_backend('Agg')
+
+
+def _render_figure(name, cube, path):
+    """單一圖表工作：繪製並儲存 PNG"""
+    fig = FIGURES[name].plot(cube=cube)
+    fig.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def _render_report(names, cube, path):
+    """PDF 報表工作：依序繪製指定的圖表，每張一頁"""
+    with PdfPages(path) as pdf:
+        for name in names:
+            fig = FIGURES[name].plot(cube=cube)
+            pdf.savefig(fig, bbox_inches='tight')
+            plt.close(fig)
+    return path
+
+
+def render(cube, names=None, output_dir=OUTPUT_DIR, workers=None, force=False, report=True):
+    """
+    繪製並儲存指定的圖表
+
+    Args:
+        cube: 彙總立方體
+        names: 圖表名稱列表（None 表示全部，依登錄順序）
+        output_dir: 輸出資料夾
+        workers: 平行繪圖的行程數（None 或 1 表示在目前的行程繪製）
+        force: 即使數據與程式碼都沒有變動也重新輸出
+        report: 是否輸出包含這些圖表的 PDF 報表
+
+    Returns:
+        {輸出路徑: 是否重新輸出}，依圖表順序，PDF 報表在最後
+    """
+    names = list(FIGURES) if names is None else list(names)
+    unknown = [name for name in names if name not in FIGURES]
+    if unknown:
+        raise ValueError(f"沒有這些圖表: {', '.join(unknown)}（可用：{', '.join(FIGURES)}）")
+    names = [name for name in FIGURES if name in names]
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = _load_manifest(manifest_path)
+    inputs = _job_key(cube.fingerprint(), _code_fingerprint())
+
+    jobs = []          # (輸出檔名, 雜湊, 工作函式, 參數)
+    for name in names:
+        filename = FIGURES[name].filename
+        jobs.append((filename, _job_key(inputs, name), _render_figure, name))
+    if report:
+        jobs.append((REPORT_FILE, _job_key(inputs, *names), _render_report, names))
+
+    results = {}
+    pending = []
+    for filename, key, job, target in jobs:
+        path = os.path.join(output_dir, filename)
+        fresh = not force and manifest.get(filename) == key and os.path.exists(path)
+        results[path] = not fresh
+        if not fresh:
+            pending.append((filename, key, job, target, path))
+
+    if pending:
+        if workers and workers > 1:
+            with ProcessPoolExecutor(min(workers, len(pending)), initializer=_init_worker) as executor:
+                futures = [executor.submit(job, target, cube, path)
+                           for _, _, job, target, path in pending]
+                for (filename, key, *_), future in zip(pending, futures):
+                    future.result()
+                    manifest[filename] = key
+        else:
+            for filename, key, job, target, path in pending:
+                job(target, cube, path)
+                manifest[filename] = key
+        _save_manifest(manifest_path, manifest)
+    return results
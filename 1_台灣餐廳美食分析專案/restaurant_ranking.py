@@ -0,0 +1,204 @@
+"""
+餐廳排行
+========
+只看平均評分時，10 則評論的 4.9 星會排在 900 則評論的 4.7 星前面。
+這裡以貝氏平均（Bayesian average）計算綜合分數：
+
+    Score = (v × R + m × C) / (v + m)
+
+    R：餐廳評分    v：評論數
+    C：所有餐廳的平均評分（先驗）
+    m：先驗權重，相當於「先給每家餐廳 m 則平均評分的評論」，預設為評論數中位數
+
+評論越少的餐廳越往平均值拉，評論多的餐廳則接近自己的評分。
+
+各城市、各類型的前 k 名以 argpartition 部分選取（每組 O(n)），只對選出的
+k 筆排序，不必對數百萬筆完整排序。
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def bayesian_score(rating, reviews, prior_mean=None, prior_reviews=None):
+    """
+    評論數加權的綜合分數
+
+    Args:
+        rating: 評分陣列
+        reviews: 評論數陣列
+        prior_mean: 先驗平均評分（預設為所有餐廳的評論數加權平均評分）
+        prior_reviews: 先驗權重 m（預設為評論數中位數）
+
+    Returns:
+        綜合分數陣列
+    """
+    rating = np.asarray(rating, dtype=float)
+    reviews = np.asarray(reviews, dtype=float)
+    if prior_mean is None:
+        prior_mean = np.average(rating, weights=reviews) if reviews.sum() > 0 else rating.mean()
+    if prior_reviews is None:
+        prior_reviews = np.median(reviews)
+    return (reviews * rating + prior_reviews * prior_mean) / (reviews + prior_reviews)
+
+
+def top_k_positions(scores, k, codes=None):
+    """
+    每組分數最高的 k 筆位置
+
+    Args:
+        scores: 分數陣列
+        k: 每組筆數
+        codes: 組別代碼（0 起算的整數陣列；None 表示全部視為同一組）
+
+    Returns:
+        位置陣列：依組別代碼、組內分數由高到低排列（同分時較前面的列優先）
+    """
+    if codes is None:
+        groups = [np.arange(len(scores))]
+    else:
+        # 組別代碼多半很小，以最小的整數型別做穩定排序（numpy 以 radix sort 處理）
+        codes = np.asarray(codes)
+        small = codes.astype(np.min_scalar_type(max(int(codes.max(initial=0)), 0)))
+        order = np.argsort(small, kind='stable')
+        bounds = np.searchsorted(small[order], np.arange(int(codes.max(initial=-1)) + 2))
+        groups = [order[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    selected = []
+    for positions in groups:
+        if len(positions) > k:
+            # 第 k 高的分數；與它同分的全部保留，排序後再截取，同分時前面的列優先
+            negative = -scores[positions]
+            kth = np.partition(negative, k - 1)[k - 1]
+            positions = positions[negative <= kth]
+        positions = positions[np.lexsort((positions, -scores[positions]))]
+        selected.append(positions[:k])
+    return np.concatenate(selected) if selected else np.empty(0, dtype=np.int64)
+
+
+def top_k(df, k=10, by=None, min_reviews=0, min_rating=None, prior_mean=None, prior_reviews=None):
+    """
+    綜合分數前 k 名
+
+    Args:
+        df: 餐廳數據（含 Rating、Review_Count）
+        k: 每組筆數
+        by: 分組欄位（None、'City'、'Cuisine_Type' 或欄位列表）
+        min_reviews: 評論數少於此值的餐廳不列入
+        min_rating: 評分低於此值的餐廳不列入
+        prior_mean, prior_reviews: 見 bayesian_score（以全部餐廳計算，不受篩選條件影響）
+
+    Returns:
+        DataFrame：原始欄位加上 Score 與 Rank（組內名次，1 起算），依組別、名次排列
+    """
+    rating = df['Rating'].to_numpy(dtype=float)
+    reviews = df['Review_Count'].to_numpy(dtype=float)
+    scores = bayesian_score(rating, reviews, prior_mean, prior_reviews)
+
+    codes = None
+    if by is not None:
+        codes = df.groupby(by, observed=True, sort=True).ngroup().to_numpy()
+    eligible = reviews >= min_reviews
+    if min_rating is not None:
+        eligible &= rating >= min_rating
+    filtered = not eligible.all()
+    if filtered:
+        scores = np.where(eligible, scores, -np.inf)
+
+    positions = top_k_positions(scores, k, codes)
+    if filtered:
+        positions = positions[np.isfinite(scores[positions])]
+
+    result = df.iloc[positions].copy()
+    result['Score'] = scores[positions]
+    if codes is None:
+        result['Rank'] = np.arange(1, len(positions) + 1)
+    else:
+        group = codes[positions]
+        first = np.searchsorted(group, group)
+        result['Rank'] = np.arange(len(positions)) - first + 1
+    return result
+
+
+def cube_priors(cube):
+    """
+    由彙總立方體計算先驗（與 bayesian_score 的預設相同，評論數中位數由直方圖估計）
+
+    Returns:
+        {'prior_mean': ..., 'prior_reviews': ...}，可直接傳給 top_k / stream_top_k
+    """
+    reviews = cube.sum('Review_Count')
+    prior_mean = cube.sum('Rating*Review_Count') / reviews if reviews > 0 else cube.mean('Rating')
+    return {'prior_mean': prior_mean, 'prior_reviews': cube.quantile('Review_Count', 0.5)}
+
+
+def stream_top_k(chunks, k=10, by=None, min_reviews=0, min_rating=None,
+                 prior_mean=None, prior_reviews=None):
+    """
+    分批計算綜合分數前 k 名
+
+    每批取出前 k 名後與目前的候選合併，再取一次前 k 名；候選最多 k × 組數筆。
+    各批的分數必須使用相同的先驗，因此 prior_mean 與 prior_reviews 都要指定
+    （通常由 cube_priors 取得）。
+
+    Args:
+        chunks: 可迭代的 DataFrame，索引為在完整數據中的列號
+        其餘參數同 top_k
+
+    Returns:
+        同 top_k
+    """
+    if prior_mean is None or prior_reviews is None:
+        raise ValueError("分批排行需指定 prior_mean 與 prior_reviews（可使用 cube_priors）")
+    columns = [] if by is None else ([by] if isinstance(by, str) else list(by))
+    best = None
+    for chunk in chunks:
+        part = top_k(chunk, k, by, min_reviews, min_rating, prior_mean, prior_reviews)
+        if best is not None:
+            part = pd.concat([best, part]).sort_index(kind='stable')
+            # 各批的類別可能不同，合併後恢復為類別型別以保持組別順序
+            for column in columns:
+                if isinstance(best[column].dtype, pd.CategoricalDtype):
+                    categories = list(dict.fromkeys(
+                        list(best[column].cat.categories) + list(pd.unique(part[column].astype(str)))))
+                    part[column] = part[column].astype(str).astype(pd.CategoricalDtype(categories))
+            part = top_k(part.drop(columns=['Score', 'Rank']), k, by, min_reviews, min_rating,
+                         prior_mean, prior_reviews)
+        best = part
+    return best
+
+
+def print_ranking(ranking, by=None, title='綜合評分排行'):
+    """輸出 top_k 的結果"""
+    print(f"\n[{title}]")
+    print("-" * 60)
+    groups = [(None, ranking)] if by is None else ranking.groupby(by, observed=True, sort=False)
+    for name, group in groups:
+        if name is not None:
+            label = name if isinstance(name, str) else ' / '.join(map(str, name))
+            print(f"\n{label}:")
+        for _, row in group.iterrows():
+            print(f"  {row['Rank']:>2}. {row['Restaurant_Name']} ({row['City']}) - "
+                  f"{row['Rating']:.1f}星 / {row['Review_Count']} 則評論 - 綜合 {row['Score']:.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from restaurant_schema import DATA_FILE, load_restaurants
+
+    parser = argparse.ArgumentParser(description='餐廳綜合評分排行')
+    parser.add_argument('--data', default=DATA_FILE, help='餐廳數據 CSV')
+    parser.add_argument('--by', choices=['City', 'Cuisine_Type'], help='分組欄位')
+    parser.add_argument('-k', type=int, default=5, help='每組筆數')
+    parser.add_argument('--min-reviews', type=int, default=0, help='最少評論數')
+    parser.add_argument('--min-rating', type=float, help='最低評分')
+    args = parser.parse_args()
+
+    df = load_restaurants(args.data)
+    start = time.perf_counter()
+    ranking = top_k(df, args.k, args.by, args.min_reviews, args.min_rating)
+    elapsed = (time.perf_counter() - start) * 1000
+    print_ranking(ranking, args.by)
+    print(f"\n[完成] {len(df):,} 家餐廳，{elapsed:.1f} 毫秒")
@@ -0,0 +1,289 @@
+"""
+相似餐廳推薦
+============
+「和這家很像的餐廳」：每家餐廳編成一列特徵向量，以餘弦相似度找出最像的 k 家。
+
+    餐廳類型、價格區間、城市    →  one-hot（乘上權重）
+    評分、log(評論數)           →  標準化後乘上權重
+
+每列再正規化為單位長度，餘弦相似度即為內積。特徵矩陣為 float32（每家約 80 bytes），
+100 萬家約 80 MB。
+
+查詢以矩陣乘法分塊計算：每次取一批種子（預設 1,024 家）與一塊候選餐廳
+（預設 8,192 家）相乘，只保留每個種子目前的前 k 名，記憶體用量只與區塊大小有關。
+前 k 名以「分數 + 列號」組成的 64 位元整數比較：分數相同時列號較小者優先，
+結果與區塊大小無關。第一塊之後，只有超過目前第 k 名分數的候選才需要處理。
+"""
+
+import numpy as np
+import pandas as pd
+
+from restaurant_schema import CATEGORY_ORDERS
+
+# 各特徵的權重（數值越大，該特徵相同的餐廳越相似）
+FEATURE_WEIGHTS = {
+    'Cuisine_Type': 1.0,
+    'Price_Range': 0.6,
+    'City': 0.5,
+    'Rating': 0.5,
+    'Review_Count': 0.3,
+}
+CATEGORICAL_FEATURES = ['Cuisine_Type', 'Price_Range', 'City']
+BLOCK_SIZE = 8192              # 每塊候選餐廳數
+QUERY_BLOCK = 1024             # 每批種子數
+
+_EMPTY = np.iinfo(np.int64).min
+_ROW_MASK = np.int64(0xFFFFFFFF)
+
+
+def feature_matrix(df, weights=FEATURE_WEIGHTS):
+    """
+    餐廳特徵矩陣
+
+    Args:
+        df: 餐廳數據
+        weights: {特徵: 權重}
+
+    Returns:
+        (float32 矩陣 (餐廳數, 特徵數)，每列為單位長度；欄位名稱列表)
+    """
+    blocks, columns = [], []
+    for feature in CATEGORICAL_FEATURES:
+        values = df[feature]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = list(values.cat.categories)
+        else:
+            known = CATEGORY_ORDERS.get(feature, [])
+            categories = list(known) + sorted(set(values.dropna()) - set(known))
+        codes = pd.Categorical(values, categories=categories).codes
+        one_hot = np.zeros((len(df), len(categories)), dtype=np.float32)
+        valid = codes >= 0
+        one_hot[np.flatnonzero(valid), codes[valid]] = weights[feature]
+        blocks.append(one_hot)
+        columns += [f'{feature}={category}' for category in categories]
+
+    numeric = {
+        'Rating': df['Rating'].to_numpy(dtype=np.float64),
+        'Review_Count': np.log1p(df['Review_Count'].to_numpy(dtype=np.float64)),
+    }
+    for feature, values in numeric.items():
+        std = values.std()
+        scaled = (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+        blocks.append((scaled * weights[feature]).astype(np.float32)[:, None])
+        columns.append(feature)
+
+    matrix = np.hstack(blocks)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1)
+    return np.ascontiguousarray(matrix), columns
+
+
+def _keys(scores, rows):
+    """
+    分數與列號組成可比較的 int64：高 32 位元為分數（float32 位元轉成遞增整數），
+    低 32 位元為 0xFFFFFFFF - 列號（同分時列號小者較大）
+    """
+    bits = np.ascontiguousarray(scores, dtype=np.float32).view(np.int32).astype(np.int64)
+    ordered = np.where(bits >= 0, bits, bits ^ 0x7FFFFFFF)
+    return (ordered << 32) | (_ROW_MASK - rows)
+
+
+def _decode(keys):
+    """_keys 的反向：(分數, 列號)，空位為 (NaN, -1)"""
+    ordered = keys >> 32
+    bits = np.where(ordered >= 0, ordered, ordered ^ 0x7FFFFFFF).astype(np.int32)
+    scores = bits.view(np.float32).astype(np.float64)
+    rows = _ROW_MASK - (keys & _ROW_MASK)
+    empty = (keys == _EMPTY) | np.isneginf(scores)
+    return np.where(empty, np.nan, scores), np.where(empty, -1, rows)
+
+
+def _top_keys(keys, k):
+    """每列最大的 k 個 key，由大到小"""
+    if keys.shape[1] > k:
+        keys = np.take_along_axis(keys, np.argpartition(keys, -k, axis=1)[:, -k:], axis=1)
+    return np.sort(keys, axis=1)[:, ::-1]
+
+
+def block_top_k(queries, matrix, k, exclude=None, mask=None, block_size=BLOCK_SIZE):
+    """
+    分塊計算每個查詢向量內積最大的 k 列
+
+    Args:
+        queries: (查詢數, 特徵數) float32
+        matrix: (餐廳數, 特徵數) float32
+        k: 每個查詢的筆數
+        exclude: 每個查詢要排除的列號（例如種子本身），-1 表示不排除
+        mask: 可推薦的餐廳（布林陣列，None 表示全部）
+        block_size: 每塊候選餐廳數
+
+    Returns:
+        (列號 (查詢數, k)，相似度 (查詢數, k))；不足 k 家時列號為 -1、相似度為 NaN
+    """
+    n_queries = len(queries)
+    best = np.full((n_queries, k), _EMPTY, dtype=np.int64)
+    query_index = np.arange(n_queries)
+    threshold = np.full(n_queries, -np.inf, dtype=np.float32)
+
+    for start in range(0, len(matrix), block_size):
+        stop = min(start + block_size, len(matrix))
+        scores = queries @ matrix[start:stop].T
+        if mask is not None:
+            scores[:, ~mask[start:stop]] = -np.inf
+        if exclude is not None:
+            inside = (exclude >= start) & (exclude < stop)
+            scores[query_index[inside], exclude[inside] - start] = -np.inf
+
+        # 前面的區塊列號較小，同分時已在名單中者優先，因此只需處理分數嚴格較高者
+        candidates = scores > threshold[:, None]
+        count = int(np.count_nonzero(candidates))
+        if count == 0:
+            continue
+        rows = np.arange(start, stop, dtype=np.int64)
+        if count > n_queries * k * 4:
+            # 候選很多（通常是第一塊）：整塊轉成 key，每列取前 k 再與目前名單合併
+            keys = np.where(candidates, _keys(scores, rows[None, :]), _EMPTY)
+            best = _top_keys(np.hstack([best, _top_keys(keys, k)]), k)
+        else:
+            # 候選很少：只處理超過門檻的元素，與目前名單一起依 (查詢, key) 排序後每組取 k 個
+            q, column = np.divmod(np.flatnonzero(candidates), stop - start)     # 比二維 nonzero 快
+            keys = _keys(scores[q, column], rows[column])
+            all_q = np.concatenate([np.repeat(query_index, k), q])
+            all_keys = np.concatenate([best.reshape(-1), keys])
+            order = np.lexsort((~all_keys, all_q))
+            starts = np.searchsorted(all_q[order], query_index)
+            best = all_keys[order[starts[:, None] + np.arange(k)]]
+        threshold = np.where(best[:, -1] == _EMPTY, -np.inf, _decode(best[:, -1])[0]).astype(np.float32)
+
+    scores, rows = _decode(best)
+    return rows, scores
+
+
+class Recommender:
+    """
+    相似餐廳推薦
+
+    Args:
+        df: 餐廳數據（含 Cuisine_Type、Price_Range、City、Rating、Review_Count）
+        weights: 特徵權重
+        block_size: 每塊候選餐廳數
+    """
+
+    def __init__(self, df, weights=FEATURE_WEIGHTS, block_size=BLOCK_SIZE):
+        self.df = df
+        self.matrix, self.columns = feature_matrix(df, weights)
+        self.block_size = block_size
+
+    def similar(self, seeds, k=10, mask=None, query_block=QUERY_BLOCK):
+        """
+        每個種子最相似的 k 家餐廳（不含種子本身）
+
+        Args:
+            seeds: 種子餐廳的位置（0 起算的列號陣列）
+            k: 每個種子的推薦數
+            mask: 可推薦的餐廳（布林陣列）
+            query_block: 每批處理的種子數
+
+        Returns:
+            (列號 (種子數, k)，相似度 (種子數, k))
+        """
+        seeds = np.atleast_1d(np.asarray(seeds, dtype=np.int64))
+        rows = np.full((len(seeds), k), -1, dtype=np.int64)
+        scores = np.full((len(seeds), k), np.nan)
+        for start in range(0, len(seeds), query_block):
+            batch = seeds[start:start + query_block]
+            rows[start:start + len(batch)], scores[start:start + len(batch)] = block_top_k(
+                self.matrix[batch], self.matrix, k, batch, mask, self.block_size)
+        return rows, scores
+
+    def recommend(self, seeds, k=10, same_city=False, min_rating=None):
+        """
+        推薦結果表
+
+        Args:
+            seeds: 種子餐廳的位置
+            k: 每個種子的推薦數
+            same_city: 只推薦與種子同城市的餐廳（依城市分批查詢）
+            min_rating: 只推薦評分不低於此值的餐廳
+
+        Returns:
+            DataFrame：Seed（種子列號）、Rank、Similarity 與推薦餐廳的欄位，依種子、名次排列
+        """
+        seeds = np.atleast_1d(np.asarray(seeds, dtype=np.int64))
+        mask = None
+        if min_rating is not None:
+            mask = self.df['Rating'].to_numpy() >= min_rating
+
+        if same_city:
+            cities = self.df['City'].to_numpy()
+            rows = np.full((len(seeds), k), -1, dtype=np.int64)
+            scores = np.full((len(seeds), k), np.nan)
+            for city in pd.unique(cities[seeds]):
+                group = np.flatnonzero(cities[seeds] == city)
+                city_mask = cities == city if mask is None else mask & (cities == city)
+                rows[group], scores[group] = self.similar(seeds[group], k, city_mask)
+        else:
+            rows, scores = self.similar(seeds, k, mask)
+
+        found = rows >= 0
+        result = self.df.iloc[rows[found]].copy()
+        result.insert(0, 'Seed', np.repeat(seeds, found.sum(axis=1)))
+        result.insert(1, 'Rank', np.nonzero(found)[1] + 1)
+        result.insert(2, 'Similarity', scores[found])
+        return result
+
+
+def print_recommendations(df, result, title='相似餐廳推薦'):
+    """輸出 recommend 的結果"""
+    print(f"\n[{title}]")
+    print("-" * 60)
+    for seed, group in result.groupby('Seed', sort=False):
+        row = df.iloc[seed]
+        print(f"\n{row['Restaurant_Name']} ({row['City']}) - {row['Cuisine_Type']} / {row['Price_Range']}"
+              f" - {row['Rating']:.1f}星 / {row['Review_Count']} 則評論:")
+        for _, item in group.iterrows():
+            print(f"  {item['Rank']:>2}. {item['Restaurant_Name']} ({item['City']}) - "
+                  f"{item['Cuisine_Type']} / {item['Price_Range']} - {item['Rating']:.1f}星 / "
+                  f"{item['Review_Count']} 則評論 - 相似度 {item['Similarity']:.3f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from restaurant_schema import DATA_FILE, load_restaurants
+
+    parser = argparse.ArgumentParser(description='相似餐廳推薦')
+    parser.add_argument('names', nargs='*', help='種子餐廳店名（預設為前三家）')
+    parser.add_argument('--data', default=DATA_FILE, help='餐廳數據 CSV')
+    parser.add_argument('-k', type=int, default=5, help='每家的推薦數')
+    parser.add_argument('--same-city', action='store_true', help='只推薦同城市的餐廳')
+    parser.add_argument('--min-rating', type=float, help='推薦餐廳的最低評分')
+    parser.add_argument('--batch', type=int, help='隨機選取的種子數（測試批次查詢速度）')
+    args = parser.parse_args()
+
+    df = load_restaurants(args.data)
+    start = time.perf_counter()
+    recommender = Recommender(df)
+    print(f"[OK] 已建立 {len(df):,} 家餐廳的特徵矩陣 {recommender.matrix.shape}"
+          f"（{recommender.matrix.nbytes / 1024 ** 2:.1f} MB，{time.perf_counter() - start:.2f} 秒）")
+
+    if args.batch:
+        seeds = np.random.default_rng(0).choice(len(df), size=min(args.batch, len(df)), replace=False)
+    elif args.names:
+        names = df['Restaurant_Name'].astype(str).to_numpy()
+        seeds = np.flatnonzero(np.isin(names, args.names))
+        missing = set(args.names) - set(names[seeds])
+        for name in missing:
+            print(f"  ✗ 找不到餐廳: {name}")
+    else:
+        seeds = np.arange(min(3, len(df)))
+
+    start = time.perf_counter()
+    result = recommender.recommend(seeds, args.k, args.same_city, args.min_rating)
+    elapsed = time.perf_counter() - start
+    if args.batch:
+        print(f"\n[完成] {len(seeds):,} 家種子 × {len(df):,} 家餐廳，前 {args.k} 名：{elapsed:.2f} 秒")
+    else:
+        print_recommendations(df, result)
+        print(f"\n[完成] {elapsed * 1000:.1f} 毫秒")
@@ -0,0 +1,234 @@
+"""
+餐廳數據型別定義
+================
+restaurants.csv 預設讀進來時，文字欄位是一列一個 Python 字串，數值欄位是
+int64 / float64。全國數百萬家餐廳的數據用這種型別會佔用大量記憶體。
+
+這裡把重複出現的文字欄位讀成 Categorical（城市、類型、價格區間使用固定的
+類別順序），數值欄位縮小到足以容納其數值的最小型別：
+
+    City / Cuisine_Type / Price_Range / Restaurant_Name / Tags  →  category
+    Rating / Latitude / Longitude                               →  float32
+    Review_Count / Avg_Price                                    →  int16 / int32
+
+Categorical 欄位的 groupby 直接以類別代碼分組，也比字串快。
+"""
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DATA_FILE = 'data/restaurants.csv'
+CHUNK_SIZE = 200_000          # 分批讀取時每批的筆數
+
+# 固定的類別順序（generate_local_data.py 也依此生成數據）
+CITIES = ['台北', '台中', '台南', '高雄']
+CUISINE_TYPES = [
+    '台式料理', '日式料理', '義式料理', '美式料理',
+    '中式料理', '韓式料理', '泰式料理', '咖啡廳',
+    '火鍋', '燒烤', '小吃', '甜點店'
+]
+PRICE_RANGES = ['平價', '中價位', '高價位']
+
+CATEGORY_ORDERS = {
+    'City': CITIES,
+    'Cuisine_Type': CUISINE_TYPES,
+    'Price_Range': PRICE_RANGES,
+}
+CATEGORY_COLUMNS = ['City', 'Cuisine_Type', 'Price_Range', 'Restaurant_Name', 'Tags']
+FLOAT_COLUMNS = ['Rating', 'Latitude', 'Longitude']    # float32 的經緯度精度約 1 公尺
+INTEGER_COLUMNS = ['Review_Count', 'Avg_Price']
+
+
+def category_dtype(values, column):
+    """
+    欄位的類別型別
+
+    有固定順序的欄位依 CATEGORY_ORDERS 排列，數據中出現的其他值（例如新增
+    的城市）依字母順序接在後面，不會被轉成 NaN；其餘欄位依字母順序。
+    """
+    present = pd.unique(values.dropna())
+    order = CATEGORY_ORDERS.get(column, [])
+    known = set(order)
+    extra = sorted(str(value) for value in present if value not in known)
+    return pd.CategoricalDtype(list(order) + extra)
+
+
+def optimize_dtypes(df):
+    """
+    轉換為精簡型別（回傳新的 DataFrame）
+
+    Args:
+        df: 預設型別的餐廳數據
+
+    Returns:
+        文字欄位為 Categorical、數值欄位縮小後的 DataFrame
+    """
+    df = df.copy()
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype(object)
+            df[column] = values.astype(category_dtype(values, column))
+    for column in FLOAT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast='float')
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def memory_usage(df):
+    """DataFrame 實際佔用的記憶體（bytes，含字串內容）"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def print_memory_report(before, after):
+    """
+    輸出各欄位轉換前後的記憶體用量
+
+    Args:
+        before: 預設型別的 DataFrame
+        after: optimize_dtypes 的結果
+    """
+    old = before.memory_usage(deep=True)
+    new = after.memory_usage(deep=True)
+    print("\n[記憶體用量]")
+    print("-" * 60)
+    for column in after.columns:
+        print(f"  {column:<16}{str(before[column].dtype):>10} → {str(after[column].dtype):<9}"
+              f"{old[column] / 1024:>10,.1f} KB → {new[column] / 1024:>8,.1f} KB")
+    total_old, total_new = old.sum(), new.sum()
+    print(f"  {'合計':<14}{total_old / 1024 ** 2:>22,.2f} MB → {total_new / 1024 ** 2:>7,.2f} MB"
+          f"（減少 {(1 - total_new / total_old) * 100:.1f}%）")
+
+
+def load_restaurants(path=DATA_FILE, report=False):
+    """
+    以精簡型別載入餐廳數據
+
+    Args:
+        path: CSV 路徑
+        report: 是否輸出轉換前後的記憶體用量（需要先以預設型別讀一次）
+
+    Returns:
+        DataFrame
+    """
+    if report:
+        raw = pd.read_csv(path, encoding='utf-8-sig')
+        df = optimize_dtypes(raw)
+        print_memory_report(raw, df)
+        return df
+
+    # 不需比較時直接以類別型別讀取，不會產生一列一個字串的中間結果
+    return _typed(pd.read_csv(path, encoding='utf-8-sig', dtype=_read_dtypes()))
+
+
+def _read_dtypes():
+    """read_csv 的 dtype 參數"""
+    dtype = {column: 'category' for column in CATEGORY_COLUMNS}
+    dtype.update({column: np.float32 for column in FLOAT_COLUMNS})
+    return dtype
+
+
+def _typed(df):
+    """以 _read_dtypes 讀入的數據：排列類別順序並縮小整數欄位"""
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            values = df[column]
+            df[column] = values.cat.set_categories(
+                category_dtype(values.cat.categories.to_series(), column).categories)
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def read_chunks(path=DATA_FILE, chunksize=CHUNK_SIZE):
+    """
+    分批讀取餐廳數據（每批型別同 load_restaurants）
+
+    每批的索引延續前一批（即在完整數據中的列號），記憶體用量只與 chunksize 有關
+
+    Yields:
+        DataFrame
+    """
+    with pd.read_csv(path, encoding='utf-8-sig', dtype=_read_dtypes(), chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield _typed(chunk)
+
+
+def chunk_ranges(path=DATA_FILE, chunksize=CHUNK_SIZE, block_size=1 << 24):
+    """
+    把 CSV 切成每段 chunksize 列的位元組範圍（每段都在換行處切開）
+
+    只計算換行位置、不解析欄位，每段可以交給不同的行程各自讀取
+
+    Returns:
+        (欄位名稱, [(起始位元組, 結束位元組, 第一列的列號), ...])
+    """
+    ranges = []
+    with open(path, 'rb') as f:
+        columns = f.readline().decode('utf-8-sig').strip().split(',')
+        position = start = f.tell()
+        pending = row = 0                # pending：目前這段已累積的列數
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+            for cut in newlines[chunksize - pending - 1::chunksize]:
+                stop = position + int(cut) + 1
+                ranges.append((start, stop, row))
+                start, row = stop, row + chunksize
+            pending = (pending + len(newlines)) % chunksize
+            position += len(block)
+    if position > start:
+        ranges.append((start, position, row))
+    return columns, ranges
+
+
+def read_range(path, columns, start, stop, row_offset):
+    """讀取 chunk_ranges 切出的一段（型別同 load_restaurants，索引為在完整數據中的列號）"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=_read_dtypes())
+    chunk.index = pd.RangeIndex(row_offset, row_offset + len(chunk))
+    return _typed(chunk)
+
+
+def _apply_range(func, path, columns, start, stop, row_offset, args):
+    return func(read_range(path, columns, start, stop, row_offset), *args)
+
+
+def map_chunks(func, path=DATA_FILE, chunksize=CHUNK_SIZE, workers=None, args=()):
+    """
+    分批讀取並對每批執行 func(chunk, *args)，依檔案順序產生結果
+
+    workers 大於 1 時由多個行程各自讀取、處理不同的段落（讀取與解析 CSV 也一起平行），
+    主行程只收到 func 的結果；同時進行的段落最多 workers × 2 個，記憶體用量仍只與
+    chunksize 有關。func 與 args 必須可以 pickle（模組層級的函式）。
+
+    Yields:
+        每批的 func 結果
+    """
+    if not workers or workers <= 1:
+        for chunk in read_chunks(path, chunksize):
+            yield func(chunk, *args)
+        return
+
+    columns, ranges = chunk_ranges(path, chunksize)
+    with ProcessPoolExecutor(workers) as executor:
+        pending = []
+        for start, stop, row_offset in ranges:
+            pending.append(executor.submit(_apply_range, func, path, columns,
+                                           start, stop, row_offset, args))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
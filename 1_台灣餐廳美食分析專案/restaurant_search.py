@@ -0,0 +1,279 @@
+"""
+餐廳名稱搜尋
+============
+以店名的「相鄰兩字」（bigram）建立倒排索引：
+
+    正宗台式料理食堂12  →  正宗、宗台、台式、式料、料理、理食、食堂、堂1、12
+
+- 子字串搜尋：取查詢字串所有 bigram 的倒排列表交集，再確認候選店名確實包含
+  查詢字串；單一字元則合併所有含該字元的 bigram
+- 模糊搜尋：依共同 bigram 數計算 Dice 相似度，打錯字或少一字也找得到
+- 結果依評分、評論數排序
+
+索引以「店名內容雜湊」存到磁碟，店名沒有變動時啟動直接載入，不必重建。
+建立索引全程使用陣列運算：店名轉成 Unicode 碼位矩陣，相鄰兩欄組成 64 位元
+的 bigram 編號，排序後即為倒排列表（CSR 格式：編號、起始位置、餐廳列號）。
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+INDEX_FILE = 'cache/name_index.npz'
+MIN_SIMILARITY = 0.5
+
+
+def _codepoints(names):
+    """店名（轉小寫）的 Unicode 碼位矩陣，不足的長度補 0"""
+    names = np.char.lower(np.asarray(names, dtype=str))
+    width = max(names.dtype.itemsize // 4, 1)
+    names = names.astype(f'<U{width}')
+    return names.view(np.uint32).reshape(len(names), width)
+
+
+def _bigrams(codepoints):
+    """
+    每列的 bigram 編號（高 32 位元為前一字、低 32 位元為後一字）
+
+    只有一個字的店名以 (字, 0) 表示
+
+    Returns:
+        (列號, bigram 編號)，未去除重複
+    """
+    left = codepoints[:, :-1].astype(np.uint64)
+    right = codepoints[:, 1:].astype(np.uint64)
+    valid = right != 0
+    rows = np.nonzero(valid)[0]
+    keys = (left[valid] << np.uint64(32)) | right[valid]
+
+    single = (codepoints[:, 0] != 0) & ((codepoints[:, 1] == 0) if codepoints.shape[1] > 1 else True)
+    single_rows = np.flatnonzero(single)
+    single_keys = codepoints[single_rows, 0].astype(np.uint64) << np.uint64(32)
+    return np.concatenate([rows, single_rows]), np.concatenate([keys, single_keys])
+
+
+def names_fingerprint(names):
+    """店名列表的內容雜湊（判斷磁碟上的索引是否過期）"""
+    digest = hashlib.blake2b(digest_size=16)
+    codepoints = _codepoints(names)
+    digest.update(str(codepoints.shape).encode())
+    digest.update(np.ascontiguousarray(codepoints).view(np.uint8).reshape(-1))
+    return digest.hexdigest()
+
+
+class NameIndex:
+    """
+    店名 bigram 倒排索引
+
+    Args:
+        keys: 排序後的 bigram 編號
+        offsets: 每個 bigram 的倒排列表在 postings 中的起始位置（長度 = keys + 1）
+        postings: 餐廳列號（每個 bigram 內遞增）
+        gram_counts: 每家餐廳不重複的 bigram 數
+        fingerprint: 店名內容雜湊
+    """
+
+    def __init__(self, keys, offsets, postings, gram_counts, fingerprint):
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self.gram_counts = gram_counts
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, names, fingerprint=None):
+        """由店名列表建立索引"""
+        codepoints = _codepoints(names)
+        rows, keys = _bigrams(codepoints)
+
+        # 依 (bigram, 列號) 排序並去除同一店名內重複的 bigram
+        order = np.lexsort((rows, keys))
+        rows, keys = rows[order], keys[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+        rows, keys = rows[keep], keys[keep]
+
+        starts = np.flatnonzero(np.append(True, keys[1:] != keys[:-1]))[:len(keys)]
+        offsets = np.append(starts, len(keys))
+        gram_counts = np.bincount(rows, minlength=len(codepoints))
+        fingerprint = names_fingerprint(names) if fingerprint is None else fingerprint
+        return cls(keys[starts], offsets, rows.astype(np.int64), gram_counts, fingerprint)
+
+    def save(self, path=INDEX_FILE):
+        """寫入 .npz（先寫暫存檔再改名）"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, keys=self.keys, offsets=self.offsets, postings=self.postings,
+                     gram_counts=self.gram_counts, fingerprint=np.array(self.fingerprint))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        """讀取 .npz；檔案不存在或損壞時回傳 None"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data['keys'], data['offsets'], data['postings'],
+                           data['gram_counts'], str(data['fingerprint']))
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return None
+
+    def posting(self, key):
+        """單一 bigram 的倒排列表"""
+        i = np.searchsorted(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.postings[self.offsets[i]:self.offsets[i + 1]]
+        return self.postings[:0]
+
+    def candidates(self, query):
+        """
+        可能包含 query 的餐廳列號（遞增）
+
+        兩字以上：所有 bigram 都出現的餐廳（仍需確認字的順序）；
+        單一字元：所有含該字元的 bigram 的聯集（不需再確認）
+        """
+        codepoints = _codepoints([query])[0]
+        codepoints = codepoints[codepoints != 0]
+        if len(codepoints) == 0:
+            raise ValueError("搜尋字串不可為空")
+        if len(codepoints) == 1:
+            char = np.uint64(codepoints[0])
+            match = np.flatnonzero(((self.keys >> np.uint64(32)) == char)
+                                   | ((self.keys & np.uint64(0xFFFFFFFF)) == char))
+            lists = [self.postings[self.offsets[i]:self.offsets[i + 1]] for i in match]
+            return np.unique(np.concatenate(lists)) if lists else self.postings[:0]
+
+        _, keys = _bigrams(codepoints[None, :])
+        lists = sorted((self.posting(key) for key in np.unique(keys)), key=len)
+        result = lists[0]
+        for rows in lists[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    def similar(self, query, min_similarity=MIN_SIMILARITY):
+        """
+        依共同 bigram 數計算 Dice 相似度
+
+        Returns:
+            (餐廳列號, 相似度)，只保留相似度 >= min_similarity 者
+        """
+        codepoints = _codepoints([query])
+        _, keys = _bigrams(codepoints)
+        keys = np.unique(keys)
+        if len(keys) == 0:
+            raise ValueError("搜尋字串不可為空")
+        rows, shared = np.unique(np.concatenate([self.posting(key) for key in keys]),
+                                 return_counts=True)
+        similarity = 2 * shared / (len(keys) + self.gram_counts[rows])
+        keep = similarity >= min_similarity
+        return rows[keep], similarity[keep]
+
+
+def load_or_build(names, path=INDEX_FILE):
+    """
+    讀取磁碟上的索引；不存在或店名已變動時重建並存檔
+
+    Returns:
+        (NameIndex, 是否重建)
+    """
+    fingerprint = names_fingerprint(names)
+    index = NameIndex.load(path) if path else None
+    if index is not None and index.fingerprint == fingerprint:
+        return index, False
+    index = NameIndex.build(names, fingerprint)
+    if path:
+        index.save(path)
+    return index, True
+
+
+class RestaurantSearch:
+    """
+    餐廳名稱搜尋
+
+    Args:
+        df: 餐廳數據（含 Restaurant_Name、Rating、Review_Count）
+        path: 索引檔路徑（None 表示不存檔）
+    """
+
+    def __init__(self, df, path=INDEX_FILE):
+        self.df = df
+        self.names = df['Restaurant_Name'].astype(str).to_numpy()
+        self.index, self.rebuilt = load_or_build(self.names, path)
+
+    def _ranked(self, rows, limit, similarity=None):
+        """依（相似度、）評分、評論數由高到低排序，取前 limit 筆"""
+        rating = self.df['Rating'].to_numpy()[rows]
+        reviews = self.df['Review_Count'].to_numpy()[rows]
+        keys = [-reviews, -rating] + ([] if similarity is None else [-similarity])
+        order = np.lexsort(keys)[:limit]
+        result = self.df.iloc[rows[order]].copy()
+        if similarity is not None:
+            result['Similarity'] = similarity[order]
+        return result
+
+    def search(self, query, limit=20):
+        """
+        店名包含 query 的餐廳（不分大小寫）
+
+        Returns:
+            依評分、評論數排序的 DataFrame
+        """
+        query = query.strip()
+        rows = self.index.candidates(query)
+        if len(query) > 1 and len(rows):
+            contains = pd.Series(self.names[rows]).str.lower().str.contains(
+                query.lower(), regex=False).to_numpy()
+            rows = rows[contains]
+        return self._ranked(rows, limit)
+
+    def fuzzy_search(self, query, limit=20, min_similarity=MIN_SIMILARITY):
+        """
+        與 query 相似的店名（共同 bigram 越多越相似）
+
+        Returns:
+            依相似度、評分、評論數排序的 DataFrame（含 Similarity 欄位）
+        """
+        rows, similarity = self.index.similar(query.strip(), min_similarity)
+        return self._ranked(rows, limit, similarity)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from restaurant_schema import DATA_FILE, load_restaurants
+
+    parser = argparse.ArgumentParser(description='餐廳名稱搜尋')
+    parser.add_argument('query', nargs='?', default='台式料理食堂', help='搜尋字串')
+    parser.add_argument('--data', default=DATA_FILE, help='餐廳數據 CSV')
+    parser.add_argument('--fuzzy', action='store_true', help='模糊搜尋')
+    parser.add_argument('--limit', type=int, default=10, help='顯示筆數')
+    args = parser.parse_args()
+
+    df = load_restaurants(args.data)
+    start = time.perf_counter()
+    searcher = RestaurantSearch(df)
+    action = '建立並儲存' if searcher.rebuilt else '載入'
+    print(f"[OK] 已{action}店名索引：{INDEX_FILE}（{time.perf_counter() - start:.2f} 秒）")
+
+    start = time.perf_counter()
+    if args.fuzzy:
+        result = searcher.fuzzy_search(args.query, args.limit)
+    else:
+        result = searcher.search(args.query, args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"\n[搜尋「{args.query}」]（{elapsed:.2f} 毫秒）")
+    print("-" * 60)
+    if result.empty:
+        print("  ✗ 找不到符合的餐廳")
+    for _, row in result.iterrows():
+        similarity = f" - 相似度 {row['Similarity']:.2f}" if args.fuzzy else ''
+        print(f"  {row['Restaurant_Name']} ({row['City']}) - {row['Rating']:.1f}星"
+              f" - {row['Review_Count']} 則評論{similarity}")
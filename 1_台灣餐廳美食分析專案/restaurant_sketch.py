@@ -0,0 +1,220 @@
+"""
+分位數草圖（KLL sketch）
+========================
+箱型圖需要四分位數、鬚線與離群點。直接把各組的全部數值交給 ax.boxplot，
+數千萬筆時必須保留並排序所有數值。KLL 草圖只保留數百筆「代表值」：
+
+- 第 h 層的每個值代表 2^h 筆原始數據
+- 某一層超過容量時排序後隔一筆取一筆（隨機從第 0 或第 1 筆開始）升到上一層
+- 越低的層容量越小（每往下一層乘以 2/3），總大小約為 3k
+- 排名誤差約為 1.7 / k（k = 256 時約 0.7%）；數據量不超過容量時為精確值
+
+草圖可以合併（同層直接串接後再壓縮），因此可以分批或平行建立後再合併，
+與一次讀入全部數據的結果相近。最小值與最大值另外精確記錄。
+"""
+
+import numpy as np
+
+DEFAULT_K = 256
+SEED = 42
+
+
+class QuantileSketch:
+    """
+    可合併的 KLL 分位數草圖
+
+    Args:
+        k: 最上層的容量（越大越精確，大小約 3k 個數值）
+        seed: 選擇升層起點的亂數種子
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=SEED):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values, k=DEFAULT_K, seed=SEED):
+        """由數值陣列建立草圖"""
+        sketch = cls(k, seed)
+        sketch.update(values)
+        return sketch
+
+    def __len__(self):
+        return self.count
+
+    def _capacity(self, height):
+        depth = len(self.levels) - 1 - height
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compact(self, height):
+        """第 height 層排序後隔一筆取一筆升到上一層（奇數筆時最小的一筆留在原層）"""
+        items = np.sort(self.levels[height])
+        keep, items = items[:len(items) % 2], items[len(items) % 2:]
+        promoted = items[self._rng.integers(2)::2]
+        if height + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+        self.levels[height] = keep
+        self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+
+    def _compress(self):
+        while True:
+            for height, items in enumerate(self.levels):
+                if len(items) > self._capacity(height):
+                    self._compact(height)
+                    break
+            else:
+                return
+
+    def update(self, values):
+        """加入一批數值（忽略 NaN）"""
+        values = np.asarray(values, dtype=float).reshape(-1)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """合併兩個草圖，回傳新的草圖（不修改原本的草圖）"""
+        result = QuantileSketch(max(self.k, other.k))
+        result._rng = self._rng
+        height = max(len(self.levels), len(other.levels))
+        result.levels = [np.concatenate([a[h] for a in (self.levels, other.levels) if h < len(a)])
+                         for h in range(height)]
+        result.count = self.count + other.count
+        result.min = min(self.min, other.min)
+        result.max = max(self.max, other.max)
+        result._compress()
+        return result
+
+    def update_digest(self, digest):
+        """把草圖內容寫入 hashlib 物件（判斷彙總結果是否變動）"""
+        digest.update(repr((self.k, self.count, float(self.min), float(self.max))).encode())
+        for level in self.levels:
+            digest.update(repr(len(level)).encode())
+            digest.update(np.ascontiguousarray(level, dtype=float).tobytes())
+
+    def _weighted(self):
+        """排序後的代表值與累積權重"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """
+        分位數（與 np.percentile 預設相同的線性內插；沒有數據時為 NaN）
+
+        Args:
+            q: 0-1 的數值或陣列
+        """
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        items, cumulative = self._weighted()
+        position = q * (cumulative[-1] - 1)
+        below = np.floor(position)
+
+        def value_at(rank):
+            # 排序後第 rank 筆（0 起算）對應的代表值
+            return items[np.minimum(np.searchsorted(cumulative, rank, side='right'), len(items) - 1)]
+
+        low, high = value_at(below), value_at(np.ceil(position))
+        result = np.clip(low + (position - below) * (high - low), self.min, self.max)
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result if result.ndim else result.item()
+
+    def box_stats(self, label=None, whis=1.5):
+        """
+        箱型圖統計量（可直接傳給 ax.bxp）
+
+        鬚線延伸到 1.5 倍 IQR 內最極端的代表值，之外的代表值（不重複）作為離群點
+
+        Returns:
+            dict：label、q1、med、q3、whislo、whishi、fliers、mean（沒有數據時為 None）
+        """
+        if self.count == 0:
+            return None
+        q1, med, q3 = self.quantile([0.25, 0.5, 0.75])
+        items, cumulative = self._weighted()
+        values = np.unique(np.concatenate([items, [self.min, self.max]]))
+        iqr = q3 - q1
+        inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+        low, high = (inside.min(), inside.max()) if len(inside) else (q1, q3)
+        weights = np.diff(cumulative, prepend=0)
+        return {'label': label, 'q1': q1, 'med': med, 'q3': q3,
+                'whislo': min(low, q1), 'whishi': max(high, q3),
+                'fliers': values[(values < low) | (values > high)],
+                'mean': np.average(items, weights=weights)}
+
+
+def merge_sketches(sketches):
+    """合併多個草圖（略過 None）；全部為 None 時回傳空草圖"""
+    result = None
+    for sketch in sketches:
+        if sketch is not None:
+            result = sketch if result is None else result.merge(sketch)
+    return QuantileSketch() if result is None else result
+
+
+def group_sketches(values, codes, groups, k=DEFAULT_K):
+    """
+    依組別代碼建立各組的草圖
+
+    Args:
+        values: 數值陣列
+        codes: 組別代碼（0 至 groups - 1，負數略過）
+        groups: 組數
+
+    Returns:
+        長度為 groups 的 object 陣列，沒有數據的組為 None
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.asarray(codes)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(groups + 1))
+    sketches = np.empty(groups, dtype=object)
+    for group, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        if stop > start:
+            sketches[group] = QuantileSketch.from_values(values[order[start:stop]], k)
+    return sketches
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from restaurant_schema import DATA_FILE, load_restaurants
+
+    parser = argparse.ArgumentParser(description='分位數草圖與精確分位數比較')
+    parser.add_argument('--data', default=DATA_FILE, help='餐廳數據 CSV')
+    parser.add_argument('--metric', default='Avg_Price', choices=['Rating', 'Avg_Price', 'Review_Count'])
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help='草圖大小')
+    args = parser.parse_args()
+
+    df = load_restaurants(args.data)
+    codes = df['City'].cat.codes.to_numpy()
+    start = time.perf_counter()
+    sketches = group_sketches(df[args.metric].to_numpy(), codes, len(df['City'].cat.categories), args.k)
+    elapsed = time.perf_counter() - start
+    print(f"[OK] 已建立 {len(df):,} 筆 {args.metric} 的各城市草圖（{elapsed:.2f} 秒）")
+
+    print(f"\n{'城市':<6}{'筆數':>12}{'代表值':>8}   Q1 / 中位數 / Q3（草圖）   Q1 / 中位數 / Q3（精確）")
+    print("-" * 90)
+    for city, sketch in zip(df['City'].cat.categories, sketches):
+        if sketch is None:
+            continue
+        exact = np.percentile(df.loc[df['City'] == city, args.metric], [25, 50, 75])
+        approx = sketch.quantile([0.25, 0.5, 0.75])
+        size = sum(len(level) for level in sketch.levels)
+        print(f"{city:<6}{len(sketch):>12,}{size:>8}   "
+              f"{' / '.join(f'{v:.1f}' for v in approx):<26}{' / '.join(f'{v:.1f}' for v in exact)}")
@@ -0,0 +1,284 @@
+"""
+餐廳空間索引
+============
+以經緯度建立均勻網格索引，回答：
+
+- 最近的 k 家餐廳（可限定餐廳類型、最低評分）
+- 指定半徑內的所有餐廳
+- 餐廳密度熱力圖
+
+建立索引時依網格編號排序所有餐廳，每個格子的餐廳在陣列中連續存放，並記錄
+每格的起始位置。網格編號 = 列 × 欄數 + 欄，同一列相鄰的格子也是連續的，
+查詢範圍內每一列只需一次切片就取得所有候選，不必掃描整個 DataFrame；
+候選再以 haversine 計算實際距離。
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180     # 緯度每度的公里數
+CELL_KM = 0.5                                     # 網格邊長（公里）
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """兩點的大圓距離（公里），參數可為陣列"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float))
+                              for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """
+    經緯度均勻網格索引
+
+    Args:
+        df: 含 Latitude、Longitude、Cuisine_Type、Rating 欄位的餐廳數據
+        cell_km: 網格邊長（公里）
+    """
+
+    def __init__(self, df, cell_km=CELL_KM):
+        if not {'Latitude', 'Longitude'} <= set(df.columns):
+            raise ValueError("數據沒有 Latitude / Longitude 欄位，請重新執行 generate_local_data.py")
+        self.df = df
+        lat = df['Latitude'].to_numpy(dtype=float)
+        lon = df['Longitude'].to_numpy(dtype=float)
+
+        # 經度方向每度的長度隨緯度縮短，以最靠近赤道的緯度計算格寬，
+        # 格子在各處都至少 cell_km 寬，查詢時多取的格子才不會漏掉餐廳
+        self.lat0, self.lon0 = lat.min(), lon.min()
+        self.dlat = cell_km / KM_PER_DEGREE
+        self.dlon = cell_km / (KM_PER_DEGREE * np.cos(np.radians(np.abs(lat).min())))
+        self.ny = int((lat.max() - self.lat0) / self.dlat) + 1
+        self.nx = int((lon.max() - self.lon0) / self.dlon) + 1
+
+        cell = self._cell_rows(lat) * self.nx + self._cell_cols(lon)
+        self.order = np.argsort(cell, kind='stable')
+        self.starts = np.concatenate([[0], np.cumsum(np.bincount(cell, minlength=self.ny * self.nx))])
+
+        # 依網格順序存放查詢需要的欄位
+        cuisine = df['Cuisine_Type'].astype('category')
+        self.cuisines = list(cuisine.cat.categories)
+        self.lat = lat[self.order]
+        self.lon = lon[self.order]
+        self.rating = df['Rating'].to_numpy(dtype=np.float32)[self.order]
+        self.cuisine = cuisine.cat.codes.to_numpy()[self.order]
+
+    def _cell_rows(self, lat):
+        return np.clip(((np.asarray(lat) - self.lat0) / self.dlat).astype(np.int64), 0, self.ny - 1)
+
+    def _cell_cols(self, lon):
+        return np.clip(((np.asarray(lon) - self.lon0) / self.dlon).astype(np.int64), 0, self.nx - 1)
+
+    def _mask(self, positions, cuisine, min_rating):
+        """候選位置的篩選條件"""
+        mask = np.ones(len(positions), dtype=bool)
+        if cuisine is not None:
+            names = [cuisine] if isinstance(cuisine, str) else list(cuisine)
+            unknown = set(names) - set(self.cuisines)
+            if unknown:
+                raise ValueError(f"未知的餐廳類型：{', '.join(sorted(unknown))}")
+            codes = [self.cuisines.index(name) for name in names]
+            mask &= np.isin(self.cuisine[positions], codes)
+        if min_rating is not None:
+            mask &= self.rating[positions] >= min_rating
+        return mask
+
+    def _within(self, lat, lon, radius_km, cuisine=None, min_rating=None):
+        """
+        半徑內的餐廳
+
+        Returns:
+            (網格順序中的位置, 距離公里)
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * np.cos(np.radians(min(abs(lat) + dlat, 89.0))))
+        row0, row1 = self._cell_rows([lat - dlat, lat + dlat])
+        col0, col1 = self._cell_cols([lon - dlon, lon + dlon])
+
+        # 每一列的格子 col0..col1 在陣列中連續，一次切片
+        first = np.arange(row0, row1 + 1) * self.nx
+        starts, stops = self.starts[first + col0], self.starts[first + col1 + 1]
+        lengths = stops - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+        positions = positions[self._mask(positions, cuisine, min_rating)]
+        distance = haversine_km(lat, lon, self.lat[positions], self.lon[positions])
+        keep = distance <= radius_km
+        return positions[keep], distance[keep]
+
+    def _result(self, positions, distance):
+        """網格位置轉回原始數據列，依距離排序並加入 Distance_km 欄位"""
+        order = np.argsort(distance, kind='stable')
+        result = self.df.iloc[self.order[positions[order]]].copy()
+        result['Distance_km'] = distance[order]
+        return result
+
+    def within_radius(self, lat, lon, radius_km, cuisine=None, min_rating=None):
+        """
+        半徑內的所有餐廳
+
+        Args:
+            lat, lon: 查詢位置
+            radius_km: 半徑（公里）
+            cuisine: 餐廳類型（字串或列表）
+            min_rating: 最低評分
+
+        Returns:
+            依距離排序的 DataFrame（含 Distance_km 欄位）
+        """
+        return self._result(*self._within(lat, lon, radius_km, cuisine, min_rating))
+
+    def nearest(self, lat, lon, k=5, cuisine=None, min_rating=None):
+        """
+        最近的 k 家餐廳
+
+        從約含 k 家餐廳的半徑開始，找到的家數不足 k 時半徑加倍；半徑內的餐廳
+        已全部找出，取最近的 k 家即為正確答案
+
+        Returns:
+            依距離排序的 DataFrame（含 Distance_km 欄位）
+        """
+        row, col = self._cell_rows(lat), self._cell_cols(lon)
+        per_cell = max(self.starts[row * self.nx + col + 1] - self.starts[row * self.nx + col], 1)
+        cell_km = self.dlat * KM_PER_DEGREE
+        radius = cell_km * max(np.sqrt(k / per_cell), 0.5)
+
+        # 到網格最遠角落的距離，超過仍不足 k 家時代表符合條件的餐廳全部找到了
+        lon_min, lon_max, lat_min, lat_max = self.extent()
+        max_radius = haversine_km(lat, lon, [lat_min, lat_min, lat_max, lat_max],
+                                  [lon_min, lon_max, lon_min, lon_max]).max()
+        while True:
+            positions, distance = self._within(lat, lon, radius, cuisine, min_rating)
+            if len(positions) >= k or radius >= max_radius:
+                break
+            radius *= 2
+
+        top = np.argpartition(distance, k - 1)[:k] if len(distance) > k else slice(None)
+        return self._result(positions[top], distance[top])
+
+    def density(self, cuisine=None, min_rating=None):
+        """
+        每個格子的餐廳數
+
+        Returns:
+            (ny, nx) 陣列，第 0 列為最南端
+        """
+        if cuisine is None and min_rating is None:
+            counts = np.diff(self.starts)
+        else:
+            positions = np.arange(len(self.order))
+            mask = self._mask(positions, cuisine, min_rating)
+            cell = np.repeat(np.arange(self.ny * self.nx), np.diff(self.starts))
+            counts = np.bincount(cell[mask], minlength=self.ny * self.nx)
+        return counts.reshape(self.ny, self.nx)
+
+    def extent(self):
+        """網格的經緯度範圍 (lon_min, lon_max, lat_min, lat_max)"""
+        return (self.lon0, self.lon0 + self.nx * self.dlon,
+                self.lat0, self.lat0 + self.ny * self.dlat)
+
+
+def plot_density_heatmap(index, cuisine=None, min_rating=None, margin_km=15):
+    """
+    繪製各城市的餐廳密度熱力圖
+
+    Args:
+        index: SpatialIndex
+        cuisine, min_rating: 只計算符合條件的餐廳
+        margin_km: 每個城市以中位數位置為中心、向外顯示的範圍
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    counts = index.density(cuisine, min_rating)
+    df = index.df
+    cities = list(pd.unique(df['City']))
+    ncols = min(len(cities), 2)
+    nrows = int(np.ceil(len(cities) / ncols))
+    fig, axes = plt.subplots(nrows, ncols, figsize=(8 * ncols, 7 * nrows), squeeze=False)
+
+    title = '餐廳密度熱力圖'
+    if cuisine is not None:
+        title += f"（{cuisine if isinstance(cuisine, str) else '、'.join(cuisine)}）"
+    if min_rating is not None:
+        title += f'（{min_rating} 星以上）'
+    fig.suptitle(title, fontsize=20, fontweight='bold')
+
+    cell_km = index.dlat * KM_PER_DEGREE
+    span = int(np.ceil(margin_km / cell_km))
+    for ax, city in zip(axes.flat, cities):
+        in_city = df['City'] == city
+        row = int(index._cell_rows(df.loc[in_city, 'Latitude'].median()))
+        col = int(index._cell_cols(df.loc[in_city, 'Longitude'].median()))
+        rows = slice(max(row - span, 0), min(row + span + 1, index.ny))
+        cols = slice(max(col - span, 0), min(col + span + 1, index.nx))
+        window = counts[rows, cols].astype(float)
+        window[window == 0] = np.nan
+
+        extent = (index.lon0 + cols.start * index.dlon, index.lon0 + cols.stop * index.dlon,
+                  index.lat0 + rows.start * index.dlat, index.lat0 + rows.stop * index.dlat)
+        image = ax.imshow(window, origin='lower', extent=extent, cmap='YlOrRd',
+                          norm=LogNorm(vmin=1, vmax=max(np.nanmax(window), 1)
+                                       if np.isfinite(window).any() else 1),
+                          aspect=1 / np.cos(np.radians((extent[2] + extent[3]) / 2)))
+        fig.colorbar(image, ax=ax, label=f'每格餐廳數（{cell_km:.1f} 公里見方）')
+        ax.set_title(city, fontsize=14, fontweight='bold')
+        ax.set_xlabel('經度', fontsize=12)
+        ax.set_ylabel('緯度', fontsize=12)
+    for ax in list(axes.flat)[len(cities):]:
+        ax.axis('off')
+
+    plt.tight_layout()
+    return fig
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import warnings
+
+    from restaurant_schema import DATA_FILE, load_restaurants
+
+    import matplotlib.pyplot as plt
+
+    warnings.filterwarnings('ignore')
+    plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'Arial Unicode MS', 'sans-serif']
+    plt.rcParams['axes.unicode_minus'] = False
+
+    parser = argparse.ArgumentParser(description='餐廳空間查詢')
+    parser.add_argument('--data', default=DATA_FILE, help='餐廳數據 CSV')
+    parser.add_argument('--cell-km', type=float, default=CELL_KM, help='網格邊長（公里）')
+    args = parser.parse_args()
+
+    df = load_restaurants(args.data)
+    start = time.perf_counter()
+    index = SpatialIndex(df, args.cell_km)
+    print(f"[OK] 已建立 {len(df):,} 家餐廳的空間索引"
+          f"（{index.ny} × {index.nx} 格，{time.perf_counter() - start:.2f} 秒）")
+
+    # 台北 101 附近評分 4.5 以上的日式料理
+    start = time.perf_counter()
+    result = index.nearest(25.0340, 121.5645, k=5, cuisine='日式料理', min_rating=4.5)
+    print(f"\n[台北 101 最近的 5 家 4.5 星以上日式料理]（{(time.perf_counter() - start) * 1000:.2f} 毫秒）")
+    for _, row in result.iterrows():
+        print(f"  {row['Restaurant_Name']} - {row['Rating']:.1f}星 - {row['Distance_km']:.2f} 公里")
+
+    # 台南車站 1 公里內的小吃
+    start = time.perf_counter()
+    result = index.within_radius(22.9971, 120.2126, 1.0, cuisine='小吃')
+    print(f"\n[台南車站 1 公里內的小吃] 共 {len(result):,} 家"
+          f"（{(time.perf_counter() - start) * 1000:.2f} 毫秒）")
+    for _, row in result.head(5).iterrows():
+        print(f"  {row['Restaurant_Name']} - {row['Rating']:.1f}星 - {row['Distance_km']:.2f} 公里")
+
+    fig = plot_density_heatmap(index)
+    os.makedirs('output', exist_ok=True)
+    fig.savefig('output/餐廳密度熱力圖.png', dpi=300, bbox_inches='tight', facecolor='white')
+    print("\n[OK] 已儲存：output/餐廳密度熱力圖.png")
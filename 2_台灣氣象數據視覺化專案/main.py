@@ -10,6 +10,9 @@
 4. 地區比較
 5. 季節性分析
 6. 熱力圖視覺化
+
+載入時把數據依城市分區（每個城市一段連續、依日期排序的列），
+逐城市的圖表與統計直接取用切片，不必每次以 df['City'] == city 掃描整份數據。
 """
 
 import matplotlib.pyplot as plt
@@ -25,6 +28,58 @@ warnings.filterwarnings('ignore')
 plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'Arial Unicode MS', 'sans-serif']
 plt.rcParams['axes.unicode_minus'] = False
 
+MONTH_NAMES = np.array([f'{i:02d}月' for i in range(1, 13)])
+# 依月份查表（索引 0 不使用）：3-5 月春季、6-8 月夏季、9-11 月秋季，其餘冬季
+SEASONS = np.array(['冬季'] * 3 + ['春季'] * 3 + ['夏季'] * 3 + ['秋季'] * 3 + ['冬季'])
+
+def partition_by_city(df):
+    """
+    依城市分區：同一城市的數據排在一起（城市依首次出現的順序），城市內依日期排序
+
+    原本已經分區的數據直接回傳，不重新排列
+    """
+    codes, _ = pd.factorize(df['City'])
+    dates = df['Date'].to_numpy()
+    if (np.all(codes[1:] >= codes[:-1])
+            and np.all((codes[1:] > codes[:-1]) | (dates[1:] >= dates[:-1]))):
+        return df
+    order = np.lexsort((dates, codes))
+    return df.take(order).reset_index(drop=True)
+
+class CityPartitions:
+    """
+    已分區數據（見 partition_by_city）的城市索引
+
+    第 i 個城市的數據為第 offsets[i] 至 offsets[i + 1] 列，
+    取得單一城市的數據只是切片（不複製數據）
+
+    Args:
+        df: 已依城市分區的氣象數據
+    """
+
+    def __init__(self, df):
+        city = df['City'].to_numpy()
+        starts = np.flatnonzero(city[1:] != city[:-1]) + 1
+        bounds = np.concatenate([[0], starts, [len(df)]]) if len(df) else np.zeros(1, dtype=np.int64)
+        self.df = df
+        self.cities = list(city[bounds[:-1]])
+        self.offsets = bounds
+        if len(set(self.cities)) != len(self.cities):
+            raise ValueError("數據尚未依城市分區，請先使用 partition_by_city")
+        self._positions = {name: i for i, name in enumerate(self.cities)}
+
+    def __len__(self):
+        return len(self.cities)
+
+    def __iter__(self):
+        """依分區順序逐一回傳（城市, 該城市的數據）"""
+        for i, city in enumerate(self.cities):
+            yield city, self.df.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, city):
+        i = self._positions[city]
+        return self.df.iloc[self.offsets[i]:self.offsets[i + 1]]
+
 def load_weather_data():
     """載入氣象數據"""
     print("正在載入氣象數據...")
@@ -39,22 +94,16 @@ def load_weather_data():
     df = pd.read_csv(filename)
     df['Date'] = pd.to_datetime(df['Date'])
 
+    # 依城市分區、城市內依日期排序
+    df = partition_by_city(df)
+
     # 新增月份欄位
     df['Month'] = df['Date'].dt.month
-    df['Month_Name'] = df['Date'].dt.strftime('%m月')
+    month = df['Month'].to_numpy()
+    df['Month_Name'] = MONTH_NAMES[month - 1]
 
     # 新增季節欄位
-    def get_season(month):
-        if month in [3, 4, 5]:
-            return '春季'
-        elif month in [6, 7, 8]:
-            return '夏季'
-        elif month in [9, 10, 11]:
-            return '秋季'
-        else:
-            return '冬季'
-
-    df['Season'] = df['Month'].apply(get_season)
+    df['Season'] = SEASONS[month]
 
     print(f"[OK] 數據載入成功")
     print(f"  時間範圍：{df['Date'].min().strftime('%Y-%m-%d')} 至 {df['Date'].max().strftime('%Y-%m-%d')}")
@@ -63,19 +112,21 @@ def load_weather_data():
 
     return df
 
-def plot_temperature_trends(df):
+def plot_temperature_trends(df, partitions=None):
     """繪製溫度趨勢圖"""
     print("\n正在繪製溫度趨勢圖...")
 
+    if partitions is None:
+        partitions = CityPartitions(partition_by_city(df))
+
     fig, axes = plt.subplots(2, 1, figsize=(16, 10))
     fig.suptitle('台灣各地溫度趨勢分析（2024年）', fontsize=18, fontweight='bold', y=0.995)
 
-    cities = df['City'].unique()
+    cities = partitions.cities
     colors = plt.cm.Set2(np.linspace(0, 1, len(cities)))
 
     # 子圖1：每日平均溫度
-    for i, city in enumerate(cities):
-        city_data = df[df['City'] == city]
+    for i, (city, city_data) in enumerate(partitions):
         axes[0].plot(city_data['Date'], city_data['Temp_Avg'],
                     label=city, linewidth=2, color=colors[i], alpha=0.8)
 
@@ -111,19 +162,21 @@ def plot_temperature_trends(df):
 
     return fig
 
-def plot_rainfall_analysis(df):
+def plot_rainfall_analysis(df, partitions=None):
     """繪製降雨量分析圖"""
     print("正在繪製降雨量分析圖...")
 
+    if partitions is None:
+        partitions = CityPartitions(partition_by_city(df))
+
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle('台灣各地降雨量分析（2024年）', fontsize=18, fontweight='bold', y=0.995)
 
-    cities = df['City'].unique()
+    cities = partitions.cities
     colors = plt.cm.Set2(np.linspace(0, 1, len(cities)))
 
-    # 子圖1：累計降雨量趨勢
-    for i, city in enumerate(cities):
-        city_data = df[df['City'] == city].sort_values('Date')
+    # 子圖1：累計降雨量趨勢（分區內已依日期排序）
+    for i, (city, city_data) in enumerate(partitions):
         cumulative_rainfall = city_data['Rainfall'].cumsum()
         axes[0, 0].plot(city_data['Date'], cumulative_rainfall,
                        label=city, linewidth=2, color=colors[i], alpha=0.8)
@@ -323,16 +376,18 @@ def plot_city_comparison(df):
 
     return fig
 
-def print_statistics(df):
+def print_statistics(df, partitions=None):
     """輸出統計報告"""
     print("\n" + "="*70)
     print("[報告] 台灣氣象數據分析報告")
     print("="*70)
 
-    cities = sorted(df['City'].unique())
+    if partitions is None:
+        partitions = CityPartitions(partition_by_city(df))
+    cities = sorted(partitions.cities)
 
     for city in cities:
-        city_data = df[df['City'] == city]
+        city_data = partitions[city]
 
         print(f"\n【{city}】")
         print("-"*70)
@@ -345,11 +400,12 @@ def print_statistics(df):
         print(f"    溫度範圍：{city_data['Temp_Max'].max() - city_data['Temp_Min'].min():.1f}°C")
 
         # 降雨統計
-        rainy_days = (city_data['Rainfall'] > 0).sum()
+        rainfall = city_data['Rainfall']
+        rainy = rainfall > 0
         print(f"\n  降雨統計：")
-        print(f"    總降雨量：{city_data['Rainfall'].sum():.1f} mm")
-        print(f"    降雨天數：{rainy_days} 天")
-        print(f"    平均每次降雨：{city_data[city_data['Rainfall'] > 0]['Rainfall'].mean():.1f} mm")
+        print(f"    總降雨量：{rainfall.sum():.1f} mm")
+        print(f"    降雨天數：{rainy.sum()} 天")
+        print(f"    平均每次降雨：{rainfall[rainy].mean():.1f} mm")
 
         # 濕度統計
         print(f"\n  濕度統計：")
@@ -399,14 +455,15 @@ def main():
     df = load_weather_data()
     if df is None:
         return
+    partitions = CityPartitions(df)
 
     # 繪製圖表
     figures = []
 
-    fig1 = plot_temperature_trends(df)
+    fig1 = plot_temperature_trends(df, partitions)
     figures.append(fig1)
 
-    fig2 = plot_rainfall_analysis(df)
+    fig2 = plot_rainfall_analysis(df, partitions)
     figures.append(fig2)
 
     fig3 = plot_heatmaps(df)
@@ -416,7 +473,7 @@ def main():
     figures.append(fig4)
 
     # 輸出統計報告
-    print_statistics(df)
+    print_statistics(df, partitions)
 
     # 儲存報表
     save_reports(figures)
@@ -0,0 +1,220 @@
+"""
+技術指標效能基準測試
+====================
+以模擬 OHLCV 數據（1e3 至 1e7 筆、1 至 5,000 檔股票）測量：
+
+- calculate_ma / calculate_macd / calculate_rsi / calculate_bollinger_bands 的執行時間
+- main() 不含繪圖的完整流程：從數據倉儲載入 → 建立面板 → 計算指標 → 統計報告
+- 每個步驟的記憶體峰值（tracemalloc，另跑一次量測，不影響計時）
+
+結果寫成 JSON，兩次執行的結果可以直接 diff，或以 --compare 列出倍數變化。
+
+使用方式：
+    python benchmark.py                         # 快速版（最多 1e6 筆）
+    python benchmark.py --full                  # 完整版（最多 1e7 筆、5,000 檔）
+    python benchmark.py --compare output/benchmark_舊版.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from generate_local_data import generate_stocks, market_factors, universe_codes
+from indicator_engine import build_panel, compute_indicators
+from main import (calculate_bollinger_bands, calculate_ma, calculate_macd, calculate_rsi,
+                  print_statistics)
+from ohlcv_store import load_catalog, read_many, save_catalog, write_stock
+
+RESULT_FILE = 'output/benchmark.json'
+
+QUICK_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+FULL_ROWS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+QUICK_TICKERS = [1, 10, 100, 1_000]
+FULL_TICKERS = [1, 10, 100, 1_000, 5_000]
+MIN_DAYS = 60                  # 每檔股票至少的筆數（指標需要暖身期）
+MAX_DAILY_BARS = 50_000        # 超過此筆數改用分 K 時間軸（日 K 會超出日期範圍）
+
+INDICATORS = {
+    'calculate_ma': calculate_ma,
+    'calculate_macd': calculate_macd,
+    'calculate_rsi': calculate_rsi,
+    'calculate_bollinger_bands': calculate_bollinger_bands,
+}
+
+
+def benchmark_cases(full=False):
+    """(總筆數, 股票數) 組合，排除每檔股票筆數不足 MIN_DAYS 者"""
+    rows_list, tickers_list = (FULL_ROWS, FULL_TICKERS) if full else (QUICK_ROWS, QUICK_TICKERS)
+    return [(rows, tickers) for rows in rows_list for tickers in tickers_list
+            if rows // tickers >= MIN_DAYS]
+
+
+def synthetic_stocks(rows, tickers):
+    """
+    生成模擬股票數據（格式與 load_stock_data 相同）
+
+    Returns:
+        {股票代碼: 以 Date 為索引的 DataFrame}
+    """
+    days = rows // tickers
+    freq = 'B' if days <= MAX_DAILY_BARS else 'min'
+    dates = pd.date_range('2000-01-03', periods=days, freq=freq, name='Date')
+    frames = generate_stocks(universe_codes(tickers), dates, market_factors(days))
+    return {df['Stock_Code'].iloc[0]: df.set_index('Date') for df in frames}
+
+
+def _write_store(stocks_data, root):
+    """將模擬數據寫入暫存的數據倉儲"""
+    catalog = load_catalog(root)
+    for code, df in stocks_data.items():
+        write_stock(df, code, df['Stock_Name'].iloc[0], root=root, catalog=catalog)
+    save_catalog(catalog, root)
+
+
+def _pipeline(load):
+    """main() 不含繪圖的流程（load 回傳 {股票代碼: DataFrame}）"""
+    stocks_data = load()
+    panel = compute_indicators(build_panel(stocks_data))
+    with contextlib.redirect_stdout(io.StringIO()):
+        print_statistics(panel)
+    return panel
+
+
+def _time(func, repeat):
+    """執行 repeat 次，回傳最短秒數"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_memory(func):
+    """執行一次，回傳記憶體峰值（MB）"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 ** 2
+
+
+def run_case(rows, tickers, repeat=3, memory=True):
+    """
+    測量單一 (總筆數, 股票數) 組合
+
+    Returns:
+        每個步驟一筆的 dict 列表
+    """
+    stocks_data = synthetic_stocks(rows, tickers)
+    codes = list(stocks_data)
+
+    steps = {}
+    for name, func in INDICATORS.items():
+        steps[name] = lambda func=func: [func(df) for df in stocks_data.values()]
+
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        # 數據倉儲只存日 K；分 K 組合改由記憶體中的數據進入流程
+        if rows // tickers <= MAX_DAILY_BARS:
+            _write_store(stocks_data, root)
+            steps['load_store'] = lambda: read_many(codes, root=root)
+            steps['main_pipeline'] = lambda: _pipeline(lambda: read_many(codes, root=root))
+        else:
+            steps['main_pipeline'] = lambda: _pipeline(lambda: stocks_data)
+
+        # 大型組合只跑一次
+        n = repeat if rows < 1_000_000 else 1
+        for step, func in steps.items():
+            seconds = _time(func, n)
+            results.append({
+                'rows': rows,
+                'tickers': tickers,
+                'step': step,
+                'seconds': round(seconds, 6),
+                'rows_per_second': round(rows / seconds),
+                'peak_mb': round(_peak_memory(func), 2) if memory else None,
+            })
+    return results
+
+
+def environment():
+    """執行環境資訊（比較兩次結果時參考）"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': pd.Timestamp.now().isoformat(timespec='seconds'),
+    }
+
+
+def run_benchmarks(full=False, repeat=3, memory=True, output=RESULT_FILE):
+    """執行所有組合並寫入 JSON"""
+    results = []
+    for rows, tickers in benchmark_cases(full):
+        print(f"\n{rows:,} 筆 × {tickers:,} 檔")
+        for record in run_case(rows, tickers, repeat, memory):
+            results.append(record)
+            peak = '' if record['peak_mb'] is None else f"  峰值 {record['peak_mb']:,.1f} MB"
+            print(f"  {record['step']:<27}{record['seconds']:>10.4f} 秒{peak}")
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # 每筆結果一行，兩次執行的檔案可以逐行 diff
+    lines = ',\n'.join('  ' + json.dumps(record) for record in results)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        f.write(f' "environment": {json.dumps(environment(), ensure_ascii=False)},\n')
+        f.write(f' "results": [\n{lines}\n ]\n}}\n')
+    print(f"\n[OK] 已儲存：{output}")
+    return results
+
+
+def compare_results(old_path, new_path=RESULT_FILE):
+    """
+    比較兩次基準測試結果
+
+    Returns:
+        DataFrame：每個 (筆數, 股票數, 步驟) 的新舊秒數與倍數（新 / 舊）
+    """
+    frames = []
+    for label, path in [('old', old_path), ('new', new_path)]:
+        with open(path, encoding='utf-8') as f:
+            df = pd.DataFrame(json.load(f)['results'])
+        frames.append(df.set_index(['rows', 'tickers', 'step'])[['seconds', 'peak_mb']]
+                      .add_prefix(f'{label}_'))
+
+    table = pd.concat(frames, axis=1, join='inner')
+    table['ratio'] = table['new_seconds'] / table['old_seconds']
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='技術指標效能基準測試')
+    parser.add_argument('--full', action='store_true', help='完整版（最多 1e7 筆、5,000 檔）')
+    parser.add_argument('--repeat', type=int, default=3, help='每個步驟重複次數（取最短）')
+    parser.add_argument('--no-memory', action='store_true', help='不量測記憶體峰值')
+    parser.add_argument('--output', default=RESULT_FILE, help='結果 JSON 路徑')
+    parser.add_argument('--compare', help='與先前的結果 JSON 比較（不重新執行）')
+    args = parser.parse_args()
+
+    if args.compare:
+        table = compare_results(args.compare, args.output)
+        print(table.to_string(float_format=lambda x: f'{x:,.4f}'))
+    else:
+        run_benchmarks(args.full, args.repeat, not args.no_memory, args.output)
@@ -0,0 +1,94 @@
+"""
+橫斷面（多檔股票）分析
+======================
+以「日期 × 股票」價格矩陣一次計算所有股票的比較指標：
+
+- 標準化價格、平均成交量、日波動率、累計報酬率
+- 報酬率相關係數矩陣
+- 相對指定指數（或等權市場指數）的滾動 Beta
+"""
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import first_valid, last_valid
+
+
+def daily_returns(close):
+    """日報酬率（日期 × 股票）"""
+    return close.pct_change(fill_method=None)
+
+
+def normalized_prices(close):
+    """標準化價格（每檔股票第一天 = 100）"""
+    return close / first_valid(close) * 100
+
+
+def cross_sectional_metrics(panel):
+    """
+    計算每檔股票的比較指標
+
+    Returns:
+        DataFrame（索引為股票代碼）：Name、Avg_Volume（萬張）、
+        Volatility（日波動率 %）、Total_Return（%）
+    """
+    close = panel['Close']
+    first_close = first_valid(close)
+    return pd.DataFrame({
+        'Name': pd.Series(panel.names).reindex(panel.codes),
+        'Avg_Volume': panel['Volume'].mean() / 1000,
+        'Volatility': daily_returns(close).std() * 100,
+        'Total_Return': (last_valid(close) - first_close) / first_close * 100,
+    })
+
+
+def return_correlation(close):
+    """
+    報酬率相關係數矩陣（股票 × 股票）
+
+    以矩陣乘法一次算出所有配對；缺值日以 0 代替去平均後的報酬
+    """
+    returns = daily_returns(close).to_numpy()
+    valid = ~np.isnan(returns)
+    demeaned = np.where(valid, returns - np.nanmean(returns, axis=0), 0.0)
+
+    cov = demeaned.T @ demeaned
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    return pd.DataFrame(corr, index=close.columns, columns=close.columns)
+
+
+def market_returns(close, benchmark=None):
+    """
+    基準指數的日報酬率
+
+    Args:
+        close: 收盤價（日期 × 股票）
+        benchmark: None 表示等權市場指數；股票代碼表示以該股為基準；
+                   或直接傳入基準指數的價格 Series
+    """
+    if benchmark is None:
+        return daily_returns(close).mean(axis=1)
+    if isinstance(benchmark, pd.Series):
+        return benchmark.reindex(close.index).pct_change(fill_method=None)
+    return daily_returns(close[benchmark])
+
+
+def rolling_beta(close, benchmark=None, window=60):
+    """
+    相對基準指數的滾動 Beta（日期 × 股票）
+
+    Beta = Cov(個股, 指數) / Var(指數)，以滾動平均一次算出所有股票
+    """
+    returns = daily_returns(close)
+    market = market_returns(close, benchmark)
+
+    mean_xy = returns.mul(market, axis=0).rolling(window).mean()
+    mean_x = returns.rolling(window).mean()
+    mean_y = market.rolling(window).mean()
+    var_y = market.rolling(window).var(ddof=0)
+
+    cov = mean_xy.sub(mean_x.mul(mean_y, axis=0))
+    return cov.div(var_y, axis=0)
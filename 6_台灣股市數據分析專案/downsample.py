@@ -0,0 +1,195 @@
+"""
+圖表降採樣
+==========
+長時間序列（多年日 K 或分 K）畫成折線時，點數遠多於座標軸的像素，
+只會拖慢繪圖。本模組把序列縮減到約等於座標軸寬度的點數，並保留高低點：
+
+- lttb：Largest-Triangle-Three-Buckets，視覺上最接近原曲線
+- minmax：每個區間保留最高與最低點（完全向量化，最快）
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def axis_pixel_width(ax):
+    """座標軸的寬度（像素）"""
+    return max(int(ax.get_window_extent().width), 2)
+
+
+def minmax_indices(y, n_out):
+    """
+    min/max 分桶降採樣
+
+    Args:
+        y: 數值陣列
+        n_out: 輸出點數上限（每個區間 2 點）
+
+    Returns:
+        保留資料點的索引（遞增排序）
+    """
+    n = len(y)
+    n_buckets = n_out // 2
+    if n <= n_out or n_buckets < 1:
+        return np.arange(n)
+
+    # 補到可整除的長度，補上的位置不會被選中
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+
+    offsets = np.arange(n_buckets) * size
+    lo = np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1) + offsets
+    hi = np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1) + offsets
+    idx = np.unique(np.concatenate([[0], lo, hi, [n - 1]]))
+    return idx[idx < n]
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降採樣
+
+    Args:
+        x: 遞增的 x 值（數值）
+        y: 數值陣列
+        n_out: 輸出點數
+
+    Returns:
+        保留資料點的索引（遞增排序）
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # 第一與最後一點固定保留，其餘分成 n_out - 2 個區間
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        # 與前一個選取點、下一區間平均點構成的三角形面積最大者
+        area = np.abs((x[a] - next_x) * (y[start:stop] - y[a])
+                      - (x[a] - x[start:stop]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+
+    return idx
+
+
+def downsample_series(series, n_out, method='lttb'):
+    """
+    將以日期為索引的 Series 降採樣到約 n_out 點（缺值先移除）
+
+    Args:
+        series: pandas Series
+        n_out: 目標點數（通常為座標軸像素寬度）
+        method: 'lttb' 或 'minmax'
+    """
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+
+    if method == 'minmax':
+        idx = minmax_indices(series.to_numpy(dtype=float), n_out)
+    else:
+        x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+        idx = lttb_indices(x, series.to_numpy(dtype=float), n_out)
+    return series.iloc[idx]
+
+
+def bucket_edges(n, n_out):
+    """
+    將 n 筆資料切成至多 n_out 個等長區間
+
+    Returns:
+        (每個區間的起始索引, 結束索引（不含）)
+    """
+    size = max(-(-n // n_out), 1)
+    starts = np.arange(0, n, size)
+    stops = np.minimum(starts + size, n)
+    return starts, stops
+
+
+def bucket_bars(values, n_out, how='max'):
+    """
+    將長條圖數據分桶彙總（例如成交量、MACD 柱狀圖）
+
+    Args:
+        values: 數值陣列
+        n_out: 區間數上限
+        how: 'max' 取區間最大值；'extreme' 取絕對值最大者（保留正負號）
+
+    Returns:
+        (區間起始索引, 區間結束索引（不含）, 彙總值)
+    """
+    values = np.asarray(values, dtype=float)
+    starts, stops = bucket_edges(len(values), n_out)
+    size = stops[0] - starts[0]
+
+    padded = np.full(len(starts) * size, np.nan)
+    padded[:len(values)] = values
+    buckets = padded.reshape(len(starts), size)
+
+    if how == 'extreme':
+        pick = np.argmax(np.where(np.isnan(buckets), -np.inf, np.abs(buckets)), axis=1)
+        agg = buckets[np.arange(len(starts)), pick]
+    else:
+        agg = np.max(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    return starts, stops, agg
+
+
+def bar_buckets(index, values, max_bars, how='max'):
+    """
+    長條圖數據：筆數超過 max_bars 時分桶彙總，否則原樣回傳
+
+    Args:
+        index: 日期索引
+        values: 數值
+        max_bars: 長條數上限（通常為座標軸像素寬度的一半）
+        how: 分桶彙總方式，見 bucket_bars
+
+    Returns:
+        (長條中心日期, 高度, 寬度（天）, 區間起始索引, 區間結束索引（不含）)
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) <= max_bars:
+        starts = np.arange(len(values))
+        stops = starts + 1
+        heights = values
+    else:
+        starts, stops, heights = bucket_bars(values, max_bars, how)
+
+    first = index[starts]
+    last = index[stops - 1]
+    centers = first + (last - first) / 2
+    widths = (last - first) / pd.Timedelta(days=1) + 0.8
+    return centers, heights, np.asarray(widths), starts, stops
+
+
+def fill_band(ax, lower, upper, max_points, **kwargs):
+    """fill_between 的降採樣版本：上下界取 min/max 索引的聯集，保留通道的極值"""
+    band = pd.concat([lower.rename('lower'), upper.rename('upper')], axis=1).dropna()
+    if len(band) > max_points:
+        idx = np.union1d(minmax_indices(band['lower'].to_numpy(), max_points),
+                         minmax_indices(band['upper'].to_numpy(), max_points))
+        band = band.iloc[idx]
+    return ax.fill_between(band.index, band['lower'], band['upper'], **kwargs)
+
+
+def plot_line(ax, series, max_points, *args, **kwargs):
+    """繪製折線；點數超過 max_points 時先以 LTTB 降採樣"""
+    series = downsample_series(series, max_points)
+    return ax.plot(series.index, series, *args, **kwargs)
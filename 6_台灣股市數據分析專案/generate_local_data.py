@@ -1,108 +1,227 @@
 """
 生成台灣股市本地數據
 ====================
-生成台積電(2330)、鴻海(2317)、聯發科(2454)的模擬股價數據
+生成台積電(2330)、鴻海(2317)、聯發科(2454)的模擬股價數據；
+也可生成數千檔股票、十年以上的模擬市場，用來測試分析流程的效能。
+
+- 交易日曆以 pd.bdate_range 一次產生
+- 報酬率採「市場因子 + 產業因子 + 個股雜訊」模型，整批股票以一次矩陣運算算出，
+  同產業的股票彼此相關
+- 每檔股票的亂數只由 (SEED, 股票代碼) 決定，任一子集合單獨重新生成的結果都相同
+- 分批生成並寫入數據倉儲，記憶體用量只與批次大小有關
+
+使用方式：
+    python generate_local_data.py                               # 三檔熱門股票、250 天
+    python generate_local_data.py --stocks 3000 --years 10      # 3000 檔、10 年
+    python generate_local_data.py --years 10 --codes 2330,1101  # 只重新生成指定股票
 """
 
-import pandas as pd
+import argparse
+
 import numpy as np
-from datetime import datetime, timedelta
+import pandas as pd
 
-np.random.seed(42)
+from ohlcv_store import STORE_DIR, load_catalog, save_catalog, write_stock
 
-def generate_stock_data(stock_name, stock_code, base_price, volatility, days=365):
-    """
-    生成單一股票的模擬數據
+SEED = 42
+START_DATE = '2024-01-02'
+DAYS_PER_YEAR = 261           # 一年的工作日數
 
-    Args:
-        stock_name: 股票名稱
-        stock_code: 股票代碼
-        base_price: 基準價格
-        volatility: 波動率
-        days: 天數
-    """
-    print(f"正在生成 {stock_name}({stock_code}) 的數據...")
-
-    # 建立日期範圍（只包含工作日）
-    start_date = datetime(2024, 1, 2)
-    all_dates = []
-    current_date = start_date
-
-    while len(all_dates) < days:
-        # 跳過週末
-        if current_date.weekday() < 5:  # 0-4 是週一到週五
-            all_dates.append(current_date)
-        current_date += timedelta(days=1)
-
-    dates = pd.DatetimeIndex(all_dates)
-
-    # 生成價格數據（使用隨機遊走 + 趨勢）
-    returns = np.random.normal(0.001, volatility, len(dates))  # 平均上漲 0.1%
-
-    # 加入趨勢和周期性
-    trend = np.linspace(0, 0.3, len(dates))  # 整體上漲趨勢 30%
-    cycle = np.sin(np.arange(len(dates)) * 2 * np.pi / 60) * 0.05  # 60天週期
-
-    cumulative_returns = np.cumsum(returns) + trend + cycle
-    close_prices = base_price * (1 + cumulative_returns)
-
-    # 生成 Open, High, Low 價格
-    open_prices = close_prices * (1 + np.random.uniform(-0.01, 0.01, len(dates)))
-    high_prices = np.maximum(open_prices, close_prices) * (1 + np.random.uniform(0, 0.02, len(dates)))
-    low_prices = np.minimum(open_prices, close_prices) * (1 - np.random.uniform(0, 0.02, len(dates)))
-
-    # 生成成交量（單位：千股）
-    base_volume = 50000  # 5萬張
-    volumes = base_volume * (1 + np.random.uniform(-0.3, 0.5, len(dates)))
-
-    # 建立 DataFrame
-    df = pd.DataFrame({
-        'Date': dates,
-        'Open': open_prices,
-        'High': high_prices,
-        'Low': low_prices,
-        'Close': close_prices,
-        'Volume': volumes.astype(int),
-        'Stock_Code': stock_code,
-        'Stock_Name': stock_name
-    })
-
-    return df
-
-print("="*60)
-print("台灣股市數據生成工具")
-print("="*60)
-
-# 生成三檔熱門股票的數據
-stocks = [
+N_SECTORS = 10
+MARKET_WEIGHT = 0.5           # 標準化報酬中市場因子的權重
+SECTOR_WEIGHT = 0.4           # 產業因子的權重（同產業相關係數 0.41，跨產業 0.25）
+CYCLE_DAYS = 60               # 價格週期（天）
+
+# 熱門股票：(股票名稱, 代碼, 基準價, 波動率)
+STOCKS = [
     ('台積電', '2330', 600, 0.015),   # 基準價 600, 波動率 1.5%
     ('鴻海', '2317', 100, 0.020),     # 基準價 100, 波動率 2.0%
-    ('聯發科', '2454', 800, 0.025)    # 基準價 800, 波動率 2.5%
+    ('聯發科', '2454', 800, 0.025),   # 基準價 800, 波動率 2.5%
 ]
 
-all_data = []
-
-for stock_name, stock_code, base_price, volatility in stocks:
-    df = generate_stock_data(stock_name, stock_code, base_price, volatility, days=250)
-    all_data.append(df)
-
-    # 儲存個別股票數據
-    filename = f'data/{stock_code}_{stock_name}.csv'
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"  [OK] 已儲存: {filename}")
-    print(f"  - 數據天數: {len(df)} 天")
-    print(f"  - 價格範圍: {df['Close'].min():.2f} - {df['Close'].max():.2f}")
-    print(f"  - 平均成交量: {df['Volume'].mean():,.0f} 千股")
-    print()
-
-# 合併所有數據
-combined_df = pd.concat(all_data, ignore_index=True)
-combined_df.to_csv('data/all_stocks.csv', index=False, encoding='utf-8-sig')
-print(f"[OK] 已儲存合併數據: data/all_stocks.csv")
-
-print("\n" + "="*60)
-print("數據生成完成！")
-print("="*60)
-print(f"\n總共生成 {len(stocks)} 檔股票的數據")
-print(f"時間範圍: {all_data[0]['Date'].min().strftime('%Y-%m-%d')} 至 {all_data[0]['Date'].max().strftime('%Y-%m-%d')}")
-print("\n可以開始執行 main.py 進行分析！")
+
+def trading_calendar(start=START_DATE, days=250):
+    """交易日曆（只包含週一至週五）"""
+    return pd.bdate_range(start, periods=days, name='Date')
+
+
+def universe_codes(n_stocks):
+    """股票代碼：熱門股票在前，其餘從 1101 起依序編號"""
+    featured = [code for _, code, _, _ in STOCKS]
+    others = np.arange(1101, 1101 + n_stocks + len(featured)).astype(str)
+    others = others[~np.isin(others, featured)]
+    return (featured + others.tolist())[:n_stocks]
+
+
+def market_factors(days, seed=SEED):
+    """市場與各產業的標準化因子報酬（天數 × (1 + 產業數)），所有股票共用"""
+    return np.random.default_rng([seed, 0]).standard_normal((days, 1 + N_SECTORS))
+
+
+def _ticker_draws(stock_code, days, seed=SEED):
+    """
+    單一股票的參數與亂數，只由種子與股票代碼決定
+
+    Returns:
+        (參數 dict, 亂數陣列 (5, 天數)：個股雜訊、開盤、最高、最低、成交量)
+    """
+    rng = np.random.default_rng([seed, int(stock_code)])
+
+    profile = {
+        'name': f'模擬{stock_code}',
+        'sector': int(rng.integers(N_SECTORS)),
+        'base_price': float(np.exp(rng.uniform(np.log(10), np.log(1000)))),
+        'volatility': float(rng.uniform(0.01, 0.03)),
+        'drift': float(rng.normal(0.0003, 0.0005)),
+        'base_volume': float(np.exp(rng.uniform(np.log(500), np.log(80000)))),
+        'phase': float(rng.uniform(0, 2 * np.pi)),
+    }
+    for stock_name, code, base_price, volatility in STOCKS:
+        if code == str(stock_code):
+            profile.update(name=stock_name, base_price=base_price, volatility=volatility,
+                           drift=0.001, base_volume=50000, phase=0.0)  # 平均上漲 0.1%、5萬張
+
+    draws = np.stack([
+        rng.standard_normal(days),
+        rng.uniform(-0.01, 0.01, days),
+        rng.uniform(0, 0.02, days),
+        rng.uniform(0, 0.02, days),
+        rng.uniform(-0.3, 0.5, days),
+    ])
+    return profile, draws
+
+
+def generate_stocks(stock_codes, dates, factors, seed=SEED):
+    """
+    生成一批股票的模擬數據
+
+    Args:
+        stock_codes: 股票代碼列表
+        dates: 交易日曆
+        factors: market_factors() 的結果
+        seed: 亂數種子
+
+    Returns:
+        每檔股票的 DataFrame 列表
+    """
+    days = len(dates)
+    profiles, draws = zip(*(_ticker_draws(code, days, seed) for code in stock_codes))
+    profile = pd.DataFrame(list(profiles), index=list(stock_codes))
+    noise, open_u, high_u, low_u, volume_u = np.stack(draws, axis=-1)   # 各為 (天數, 股票數)
+
+    # 標準化報酬 = 市場因子 + 所屬產業因子 + 個股雜訊（變異數皆為 1）
+    loadings = np.zeros((1 + N_SECTORS, len(profile)))
+    loadings[0] = MARKET_WEIGHT
+    loadings[1 + profile['sector'].to_numpy(), np.arange(len(profile))] = SECTOR_WEIGHT
+    idiosyncratic = np.sqrt(1 - MARKET_WEIGHT ** 2 - SECTOR_WEIGHT ** 2)
+    shocks = factors[:days] @ loadings + idiosyncratic * noise
+
+    # 對數報酬累加 + 週期性，價格不會出現負值
+    log_returns = profile['drift'].to_numpy() + shocks * profile['volatility'].to_numpy()
+    cycle = np.sin(np.arange(days)[:, None] * 2 * np.pi / CYCLE_DAYS
+                   + profile['phase'].to_numpy()) * 0.05
+    close = profile['base_price'].to_numpy() * np.exp(np.cumsum(log_returns, axis=0) + cycle)
+
+    # 生成 Open, High, Low 價格與成交量（單位：千股）
+    open_ = close * (1 + open_u)
+    high = np.maximum(open_, close) * (1 + high_u)
+    low = np.minimum(open_, close) * (1 - low_u)
+    volume = (profile['base_volume'].to_numpy() * (1 + volume_u)).astype(int)
+
+    frames = []
+    for j, (code, row) in enumerate(profile.iterrows()):
+        frames.append(pd.DataFrame({
+            'Date': dates,
+            'Open': open_[:, j],
+            'High': high[:, j],
+            'Low': low[:, j],
+            'Close': close[:, j],
+            'Volume': volume[:, j],
+            'Stock_Code': code,
+            'Stock_Name': row['name'],
+        }))
+    return frames
+
+
+def generate_universe(stock_codes, days=250, start=START_DATE, seed=SEED, chunk_size=200,
+                      csv_codes=(), root=STORE_DIR, verbose=False):
+    """
+    分批生成股票數據並寫入數據倉儲
+
+    Args:
+        stock_codes: 股票代碼列表（可為任意子集合）
+        days: 交易日數
+        start: 起始日期
+        seed: 亂數種子
+        chunk_size: 每批生成的股票數
+        csv_codes: 另存個別 CSV 的股票代碼
+        root: 數據倉儲資料夾
+        verbose: 是否列出每檔股票的摘要
+
+    Returns:
+        交易日曆
+    """
+    dates = trading_calendar(start, days)
+    factors = market_factors(days, seed)
+    catalog = load_catalog(root)
+
+    for i in range(0, len(stock_codes), chunk_size):
+        for df in generate_stocks(stock_codes[i:i + chunk_size], dates, factors, seed):
+            stock_code, stock_name = df['Stock_Code'].iloc[0], df['Stock_Name'].iloc[0]
+            write_stock(df, stock_code, stock_name, root=root, catalog=catalog)
+
+            saved = f'{root}/{stock_code}'
+            if stock_code in csv_codes:
+                filename = f'data/{stock_code}_{stock_name}.csv'
+                df.to_csv(filename, index=False, encoding='utf-8-sig')
+                saved += f'、{filename}'
+
+            if verbose:
+                print(f"正在生成 {stock_name}({stock_code}) 的數據...")
+                print(f"  [OK] 已儲存: {saved}")
+                print(f"  - 數據天數: {len(df)} 天")
+                print(f"  - 價格範圍: {df['Close'].min():.2f} - {df['Close'].max():.2f}")
+                print(f"  - 平均成交量: {df['Volume'].mean():,.0f} 千股")
+                print()
+
+        # 每批寫完即更新目錄，中斷時已完成的批次仍可使用
+        save_catalog(catalog, root)
+        if not verbose:
+            done = min(i + chunk_size, len(stock_codes))
+            print(f"  [OK] 已生成 {done:,} / {len(stock_codes):,} 檔")
+
+    return dates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='生成台灣股市模擬數據')
+    parser.add_argument('--stocks', type=int, default=len(STOCKS), help='股票數（熱門股票在前）')
+    parser.add_argument('--days', type=int, default=250, help='交易日數')
+    parser.add_argument('--years', type=float, help='年數（指定時取代 --days）')
+    parser.add_argument('--start', default=START_DATE, help='起始日期')
+    parser.add_argument('--codes', help='只生成指定股票，以逗號分隔')
+    parser.add_argument('--seed', type=int, default=SEED, help='亂數種子')
+    parser.add_argument('--chunk-size', type=int, default=200, help='每批生成的股票數')
+    parser.add_argument('--csv', action='store_true', help='所有股票都另存個別 CSV')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("台灣股市數據生成工具")
+    print("="*60)
+
+    days = round(args.years * DAYS_PER_YEAR) if args.years else args.days
+    stock_codes = args.codes.split(',') if args.codes else universe_codes(args.stocks)
+    # 熱門股票一律另存 CSV（方便用 Excel 檢視）
+    csv_codes = set(stock_codes) if args.csv else {code for _, code, _, _ in STOCKS}
+
+    dates = generate_universe(stock_codes, days=days, start=args.start, seed=args.seed,
+                              chunk_size=args.chunk_size, csv_codes=csv_codes,
+                              verbose=len(stock_codes) <= 10)
+    print(f"[OK] 已更新數據倉儲目錄: {STORE_DIR}/catalog.json")
+
+    print("\n" + "="*60)
+    print("數據生成完成！")
+    print("="*60)
+    print(f"\n總共生成 {len(stock_codes)} 檔股票的數據")
+    print(f"時間範圍: {dates[0].strftime('%Y-%m-%d')} 至 {dates[-1].strftime('%Y-%m-%d')}")
+    print("\n可以開始執行 main.py 進行分析！")
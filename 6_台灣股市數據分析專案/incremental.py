@@ -0,0 +1,269 @@
+"""
+增量技術指標計算
+================
+每新增一根 K 棒只做 O(1) 的更新，不必每天重新讀取完整歷史：
+
+- MA：維護各週期的滾動加總
+- MACD：保存快、慢 EMA 與訊號線的遞迴狀態
+- RSI：維護漲幅、跌幅的滾動加總
+- 布林通道：以 Welford 演算法維護滑動視窗的平均數與變異數
+
+狀態可存成 JSON，下次執行時從上次停止的位置繼續。
+計算結果與 main.py 的 calculate_ma / calculate_macd / calculate_rsi /
+calculate_bollinger_bands 一致（EMA 使用 pandas ewm 預設的 adjust=True 權重）。
+"""
+
+import json
+import math
+import os
+from collections import deque
+
+import pandas as pd
+
+STATE_DIR = 'state'
+
+
+class _EMA:
+    """pandas ewm(span=...).mean()（adjust=True）的遞迴版本"""
+
+    def __init__(self, span, num=0.0, den=0.0):
+        self.span = span
+        self.decay = 1 - 2 / (span + 1)
+        self.num = num
+        self.den = den
+
+    def update(self, x):
+        self.num = self.num * self.decay + x
+        self.den = self.den * self.decay + 1
+        return self.num / self.den
+
+    def to_dict(self):
+        return {'span': self.span, 'num': self.num, 'den': self.den}
+
+
+class IncrementalIndicators:
+    """
+    單一股票的增量指標狀態
+
+    Args:
+        ma_periods: 移動平均週期
+        fast, slow, signal: MACD 參數
+        rsi_period: RSI 週期
+        bb_period, bb_std: 布林通道週期與標準差倍數
+    """
+
+    def __init__(self, ma_periods=(5, 10, 20), fast=12, slow=26, signal=9,
+                 rsi_period=14, bb_period=20, bb_std=2):
+        self.ma_periods = list(ma_periods)
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+
+        self.count = 0
+        self.last_date = None
+        self.prev_close = None
+
+        # MA / 布林通道共用的收盤價視窗（多保留一筆以便移出最舊值）
+        self.closes = deque(maxlen=max(self.ma_periods + [bb_period]) + 1)
+        self.ma_sums = {period: 0.0 for period in self.ma_periods}
+
+        # MACD
+        self.ema_fast = _EMA(fast)
+        self.ema_slow = _EMA(slow)
+        self.ema_signal = _EMA(signal)
+
+        # RSI
+        self.gains = deque(maxlen=rsi_period + 1)
+        self.losses = deque(maxlen=rsi_period + 1)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+
+        # 布林通道（Welford 滑動視窗）
+        self.bb_mean = 0.0
+        self.bb_m2 = 0.0
+
+        self.values = {}
+
+    def update(self, close, date=None):
+        """
+        加入一根新 K 棒的收盤價並更新所有指標
+
+        Returns:
+            dict：這根 K 棒的指標值（資料不足時為 NaN）
+        """
+        close = float(close)
+        self.count += 1
+        self.closes.append(close)
+        n = self.count
+        values = {}
+
+        # 移動平均線
+        for period in self.ma_periods:
+            self.ma_sums[period] += close
+            if n > period:
+                self.ma_sums[period] -= self.closes[-period - 1]
+            values[f'MA{period}'] = self.ma_sums[period] / period if n >= period else math.nan
+
+        # MACD
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        macd_signal = self.ema_signal.update(macd)
+        values['MACD'] = macd
+        values['MACD_Signal'] = macd_signal
+        values['MACD_Hist'] = macd - macd_signal
+
+        # RSI（第一根 K 棒沒有漲跌，視為 0，與 calculate_rsi 相同）
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.gains.append(max(delta, 0.0))
+        self.losses.append(max(-delta, 0.0))
+        self.gain_sum += self.gains[-1]
+        self.loss_sum += self.losses[-1]
+        if n > self.rsi_period:
+            self.gain_sum -= self.gains[0]
+            self.loss_sum -= self.losses[0]
+        values['RSI'] = self._rsi() if n >= self.rsi_period else math.nan
+
+        # 布林通道
+        p = self.bb_period
+        if n <= p:
+            diff = close - self.bb_mean
+            self.bb_mean += diff / n
+            self.bb_m2 += diff * (close - self.bb_mean)
+        else:
+            old = self.closes[-p - 1]
+            new_mean = self.bb_mean + (close - old) / p
+            self.bb_m2 += (close - old) * (close - new_mean + old - self.bb_mean)
+            self.bb_mean = new_mean
+        if n >= p:
+            std = math.sqrt(max(self.bb_m2, 0.0) / (p - 1))
+            values['BB_Middle'] = self.bb_mean
+            values['BB_Upper'] = self.bb_mean + std * self.bb_std
+            values['BB_Lower'] = self.bb_mean - std * self.bb_std
+        else:
+            values['BB_Middle'] = values['BB_Upper'] = values['BB_Lower'] = math.nan
+
+        self.prev_close = close
+        if date is not None:
+            self.last_date = pd.Timestamp(date)
+        self.values = values
+        return values
+
+    def _rsi(self):
+        gain = self.gain_sum / self.rsi_period
+        loss = self.loss_sum / self.rsi_period
+        if loss == 0:
+            return 100.0 if gain > 0 else math.nan
+        return 100 - 100 / (1 + gain / loss)
+
+    def extend(self, df):
+        """
+        依序加入 DataFrame（以 Date 為索引）中尚未處理過的 K 棒
+
+        Returns:
+            新增 K 棒的指標 DataFrame
+        """
+        if self.last_date is not None:
+            df = df[df.index > self.last_date]
+
+        rows = [self.update(close, date) for date, close in df['Close'].items()]
+        return pd.DataFrame(rows, index=df.index)
+
+    def to_dict(self):
+        """轉成可序列化的 dict"""
+        return {
+            'ma_periods': self.ma_periods,
+            'rsi_period': self.rsi_period,
+            'bb_period': self.bb_period,
+            'bb_std': self.bb_std,
+            'count': self.count,
+            'last_date': None if self.last_date is None else self.last_date.isoformat(),
+            'prev_close': self.prev_close,
+            'closes': list(self.closes),
+            'ma_sums': {str(k): v for k, v in self.ma_sums.items()},
+            'ema_fast': self.ema_fast.to_dict(),
+            'ema_slow': self.ema_slow.to_dict(),
+            'ema_signal': self.ema_signal.to_dict(),
+            'gains': list(self.gains),
+            'losses': list(self.losses),
+            'gain_sum': self.gain_sum,
+            'loss_sum': self.loss_sum,
+            'bb_mean': self.bb_mean,
+            'bb_m2': self.bb_m2,
+            'values': self.values,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """由 to_dict() 的結果還原"""
+        obj = cls(ma_periods=state['ma_periods'],
+                  fast=state['ema_fast']['span'],
+                  slow=state['ema_slow']['span'],
+                  signal=state['ema_signal']['span'],
+                  rsi_period=state['rsi_period'],
+                  bb_period=state['bb_period'],
+                  bb_std=state['bb_std'])
+        obj.count = state['count']
+        obj.last_date = None if state['last_date'] is None else pd.Timestamp(state['last_date'])
+        obj.prev_close = state['prev_close']
+        obj.closes.extend(state['closes'])
+        obj.ma_sums = {int(k): v for k, v in state['ma_sums'].items()}
+        obj.ema_fast = _EMA(**state['ema_fast'])
+        obj.ema_slow = _EMA(**state['ema_slow'])
+        obj.ema_signal = _EMA(**state['ema_signal'])
+        obj.gains.extend(state['gains'])
+        obj.losses.extend(state['losses'])
+        obj.gain_sum = state['gain_sum']
+        obj.loss_sum = state['loss_sum']
+        obj.bb_mean = state['bb_mean']
+        obj.bb_m2 = state['bb_m2']
+        obj.values = state['values']
+        return obj
+
+    def save(self, path):
+        """儲存狀態到 JSON 檔"""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """從 JSON 檔載入狀態"""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def resume_indicators(stock_code, df, state_dir=STATE_DIR, **params):
+    """
+    載入上次的指標狀態，只處理新的交易日，再把狀態存回磁碟
+
+    Args:
+        stock_code: 股票代碼（狀態檔名）
+        df: 以 Date 為索引、含 Close 欄位的 DataFrame
+        state_dir: 狀態檔資料夾
+        params: 第一次建立狀態時使用的指標參數
+
+    Returns:
+        (IncrementalIndicators, 新增 K 棒的指標 DataFrame)
+    """
+    path = os.path.join(state_dir, f'{stock_code}.json')
+    if os.path.exists(path):
+        state = IncrementalIndicators.load(path)
+    else:
+        state = IncrementalIndicators(**params)
+
+    new_rows = state.extend(df)
+    state.save(path)
+    return state, new_rows
+
+
+if __name__ == "__main__":
+    from main import load_stock_data
+
+    for code in ['2330', '2317', '2454']:
+        df = load_stock_data(code)
+        if df is None:
+            break
+        state, new_rows = resume_indicators(code, df)
+        print(f"  新增 {len(new_rows)} 根 K 棒，最新日期：{state.last_date:%Y-%m-%d}")
+        print(f"  RSI(14)：{state.values['RSI']:.2f}  MACD：{state.values['MACD']:.2f}")
@@ -0,0 +1,193 @@
+"""
+技術指標磁碟快取
+================
+以「輸入數據的內容雜湊 + 指標參數」為鍵，把計算結果存成 .npz：
+
+    cache/indicators/
+        compute_indicators-3f2a...e1.npz
+        calculate_macd-9b04...7c.npz
+
+數據與參數都沒變時（例如只調整了圖表版面），重新執行會直接讀取快取，
+完全不重新計算。快取總大小超過上限時，刪除最久沒有使用的項目（LRU）。
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+from indicator_engine import compute_indicators
+
+CACHE_DIR = 'cache/indicators'
+MAX_CACHE_BYTES = 200 * 1024 ** 2    # 200 MB
+
+
+def _normalize(value):
+    """參數轉成可 JSON 序列化的型態（tuple 與 list 視為相同）"""
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def bound_params(func, skip=1, **params):
+    """補上預設值後的完整參數（略過前 skip 個數據參數），呼叫方式不同也得到相同的鍵"""
+    signature = inspect.signature(func)
+    names = list(signature.parameters)[skip:]
+    full = {name: signature.parameters[name].default for name in names}
+    full.update(params)
+    return {name: _normalize(value) for name, value in full.items()}
+
+
+def fingerprint(arrays, params):
+    """
+    輸入數據與參數的內容雜湊
+
+    Args:
+        arrays: 輸入數據（ndarray 或可轉成 ndarray 者）的列表
+        params: 參數 dict
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for values in arrays:
+        values = np.ascontiguousarray(values)
+        digest.update(f'{values.dtype.str}{values.shape}'.encode())
+        digest.update(values.view(np.uint8).reshape(-1) if values.dtype != object
+                      else json.dumps(values.tolist(), ensure_ascii=False).encode())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    大小有上限的 LRU 磁碟快取
+
+    以檔案修改時間記錄最近使用時間：讀取命中時更新，淘汰時從最舊的開始刪除
+
+    Args:
+        directory: 快取資料夾
+        max_bytes: 快取總大小上限
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key):
+        """讀取快取；沒有時回傳 None"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (FileNotFoundError, OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return arrays
+
+    def put(self, key, arrays):
+        """寫入快取（先寫暫存檔再改名，中斷時不會留下損壞的檔案），再淘汰超出上限的項目"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        """(最近使用時間, 大小, 路徑) 列表，由舊到新"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def size(self):
+        """快取總大小（bytes）"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """刪除最久沒有使用的項目，直到總大小不超過上限"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        """清空快取"""
+        for _, _, path in self.entries():
+            os.remove(path)
+
+
+def cached_compute_indicators(panel, cache=None, **params):
+    """
+    有快取的 compute_indicators
+
+    Args:
+        panel: StockPanel（只用到 Close）
+        cache: IndicatorCache（預設使用 CACHE_DIR）
+        **params: compute_indicators 的參數
+
+    Returns:
+        同一個 StockPanel（指標直接加入 panel.fields）
+    """
+    cache = IndicatorCache() if cache is None else cache
+    params = bound_params(compute_indicators, **params)
+    key = 'compute_indicators-' + fingerprint(
+        [panel.dates.asi8, np.array(panel.codes, dtype=object), panel.fields['Close']], params)
+
+    fields = cache.get(key)
+    if fields is not None:
+        panel.fields.update(fields)
+        return panel
+
+    before = set(panel.fields)
+    compute_indicators(panel, **params)
+    cache.put(key, {field: values for field, values in panel.fields.items()
+                    if field not in before})
+    return panel
+
+
+def cached_calculate(df, func, cache=None, **params):
+    """
+    有快取的 calculate_* 函式（單一股票 DataFrame）
+
+    Args:
+        df: 以 Date 為索引、含 Close 的 DataFrame
+        func: main.py 的 calculate_ma、calculate_macd 等函式
+        cache: IndicatorCache
+        **params: func 的參數，例如 periods=[5, 10, 20] 或 fast=12, slow=26, signal=9
+
+    Returns:
+        加入指標欄位的 df
+    """
+    cache = IndicatorCache() if cache is None else cache
+    params = bound_params(func, **params)
+    key = f'{func.__name__}-' + fingerprint(
+        [df.index.asi8, df['Close'].to_numpy(dtype=float)], params)
+
+    columns = cache.get(key)
+    if columns is None:
+        # calculate_* 只用到 Close，在精簡的副本上計算，新增的欄位即為結果
+        result = func(df[['Close']].copy(), **params)
+        columns = {col: result[col].to_numpy() for col in result.columns if col != 'Close'}
+        cache.put(key, columns)
+
+    for col, values in columns.items():
+        df[col] = values
+    return df
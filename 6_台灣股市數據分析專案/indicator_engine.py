@@ -0,0 +1,142 @@
+"""
+多檔股票技術指標引擎
+====================
+將多檔股票整理成「日期 × 股票」面板（每個欄位一個 2-D 陣列），
+一次向量化計算所有股票的 MA、MACD、RSI、布林通道
+
+計算方式與 main.py 的 calculate_ma / calculate_macd / calculate_rsi /
+calculate_bollinger_bands 完全相同，只是一次處理整個面板，
+不再逐檔迴圈、也不再把指標逐欄寫回每個 DataFrame。
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class StockPanel:
+    """
+    日期 × 股票 的面板數據
+
+    Args:
+        dates: 日期索引（所有股票的聯集）
+        codes: 股票代碼列表（欄位順序）
+        names: {股票代碼: 股票名稱}
+        fields: {欄位名稱: ndarray(日期數, 股票數)}，缺值為 NaN
+    """
+
+    def __init__(self, dates, codes, names, fields):
+        self.dates = pd.DatetimeIndex(dates, name='Date')
+        self.codes = list(codes)
+        self.names = dict(names)
+        self.fields = dict(fields)
+
+    def __getitem__(self, field):
+        """取得單一欄位的 日期 × 股票 DataFrame（不複製數據）"""
+        return pd.DataFrame(self.fields[field], index=self.dates,
+                            columns=self.codes, copy=False)
+
+    def __contains__(self, field):
+        return field in self.fields
+
+    def __len__(self):
+        return len(self.codes)
+
+    def name(self, code):
+        """取得股票名稱"""
+        return self.names.get(code, code)
+
+    def ticker(self, code):
+        """取出單一股票的所有欄位（供繪製個股圖表使用）"""
+        j = self.codes.index(code)
+        df = pd.DataFrame({field: values[:, j] for field, values in self.fields.items()},
+                          index=self.dates)
+        df = df[~np.isnan(df['Close'].to_numpy())]
+        df['Stock_Code'] = code
+        df['Stock_Name'] = self.name(code)
+        return df
+
+
+def build_panel(stocks_data, fields=PRICE_FIELDS):
+    """
+    將 {股票代碼: DataFrame} 轉成 StockPanel
+
+    Args:
+        stocks_data: {股票代碼: 以 Date 為索引的 OHLCV DataFrame}
+        fields: 要放入面板的欄位
+    """
+    codes = list(stocks_data.keys())
+    names = {code: str(df['Stock_Name'].iloc[0]) if 'Stock_Name' in df else code
+             for code, df in stocks_data.items()}
+
+    # 以日期聯集對齊所有股票
+    dates = stocks_data[codes[0]].index
+    for code in codes[1:]:
+        dates = dates.union(stocks_data[code].index)
+
+    panel_fields = {}
+    for field in fields:
+        values = np.full((len(dates), len(codes)), np.nan)
+        for j, code in enumerate(codes):
+            series = stocks_data[code][field]
+            rows = dates.get_indexer(series.index)
+            values[rows, j] = series.to_numpy(dtype=float)
+        panel_fields[field] = values
+
+    return StockPanel(dates, codes, names, panel_fields)
+
+
+def compute_indicators(panel, ma_periods=(5, 10, 20), fast=12, slow=26, signal=9,
+                       rsi_period=14, bb_period=20, bb_std=2):
+    """
+    一次計算面板中所有股票的技術指標
+
+    新增的欄位：MA{n}、MACD、MACD_Signal、MACD_Hist、RSI、
+    BB_Middle、BB_Upper、BB_Lower
+
+    Returns:
+        同一個 StockPanel（指標直接加入 panel.fields）
+    """
+    close = panel['Close']
+    out = panel.fields
+
+    # 移動平均線
+    for period in ma_periods:
+        out[f'MA{period}'] = close.rolling(window=period).mean().to_numpy()
+
+    # MACD
+    ema_fast = close.ewm(span=fast).mean()
+    ema_slow = close.ewm(span=slow).mean()
+    macd = ema_fast - ema_slow
+    macd_signal = macd.ewm(span=signal).mean()
+    out['MACD'] = macd.to_numpy()
+    out['MACD_Signal'] = macd_signal.to_numpy()
+    out['MACD_Hist'] = out['MACD'] - out['MACD_Signal']
+
+    # RSI（上市前的空白日期維持 NaN，不當成漲跌為 0 的交易日）
+    listed = close.notna()
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).where(listed).rolling(window=rsi_period).mean()
+    loss = (-delta.where(delta < 0, 0)).where(listed).rolling(window=rsi_period).mean()
+    rs = gain / loss
+    out['RSI'] = (100 - (100 / (1 + rs))).to_numpy()
+
+    # 布林通道
+    bb_middle = close.rolling(window=bb_period).mean().to_numpy()
+    rolling_std = close.rolling(window=bb_period).std().to_numpy()
+    out['BB_Middle'] = bb_middle
+    out['BB_Upper'] = bb_middle + rolling_std * bb_std
+    out['BB_Lower'] = bb_middle - rolling_std * bb_std
+
+    return panel
+
+
+def last_valid(frame):
+    """每檔股票最後一筆有效值（Series，索引為股票代碼）"""
+    return frame.ffill().iloc[-1]
+
+
+def first_valid(frame):
+    """每檔股票第一筆有效值（Series，索引為股票代碼）"""
+    return frame.bfill().iloc[0]
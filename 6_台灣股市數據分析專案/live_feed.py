@@ -0,0 +1,311 @@
+"""
+模擬即時行情與監控儀表板
+========================
+不連接交易所，以 asyncio 模擬盤中監控流程：
+
+    生產者（重播 data/ 的 K 棒）→ 有上限的佇列 → 多個消費者（增量更新指標）→ 儀表板
+
+- 生產者依指定速度（每秒幾個交易日）送出 K 棒；佇列滿時 put 會等待，
+  消費者跟不上時自然把生產者拖慢（backpressure），不會無限堆積
+- 股票依代碼分配給固定的消費者，同一檔股票的 K 棒依序處理
+- 儀表板以固定的每秒畫面數重繪，而不是每根 K 棒重繪一次
+- 記錄各階段延遲：生產者等待、佇列等待、指標計算、端到端、重繪
+
+使用方式：
+    python live_feed.py --speed 20 --fps 10
+    python live_feed.py --store --speed 0 --no-show     # 倉儲中所有股票、全速重播
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import time
+import warnings
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from incremental import IncrementalIndicators
+
+HISTORY = 120                 # 儀表板每檔股票保留的收盤價數
+MAX_LINES = 8                 # 儀表板最多畫出的股票數
+STAGES = ['backpressure', 'queue_wait', 'indicator', 'end_to_end', 'render']
+
+
+class LatencyStats:
+    """
+    各階段延遲統計（秒）
+
+    保留每個階段最近 window 筆樣本計算百分位數，另記錄總筆數與最大值
+    """
+
+    def __init__(self, window=10_000):
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self.counts = dict.fromkeys(STAGES, 0)
+        self.maxima = dict.fromkeys(STAGES, 0.0)
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+        self.counts[stage] += 1
+        self.maxima[stage] = max(self.maxima[stage], seconds)
+
+    def summary(self):
+        """每個階段的筆數、p50、p99、最大值（毫秒）"""
+        rows = {}
+        for stage in STAGES:
+            samples = np.array(self.samples[stage])
+            if not len(samples):
+                continue
+            rows[stage] = {
+                'count': self.counts[stage],
+                'p50_ms': np.percentile(samples, 50) * 1000,
+                'p99_ms': np.percentile(samples, 99) * 1000,
+                'max_ms': self.maxima[stage] * 1000,
+            }
+        return pd.DataFrame(rows).T
+
+
+def load_replay_bars(data_dir='data', use_store=False):
+    """
+    讀取要重播的 K 棒，依日期、股票代碼排序
+
+    Args:
+        data_dir: 個股 CSV 所在資料夾（{代碼}_{名稱}.csv）
+        use_store: 改從數據倉儲讀取所有股票（可用 generate_local_data.py --stocks 產生大量股票）
+
+    Returns:
+        DataFrame：Date、Stock_Code、Stock_Name、Close、Volume
+    """
+    if use_store:
+        from ohlcv_store import load_catalog, read_many
+        frames = read_many(list(load_catalog()), columns=['Close', 'Volume']).values()
+        frames = [df.reset_index() for df in frames]
+    else:
+        frames = [pd.read_csv(path, parse_dates=['Date'], dtype={'Stock_Code': str})
+                  for path in sorted(glob.glob(os.path.join(data_dir, '*_*.csv')))]
+
+    bars = pd.concat(frames, ignore_index=True)
+    bars = bars[['Date', 'Stock_Code', 'Stock_Name', 'Close', 'Volume']]
+    return bars.sort_values(['Date', 'Stock_Code'], kind='stable', ignore_index=True)
+
+
+class LiveFeed:
+    """
+    模擬行情管線
+
+    Args:
+        bars: load_replay_bars() 的結果
+        speed: 每秒重播幾個交易日（0 表示全速）
+        consumers: 消費者數量
+        queue_size: 每個消費者佇列的上限（backpressure 門檻）
+        fps: 儀表板每秒重繪次數
+        show: 是否開啟互動視窗（False 時只在背景重繪）
+    """
+
+    def __init__(self, bars, speed=20, consumers=4, queue_size=500, fps=10, show=True):
+        self.bars = bars
+        self.speed = speed
+        self.n_consumers = consumers
+        self.queue_size = queue_size
+        self.fps = fps
+        self.show = show
+
+        self.codes = sorted(bars['Stock_Code'].unique())
+        self.names = dict(zip(bars['Stock_Code'], bars['Stock_Name']))
+        self.shard = {code: i % consumers for i, code in enumerate(self.codes)}
+
+        self.indicators = {code: IncrementalIndicators() for code in self.codes}
+        self.history = {code: deque(maxlen=HISTORY) for code in self.codes}
+        self.latest_date = None
+        self.processed = 0
+        self.frames = 0
+        self.dirty = False
+        self.done = False
+        self.stats = LatencyStats()
+        self.fig = None
+
+    async def produce(self, queues):
+        """依日期送出 K 棒；佇列滿時等待（記錄為 backpressure）"""
+        interval = 1 / self.speed if self.speed else 0
+        start = time.perf_counter()
+        day = 0
+
+        for date, group in self.bars.groupby('Date', sort=False):
+            if interval:
+                # 對齊重播時鐘，不受單日處理時間影響
+                delay = start + day * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            for code, close, volume in zip(group['Stock_Code'], group['Close'], group['Volume']):
+                queue = queues[self.shard[code]]
+                if queue.full():
+                    waited = time.perf_counter()
+                    await queue.put((time.perf_counter(), date, code, close, volume))
+                    self.stats.record('backpressure', time.perf_counter() - waited)
+                else:
+                    queue.put_nowait((time.perf_counter(), date, code, close, volume))
+            day += 1
+            if not interval:
+                await asyncio.sleep(0)   # 全速時也讓出執行權給消費者與儀表板
+
+        for queue in queues:
+            await queue.put(None)
+
+    async def consume(self, queue):
+        """增量更新所負責股票的指標"""
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            sent, date, code, close, volume = item
+            received = time.perf_counter()
+            self.stats.record('queue_wait', received - sent)
+
+            self.indicators[code].update(close, date)
+            self.history[code].append(close)
+            finished = time.perf_counter()
+            self.stats.record('indicator', finished - received)
+            self.stats.record('end_to_end', finished - sent)
+
+            self.latest_date = date
+            self.processed += 1
+            self.dirty = True
+
+    async def render_loop(self):
+        """以固定畫面數重繪儀表板（沒有新數據時跳過）"""
+        frame = 1 / self.fps
+        while not self.done:
+            next_frame = time.perf_counter() + frame
+            if self.dirty:
+                self.dirty = False
+                started = time.perf_counter()
+                self.redraw()
+                self.stats.record('render', time.perf_counter() - started)
+            await asyncio.sleep(max(next_frame - time.perf_counter(), 0))
+
+    def _build_dashboard(self):
+        import matplotlib.pyplot as plt
+
+        if self.show:
+            plt.ion()
+        self.fig, (self.ax_price, self.ax_rsi) = plt.subplots(
+            2, 1, figsize=(14, 9), gridspec_kw={'height_ratios': [3, 2]})
+        self.lines = {}
+        for code in self.codes[:MAX_LINES]:
+            self.lines[code], = self.ax_price.plot([], [], linewidth=1.5,
+                                                   label=f'{self.names[code]}({code})')
+        self.ax_price.set_title('即時行情（標準化收盤價，最近一根 = 100）', fontsize=14, fontweight='bold')
+        self.ax_price.set_xlim(-HISTORY + 1, 0)
+        self.ax_price.set_xlabel('K 棒（0 = 最新）', fontsize=11)
+        self.ax_price.legend(fontsize=9, loc='upper left', ncol=2)
+        self.ax_price.grid(True, alpha=0.3)
+
+        self.rsi_bins = np.linspace(0, 100, 21)
+        self.rsi_bars = self.ax_rsi.bar(self.rsi_bins[:-1], np.zeros(20), width=5, align='edge',
+                                        color='#45B7D1', alpha=0.8)
+        self.ax_rsi.axvline(70, color='red', linestyle='--', alpha=0.5)
+        self.ax_rsi.axvline(30, color='green', linestyle='--', alpha=0.5)
+        self.ax_rsi.set_xlim(0, 100)
+        self.ax_rsi.set_xlabel('RSI(14)', fontsize=11)
+        self.ax_rsi.set_ylabel('股票數', fontsize=11)
+        self.ax_rsi.grid(True, alpha=0.3)
+        self.fig.tight_layout()
+
+    def redraw(self):
+        """以目前的指標狀態更新儀表板"""
+        import matplotlib.pyplot as plt
+
+        if self.fig is None:
+            self._build_dashboard()
+
+        low, high = np.inf, -np.inf
+        for code, line in self.lines.items():
+            closes = np.array(self.history[code])
+            if not len(closes):
+                continue
+            normalized = closes / closes[-1] * 100
+            line.set_data(np.arange(-len(closes) + 1, 1), normalized)
+            low, high = min(low, normalized.min()), max(high, normalized.max())
+        if np.isfinite(low):
+            margin = max(high - low, 1) * 0.05
+            self.ax_price.set_ylim(low - margin, high + margin)
+
+        rsi = np.array([state.values.get('RSI', np.nan) for state in self.indicators.values()])
+        counts, _ = np.histogram(rsi[~np.isnan(rsi)], bins=self.rsi_bins)
+        for rect, count in zip(self.rsi_bars, counts):
+            rect.set_height(count)
+        self.ax_rsi.set_ylim(0, max(counts.max(), 1) * 1.15)
+        overbought = int((rsi > 70).sum())
+        oversold = int((rsi < 30).sum())
+        date = '' if self.latest_date is None else f'{self.latest_date:%Y-%m-%d}'
+        self.ax_rsi.set_title(f'{date}  RSI 分布（超買 {overbought} 檔、超賣 {oversold} 檔）'
+                              f'  已處理 {self.processed:,} 根 K 棒',
+                              fontsize=13, fontweight='bold')
+
+        if self.show:
+            self.fig.canvas.draw_idle()
+            plt.pause(0.001)
+        else:
+            self.fig.canvas.draw()
+        self.frames += 1
+
+    async def run(self):
+        """執行整條管線直到重播結束"""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.n_consumers)]
+        renderer = asyncio.create_task(self.render_loop())
+        started = time.perf_counter()
+
+        await asyncio.gather(self.produce(queues), *(self.consume(queue) for queue in queues))
+        self.done = True
+        await renderer
+        self.redraw()   # 最後一個畫面
+
+        self.elapsed = time.perf_counter() - started
+        return self.stats.summary()
+
+
+def run_feed(bars, **kwargs):
+    """執行模擬行情並輸出延遲統計（參數見 LiveFeed）"""
+    feed = LiveFeed(bars, **kwargs)
+    summary = asyncio.run(feed.run())
+
+    print(f"\n[完成] {len(feed.codes):,} 檔股票、{feed.processed:,} 根 K 棒，"
+          f"耗時 {feed.elapsed:.2f} 秒（{feed.processed / feed.elapsed:,.0f} 根/秒），"
+          f"重繪 {feed.frames} 次")
+    print("\n各階段延遲：")
+    print(summary.to_string(float_format=lambda x: f'{x:,.3f}'))
+    return feed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='模擬即時行情與監控儀表板')
+    parser.add_argument('--speed', type=float, default=20, help='每秒重播幾個交易日（0 = 全速）')
+    parser.add_argument('--consumers', type=int, default=4, help='消費者數量')
+    parser.add_argument('--queue-size', type=int, default=500, help='每個佇列的上限')
+    parser.add_argument('--fps', type=float, default=10, help='儀表板每秒重繪次數')
+    parser.add_argument('--store', action='store_true', help='重播數據倉儲中的所有股票')
+    parser.add_argument('--no-show', action='store_true', help='不開啟視窗（只輸出最後畫面）')
+    args = parser.parse_args()
+
+    if args.no_show:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    warnings.filterwarnings('ignore')
+
+    # 設定中文字型
+    plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'Arial Unicode MS', 'sans-serif']
+    plt.rcParams['axes.unicode_minus'] = False
+
+    bars = load_replay_bars(use_store=args.store)
+    feed = run_feed(bars, speed=args.speed, consumers=args.consumers,
+                    queue_size=args.queue_size, fps=args.fps, show=not args.no_show)
+
+    os.makedirs('output', exist_ok=True)
+    feed.fig.savefig('output/即時監控.png', dpi=150, bbox_inches='tight', facecolor='white')
+    print("\n[OK] 已儲存：output/即時監控.png")
+    if not args.no_show:
+        plt.ioff()
+        plt.show()
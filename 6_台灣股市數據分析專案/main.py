@@ -12,38 +12,71 @@
 """
 
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 import pandas as pd
 import numpy as np
 import mplfinance as mpf
 from matplotlib.backends.backend_pdf import PdfPages
 import os
+import sys
 import warnings
+from indicator_engine import build_panel, compute_indicators, first_valid, last_valid
+from indicator_cache import cached_compute_indicators
+from ohlcv_store import load_catalog, read_stock
+from downsample import axis_pixel_width, bar_buckets, fill_band, plot_line
+from cross_section import (cross_sectional_metrics, normalized_prices, return_correlation,
+                           rolling_beta)
 warnings.filterwarnings('ignore')
 
 # 設定中文字型
 plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'Arial Unicode MS', 'sans-serif']
 plt.rcParams['axes.unicode_minus'] = False
 
-def load_stock_data(stock_code):
-    """載入股票數據"""
+# 超過此檔數時，比較圖改用熱圖與排行檢視
+LARGE_UNIVERSE = 12
+BAR_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+
+def load_stock_data(stock_code, start=None, end=None):
+    """
+    載入股票數據
+
+    優先從欄式數據倉儲（data/store）讀取，沒有倉儲時才讀取 CSV
+
+    Args:
+        stock_code: 股票代碼
+        start, end: 起訖日期（含），None 表示全部
+    """
     stock_names = {
         '2330': '台積電',
         '2317': '鴻海',
         '2454': '聯發科'
     }
 
-    filename = f'data/{stock_code}_{stock_names[stock_code]}.csv'
-
-    if not os.path.exists(filename):
-        print(f"✗ 找不到數據檔案：{filename}")
-        print("請先執行 generate_local_data.py 生成數據")
+    catalog = load_catalog()
+    if stock_code in catalog:
+        stock_name = catalog[stock_code]['name']
+        df = read_stock(stock_code, start=start, end=end, catalog=catalog)
+        df['Stock_Code'] = stock_code
+        df['Stock_Name'] = stock_name
+    else:
+        stock_name = stock_names[stock_code]
+        filename = f'data/{stock_code}_{stock_name}.csv'
+
+        if not os.path.exists(filename):
+            print(f"✗ 找不到數據檔案：{filename}")
+            print("請先執行 generate_local_data.py 生成數據")
+            return None
+
+        df = pd.read_csv(filename)
+        df['Date'] = pd.to_datetime(df['Date'])
+        df.set_index('Date', inplace=True)
+        df = df.loc[start:end]
+
+    if df.empty:
+        print(f"✗ {stock_name}({stock_code}) 在指定期間沒有數據")
         return None
 
-    df = pd.read_csv(filename)
-    df['Date'] = pd.to_datetime(df['Date'])
-    df.set_index('Date', inplace=True)
-
-    print(f"[OK] 載入 {stock_names[stock_code]}({stock_code}) 數據成功")
+    print(f"[OK] 載入 {stock_name}({stock_code}) 數據成功")
     print(f"  時間範圍：{df.index[0].strftime('%Y-%m-%d')} 至 {df.index[-1].strftime('%Y-%m-%d')}")
     print(f"  數據筆數：{len(df)} 筆")
 
@@ -82,12 +115,21 @@ def calculate_bollinger_bands(df, period=20, std_dev=2):
     df['BB_Lower'] = df['BB_Middle'] - (rolling_std * std_dev)
     return df
 
-def plot_candlestick_with_indicators(df, stock_name, stock_code):
-    """繪製K線圖和技術指標"""
+def plot_candlestick_with_indicators(df, stock_name, stock_code, days=60):
+    """
+    繪製K線圖和技術指標
+
+    Args:
+        df: 含技術指標的股票數據
+        stock_name: 股票名稱
+        stock_code: 股票代碼
+        days: 顯示最近幾天（None 表示全部）；資料點多於座標軸像素時自動降採樣
+    """
     print(f"\n正在繪製 {stock_name} 的K線圖...")
 
-    # 準備數據（最近60天）
-    df_recent = df.tail(60).copy()
+    # 準備數據（預設最近60天）
+    df_recent = df.tail(days).copy() if days else df.copy()
+    period_text = f'最近{days}天' if days else f'全部{len(df_recent)}天'
 
     # 建立子圖
     fig = plt.figure(figsize=(16, 12))
@@ -95,40 +137,45 @@ def plot_candlestick_with_indicators(df, stock_name, stock_code):
 
     # 子圖1：K線圖 + 移動平均線 + 布林通道
     ax1 = fig.add_subplot(gs[0])
-    ax1.plot(df_recent.index, df_recent['Close'], 'k-', linewidth=2, label='收盤價')
-    ax1.plot(df_recent.index, df_recent['MA5'], 'r-', linewidth=1.5, label='MA5', alpha=0.8)
-    ax1.plot(df_recent.index, df_recent['MA10'], 'b-', linewidth=1.5, label='MA10', alpha=0.8)
-    ax1.plot(df_recent.index, df_recent['MA20'], 'g-', linewidth=1.5, label='MA20', alpha=0.8)
+    max_points = axis_pixel_width(ax1)
+    plot_line(ax1, df_recent['Close'], max_points, 'k-', linewidth=2, label='收盤價')
+    plot_line(ax1, df_recent['MA5'], max_points, 'r-', linewidth=1.5, label='MA5', alpha=0.8)
+    plot_line(ax1, df_recent['MA10'], max_points, 'b-', linewidth=1.5, label='MA10', alpha=0.8)
+    plot_line(ax1, df_recent['MA20'], max_points, 'g-', linewidth=1.5, label='MA20', alpha=0.8)
 
     # 布林通道
-    ax1.plot(df_recent.index, df_recent['BB_Upper'], 'gray', linestyle='--', alpha=0.5, label='布林上軌')
-    ax1.plot(df_recent.index, df_recent['BB_Lower'], 'gray', linestyle='--', alpha=0.5, label='布林下軌')
-    ax1.fill_between(df_recent.index, df_recent['BB_Upper'], df_recent['BB_Lower'],
-                     color='gray', alpha=0.1)
+    plot_line(ax1, df_recent['BB_Upper'], max_points, 'gray', linestyle='--', alpha=0.5, label='布林上軌')
+    plot_line(ax1, df_recent['BB_Lower'], max_points, 'gray', linestyle='--', alpha=0.5, label='布林下軌')
+    fill_band(ax1, df_recent['BB_Lower'], df_recent['BB_Upper'], max_points,
+              color='gray', alpha=0.1)
 
-    ax1.set_title(f'{stock_name}({stock_code}) 股價走勢與技術指標（最近60天）',
+    ax1.set_title(f'{stock_name}({stock_code}) 股價走勢與技術指標（{period_text}）',
                  fontsize=16, fontweight='bold', pad=20)
     ax1.set_ylabel('股價（元）', fontsize=12)
     ax1.legend(loc='upper left', fontsize=10, ncol=3)
     ax1.grid(True, alpha=0.3)
 
-    # 子圖2：成交量
+    # 子圖2：成交量（天數多時每個長條代表一段期間的最大量）
     ax2 = fig.add_subplot(gs[1], sharex=ax1)
-    colors = ['red' if df_recent['Close'].iloc[i] >= df_recent['Open'].iloc[i]
-             else 'green' for i in range(len(df_recent))]
-    ax2.bar(df_recent.index, df_recent['Volume']/1000, color=colors, alpha=0.6, width=0.8)
+    x, volume, width, starts, stops = bar_buckets(df_recent.index, df_recent['Volume']/1000,
+                                                  max_points // 2)
+    up = df_recent['Close'].to_numpy()[stops - 1] >= df_recent['Open'].to_numpy()[starts]
+    colors = np.where(up, 'red', 'green')
+    ax2.bar(x, volume, color=colors, alpha=0.6, width=width)
     ax2.set_ylabel('成交量（萬張）', fontsize=12)
     ax2.set_title('成交量', fontsize=12, fontweight='bold')
     ax2.grid(True, alpha=0.3)
 
     # 子圖3：MACD
     ax3 = fig.add_subplot(gs[2], sharex=ax1)
-    ax3.plot(df_recent.index, df_recent['MACD'], 'b-', linewidth=1.5, label='MACD')
-    ax3.plot(df_recent.index, df_recent['MACD_Signal'], 'r-', linewidth=1.5, label='Signal')
+    plot_line(ax3, df_recent['MACD'], max_points, 'b-', linewidth=1.5, label='MACD')
+    plot_line(ax3, df_recent['MACD_Signal'], max_points, 'r-', linewidth=1.5, label='Signal')
 
-    # MACD 柱狀圖
-    colors = ['red' if val >= 0 else 'green' for val in df_recent['MACD_Hist']]
-    ax3.bar(df_recent.index, df_recent['MACD_Hist'], color=colors, alpha=0.5, width=0.8)
+    # MACD 柱狀圖（天數多時取每段期間絕對值最大者）
+    x, hist, width, _, _ = bar_buckets(df_recent.index, df_recent['MACD_Hist'],
+                                       max_points // 2, how='extreme')
+    colors = np.where(hist >= 0, 'red', 'green')
+    ax3.bar(x, hist, color=colors, alpha=0.5, width=width)
 
     ax3.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
     ax3.set_ylabel('MACD', fontsize=12)
@@ -138,11 +185,12 @@ def plot_candlestick_with_indicators(df, stock_name, stock_code):
 
     # 子圖4：RSI
     ax4 = fig.add_subplot(gs[3], sharex=ax1)
-    ax4.plot(df_recent.index, df_recent['RSI'], 'purple', linewidth=2, label='RSI(14)')
+    plot_line(ax4, df_recent['RSI'], max_points, 'purple', linewidth=2, label='RSI(14)')
     ax4.axhline(y=70, color='red', linestyle='--', linewidth=1, alpha=0.5, label='超買線(70)')
     ax4.axhline(y=30, color='green', linestyle='--', linewidth=1, alpha=0.5, label='超賣線(30)')
-    ax4.fill_between(df_recent.index, 70, 100, color='red', alpha=0.1)
-    ax4.fill_between(df_recent.index, 0, 30, color='green', alpha=0.1)
+    ends = df_recent.index[[0, -1]]
+    ax4.fill_between(ends, 70, 100, color='red', alpha=0.1)
+    ax4.fill_between(ends, 0, 30, color='green', alpha=0.1)
 
     ax4.set_ylabel('RSI', fontsize=12)
     ax4.set_xlabel('日期', fontsize=12)
@@ -158,23 +206,36 @@ def plot_candlestick_with_indicators(df, stock_name, stock_code):
 
     return fig
 
-def compare_stocks(stocks_data):
-    """比較多檔股票"""
+def compare_stocks(panel, top_k=10, benchmark=None):
+    """
+    比較多檔股票（讀取指標面板）
+
+    股票數量超過 LARGE_UNIVERSE 時，改用熱圖與前 / 後 top_k 名排行檢視
+
+    Args:
+        panel: 已載入的 StockPanel
+        top_k: 排行圖顯示前、後幾名
+        benchmark: 計算 Beta 的基準（None 為等權市場指數，或指定股票代碼）
+    """
     print("\n正在繪製股票比較圖...")
 
+    metrics = cross_sectional_metrics(panel)
+    if len(panel) > LARGE_UNIVERSE:
+        return compare_many_stocks(panel, metrics, top_k, benchmark)
+
     fig, axes = plt.subplots(2, 2, figsize=(16, 10))
-    fig.suptitle('台股三雄比較分析', fontsize=18, fontweight='bold', y=0.995)
+    title = '台股三雄比較分析' if len(panel) == 3 else f'台股 {len(panel)} 檔股票比較分析'
+    fig.suptitle(title, fontsize=18, fontweight='bold', y=0.995)
 
     # 標準化價格（以第一天為基準 = 100）
-    for stock_code, df in stocks_data.items():
-        normalized = (df['Close'] / df['Close'].iloc[0]) * 100
-        df['Normalized'] = normalized
+    normalized = normalized_prices(panel['Close'])
 
-    # 子圖1：標準化價格比較
-    for stock_code, df in stocks_data.items():
-        stock_name = df['Stock_Name'].iloc[0]
-        axes[0, 0].plot(df.index, df['Normalized'],
-                       linewidth=2, label=f'{stock_name}({stock_code})', alpha=0.8)
+    # 子圖1：標準化價格比較（點數超過座標軸像素時降採樣）
+    max_points = axis_pixel_width(axes[0, 0])
+    for stock_code in panel.codes:
+        stock_name = panel.name(stock_code)
+        plot_line(axes[0, 0], normalized[stock_code], max_points,
+                  linewidth=2, label=f'{stock_name}({stock_code})', alpha=0.8)
 
     axes[0, 0].set_title('股價漲跌幅比較（標準化）', fontsize=14, fontweight='bold')
     axes[0, 0].set_xlabel('日期', fontsize=11)
@@ -184,9 +245,10 @@ def compare_stocks(stocks_data):
     axes[0, 0].tick_params(axis='x', rotation=45)
 
     # 子圖2：平均成交量比較
-    avg_volumes = {code: df['Volume'].mean()/1000 for code, df in stocks_data.items()}
-    stock_names = [stocks_data[code]['Stock_Name'].iloc[0] for code in avg_volumes.keys()]
-    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+    avg_volumes = metrics['Avg_Volume'].to_dict()
+    stock_names = metrics['Name'].tolist()
+    colors = BAR_COLORS[:len(panel)] if len(panel) <= len(BAR_COLORS) else \
+        plt.cm.tab20(np.arange(len(panel)) % 20)
 
     axes[0, 1].bar(range(len(avg_volumes)), list(avg_volumes.values()),
                   color=colors, edgecolor='black', linewidth=1.5, alpha=0.8)
@@ -202,11 +264,7 @@ def compare_stocks(stocks_data):
                        ha='center', fontsize=10, fontweight='bold')
 
     # 子圖3：價格波動率比較
-    volatilities = {}
-    for stock_code, df in stocks_data.items():
-        daily_returns = df['Close'].pct_change()
-        volatility = daily_returns.std() * 100  # 轉換為百分比
-        volatilities[stock_code] = volatility
+    volatilities = metrics['Volatility'].to_dict()  # 百分比
 
     axes[1, 0].bar(range(len(volatilities)), list(volatilities.values()),
                   color=colors, edgecolor='black', linewidth=1.5, alpha=0.8)
@@ -221,10 +279,7 @@ def compare_stocks(stocks_data):
                        ha='center', fontsize=10, fontweight='bold')
 
     # 子圖4：報酬率比較
-    returns = {}
-    for stock_code, df in stocks_data.items():
-        total_return = ((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0]) * 100
-        returns[stock_code] = total_return
+    returns = metrics['Total_Return'].to_dict()
 
     colors_return = ['red' if r >= 0 else 'green' for r in returns.values()]
 
@@ -246,47 +301,137 @@ def compare_stocks(stocks_data):
 
     return fig
 
-def print_statistics(stocks_data):
-    """輸出統計報告"""
+def compare_many_stocks(panel, metrics, top_k=10, benchmark=None):
+    """大量股票比較：分布區間、報酬率排行、相關係數熱圖、滾動 Beta 熱圖"""
+    close = panel['Close']
+    normalized = normalized_prices(close)
+    ranked = metrics.sort_values('Total_Return', ascending=False)
+    label = lambda code: f'{panel.name(code)}({code})'
+
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle(f'台股 {len(panel)} 檔股票比較分析', fontsize=18, fontweight='bold', y=0.995)
+
+    # 子圖1：標準化價格分布（中位數與 10%~90% 區間），並標出報酬率前後 3 名
+    max_points = axis_pixel_width(axes[0, 0])
+    bands = normalized.quantile([0.1, 0.5, 0.9], axis=1).T
+    fill_band(axes[0, 0], bands[0.1], bands[0.9], max_points,
+              color='gray', alpha=0.3, label='10%~90% 區間')
+    plot_line(axes[0, 0], bands[0.5], max_points, 'k-', linewidth=2, label='中位數')
+    for code in ranked.index[:3]:
+        plot_line(axes[0, 0], normalized[code], max_points, color='red',
+                  linewidth=1, alpha=0.7, label=label(code))
+    for code in ranked.index[-3:]:
+        plot_line(axes[0, 0], normalized[code], max_points, color='green',
+                  linewidth=1, alpha=0.7, label=label(code))
+
+    axes[0, 0].set_title('股價漲跌幅分布（標準化）', fontsize=14, fontweight='bold')
+    axes[0, 0].set_xlabel('日期', fontsize=11)
+    axes[0, 0].set_ylabel('相對漲跌幅（基期=100）', fontsize=11)
+    axes[0, 0].legend(fontsize=9, ncol=2)
+    axes[0, 0].grid(True, alpha=0.3)
+    axes[0, 0].tick_params(axis='x', rotation=45)
+
+    # 子圖2：累計報酬率排行（前 top_k 名與後 top_k 名）
+    view = pd.concat([ranked.head(top_k), ranked.tail(top_k)])
+    view = view[~view.index.duplicated()]
+    colors_return = ['red' if r >= 0 else 'green' for r in view['Total_Return']]
+
+    axes[0, 1].barh(range(len(view)), view['Total_Return'],
+                    color=colors_return, edgecolor='black', alpha=0.8)
+    axes[0, 1].set_yticks(range(len(view)))
+    axes[0, 1].set_yticklabels([label(code) for code in view.index], fontsize=9)
+    axes[0, 1].invert_yaxis()
+    axes[0, 1].axvline(x=0, color='black', linestyle='-', linewidth=1)
+    axes[0, 1].set_title(f'累計報酬率排行（前 / 後 {top_k} 名）', fontsize=14, fontweight='bold')
+    axes[0, 1].set_xlabel('報酬率（%）', fontsize=11)
+    axes[0, 1].grid(True, axis='x', alpha=0.3)
+
+    # 子圖3：報酬率相關係數熱圖（股票依最新 Beta 排序）
+    beta = rolling_beta(close, benchmark)
+    order = last_valid(beta).sort_values().index
+    corr = return_correlation(close).loc[order, order]
+
+    im = axes[1, 0].imshow(corr.to_numpy(), cmap='RdBu_r', vmin=-1, vmax=1,
+                           interpolation='nearest', aspect='auto')
+    fig.colorbar(im, ax=axes[1, 0], label='相關係數')
+    axes[1, 0].set_title('報酬率相關係數矩陣', fontsize=14, fontweight='bold')
+    axes[1, 0].set_xlabel('股票（依 Beta 由低到高）', fontsize=11)
+    axes[1, 0].set_ylabel('股票（依 Beta 由低到高）', fontsize=11)
+    axes[1, 0].set_xticks([])
+    axes[1, 0].set_yticks([])
+
+    # 子圖4：滾動 Beta 熱圖（股票 × 日期）
+    benchmark_name = '等權市場指數' if benchmark is None else \
+        (label(benchmark) if benchmark in panel.codes else '基準指數')
+    dates = mdates.date2num(beta.index)
+    im = axes[1, 1].imshow(beta[order].T.to_numpy(), cmap='coolwarm', vmin=0, vmax=2,
+                           interpolation='nearest', aspect='auto',
+                           extent=[dates[0], dates[-1], len(order), 0])
+    fig.colorbar(im, ax=axes[1, 1], label='Beta')
+    axes[1, 1].xaxis_date()
+    axes[1, 1].set_title(f'滾動 Beta（60 日，相對{benchmark_name}）', fontsize=14, fontweight='bold')
+    axes[1, 1].set_xlabel('日期', fontsize=11)
+    axes[1, 1].set_ylabel('股票（依 Beta 由低到高）', fontsize=11)
+    axes[1, 1].set_yticks([])
+    axes[1, 1].tick_params(axis='x', rotation=45)
+
+    plt.tight_layout()
+
+    return fig
+
+def print_statistics(panel):
+    """輸出統計報告（讀取指標面板）"""
     print("\n" + "="*70)
     print("[報告] 台灣股市數據分析報告")
     print("="*70)
 
-    for stock_code, df in stocks_data.items():
-        stock_name = df['Stock_Name'].iloc[0]
+    # 一次算出所有股票的統計量
+    close = panel['Close']
+    first_close = first_valid(close)
+    latest = {field: last_valid(panel[field]) for field in ['Close', 'MA5', 'MA20', 'RSI', 'MACD']}
+    stats = pd.DataFrame({
+        'High': panel['High'].max(),
+        'Low': panel['Low'].min(),
+        'Mean': close.mean(),
+        'Return': (latest['Close'] - first_close) / first_close * 100,
+        'Volatility': close.pct_change(fill_method=None).std() * 100,
+        'AvgVolume': panel['Volume'].mean() / 1000,
+        'MaxVolume': panel['Volume'].max() / 1000,
+    })
+
+    for stock_code in panel.codes:
+        stock_name = panel.name(stock_code)
+        row = stats.loc[stock_code]
 
         print(f"\n【{stock_name}({stock_code})】")
         print("-"*70)
 
         # 價格統計
         print(f"  價格統計：")
-        print(f"    最高價：{df['High'].max():.2f} 元")
-        print(f"    最低價：{df['Low'].min():.2f} 元")
-        print(f"    平均價：{df['Close'].mean():.2f} 元")
-        print(f"    最新價：{df['Close'].iloc[-1]:.2f} 元")
+        print(f"    最高價：{row['High']:.2f} 元")
+        print(f"    最低價：{row['Low']:.2f} 元")
+        print(f"    平均價：{row['Mean']:.2f} 元")
+        print(f"    最新價：{latest['Close'][stock_code]:.2f} 元")
 
         # 報酬率
-        total_return = ((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0]) * 100
-        print(f"\n  報酬率：{total_return:+.2f}%")
+        print(f"\n  報酬率：{row['Return']:+.2f}%")
 
         # 波動率
-        daily_returns = df['Close'].pct_change()
-        volatility = daily_returns.std() * 100
-        print(f"  日波動率：{volatility:.2f}%")
+        print(f"  日波動率：{row['Volatility']:.2f}%")
 
         # 成交量
         print(f"\n  成交量：")
-        print(f"    平均成交量：{df['Volume'].mean()/1000:,.0f} 萬張")
-        print(f"    最大成交量：{df['Volume'].max()/1000:,.0f} 萬張")
+        print(f"    平均成交量：{row['AvgVolume']:,.0f} 萬張")
+        print(f"    最大成交量：{row['MaxVolume']:,.0f} 萬張")
 
         # 技術指標
         print(f"\n  技術指標（最新）：")
-        print(f"    RSI(14)：{df['RSI'].iloc[-1]:.2f}")
-        print(f"    MACD：{df['MACD'].iloc[-1]:.2f}")
+        print(f"    RSI(14)：{latest['RSI'][stock_code]:.2f}")
+        print(f"    MACD：{latest['MACD'][stock_code]:.2f}")
 
         # 趨勢判斷
-        ma5_trend = "上漲" if df['Close'].iloc[-1] > df['MA5'].iloc[-1] else "下跌"
-        ma20_trend = "多頭" if df['MA5'].iloc[-1] > df['MA20'].iloc[-1] else "空頭"
+        ma5_trend = "上漲" if latest['Close'][stock_code] > latest['MA5'][stock_code] else "下跌"
+        ma20_trend = "多頭" if latest['MA5'][stock_code] > latest['MA20'][stock_code] else "空頭"
 
         print(f"\n  趨勢判斷：")
         print(f"    短期趨勢（vs MA5）：{ma5_trend}")
@@ -294,7 +439,7 @@ def print_statistics(stocks_data):
 
     print("\n" + "="*70)
 
-def save_reports(figures, stocks_data):
+def save_reports(figures, panel):
     """儲存報表"""
     print("\n正在儲存報表...")
 
@@ -305,8 +450,8 @@ def save_reports(figures, stocks_data):
     # 儲存 PNG 圖表
     for i, fig in enumerate(figures):
         if i < len(figures) - 1:
-            stock_code = list(stocks_data.keys())[i]
-            stock_name = stocks_data[stock_code]['Stock_Name'].iloc[0]
+            stock_code = panel.codes[i]
+            stock_name = panel.name(stock_code)
             filename = f'{output_dir}/{stock_code}_{stock_name}_分析圖.png'
         else:
             filename = f'{output_dir}/股票比較分析.png'
@@ -322,8 +467,15 @@ def save_reports(figures, stocks_data):
 
     print(f"\n[完成] 所有檔案已儲存至 '{output_dir}' 資料夾")
 
-def main():
-    """主程式"""
+def main(parallel=False, workers=None, use_cache=True):
+    """
+    主程式
+
+    Args:
+        parallel: 是否以多行程平行繪製個股圖表（股票數量多時使用）
+        workers: 平行繪圖的 worker 數量（預設為 CPU 核心數）
+        use_cache: 數據與參數沒變時直接讀取指標快取（cache/indicators）
+    """
     print("\n" + "="*70)
     print("  台灣股市數據分析專案")
     print("="*70)
@@ -338,30 +490,36 @@ def main():
         if df is None:
             return
 
-        # 計算技術指標
-        df = calculate_ma(df)
-        df = calculate_macd(df)
-        df = calculate_rsi(df)
-        df = calculate_bollinger_bands(df)
-
         stocks_data[code] = df
 
-    # 繪製個別股票圖表
-    figures = []
-    for stock_code, df in stocks_data.items():
-        stock_name = df['Stock_Name'].iloc[0]
-        fig = plot_candlestick_with_indicators(df, stock_name, stock_code)
-        figures.append(fig)
+    # 計算技術指標（所有股票一次向量化計算；數據沒變時讀取快取）
+    panel = build_panel(stocks_data)
+    panel = cached_compute_indicators(panel) if use_cache else compute_indicators(panel)
+
+    if parallel:
+        from parallel_render import render_reports_parallel
+
+        # 繪製比較圖、輸出統計報告，再平行繪製並儲存個股圖表
+        fig_compare = compare_stocks(panel)
+        print_statistics(panel)
+        render_reports_parallel(panel, fig_compare, workers=workers)
+    else:
+        # 繪製個別股票圖表
+        figures = []
+        for stock_code in panel.codes:
+            fig = plot_candlestick_with_indicators(panel.ticker(stock_code),
+                                                   panel.name(stock_code), stock_code)
+            figures.append(fig)
 
-    # 繪製比較圖
-    fig_compare = compare_stocks(stocks_data)
-    figures.append(fig_compare)
+        # 繪製比較圖
+        fig_compare = compare_stocks(panel)
+        figures.append(fig_compare)
 
-    # 輸出統計報告
-    print_statistics(stocks_data)
+        # 輸出統計報告
+        print_statistics(panel)
 
-    # 儲存報表
-    save_reports(figures, stocks_data)
+        # 儲存報表
+        save_reports(figures, panel)
 
     # 顯示圖表
     print("\n正在顯示圖表...")
@@ -371,4 +529,4 @@ def main():
     print("\n提示：請檢查 'output' 資料夾查看所有輸出檔案")
 
 if __name__ == "__main__":
-    main()
+    main(parallel='--parallel' in sys.argv, use_cache='--no-cache' not in sys.argv)
@@ -0,0 +1,207 @@
+"""
+欄式 OHLCV 數據倉儲
+===================
+以「股票 / 年份」分區、每個欄位一個 NumPy 檔案（.npy）儲存股價數據：
+
+    data/store/
+        catalog.json              # 股票名稱與各年份分區的筆數
+        2330/2024/Date.npy        # datetime64[D]
+        2330/2024/Open.npy        # float64
+        ...
+        2330/2024/Volume.npy      # int64
+
+讀取時以 memory-map 開啟，只讀取日期範圍內的分區與資料列，
+不必每次重新解析 CSV 與日期字串。
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = 'data/store'
+CATALOG_FILE = 'catalog.json'
+
+COLUMN_TYPES = {
+    'Date': 'datetime64[D]',
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Volume': 'int64',
+}
+VALUE_COLUMNS = [col for col in COLUMN_TYPES if col != 'Date']
+
+
+def load_catalog(root=STORE_DIR):
+    """讀取倉儲目錄（不存在時回傳空 dict）"""
+    path = os.path.join(root, CATALOG_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_catalog(catalog, root=STORE_DIR):
+    """寫入倉儲目錄"""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, CATALOG_FILE), 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def _partition_dir(root, stock_code, year):
+    return os.path.join(root, str(stock_code), str(year))
+
+
+def _read_partition(root, stock_code, year, columns, mmap=True):
+    """以 memory-map 開啟單一分區的欄位"""
+    directory = _partition_dir(root, stock_code, year)
+    mode = 'r' if mmap else None
+    return {col: np.load(os.path.join(directory, f'{col}.npy'), mmap_mode=mode)
+            for col in columns}
+
+
+def write_stock(df, stock_code, stock_name, root=STORE_DIR, catalog=None):
+    """
+    寫入（或合併）單一股票的數據
+
+    已存在的年份分區會與新數據合併，相同日期以新數據為準。
+
+    Args:
+        df: 以 Date 為索引（或含 Date 欄位）的 OHLCV DataFrame
+        stock_code: 股票代碼
+        stock_name: 股票名稱
+        root: 倉儲資料夾
+        catalog: 已載入的目錄（批次寫入時傳入，避免重複讀寫 catalog.json）
+    """
+    if 'Date' in df.columns:
+        df = df.set_index('Date')
+    df = df[VALUE_COLUMNS].copy()
+    df.index = pd.DatetimeIndex(df.index).normalize()
+
+    own_catalog = catalog is None
+    if own_catalog:
+        catalog = load_catalog(root)
+    entry = catalog.setdefault(str(stock_code), {'name': stock_name, 'partitions': {}})
+    entry['name'] = stock_name
+
+    for year, part in df.groupby(df.index.year):
+        year_key = str(year)
+        if year_key in entry['partitions']:
+            old = read_stock(stock_code, start=f'{year}-01-01', end=f'{year}-12-31', root=root,
+                             catalog=catalog)
+            part = pd.concat([old[~old.index.isin(part.index)], part])
+        part = part.sort_index()
+
+        directory = _partition_dir(root, stock_code, year)
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'Date.npy'),
+                part.index.to_numpy().astype(COLUMN_TYPES['Date']))
+        for col in VALUE_COLUMNS:
+            np.save(os.path.join(directory, f'{col}.npy'),
+                    part[col].to_numpy().astype(COLUMN_TYPES[col]))
+        entry['partitions'][year_key] = len(part)
+
+    if own_catalog:
+        save_catalog(catalog, root)
+
+
+def read_stock(stock_code, start=None, end=None, columns=None, tail=None,
+               root=STORE_DIR, catalog=None):
+    """
+    讀取單一股票在日期範圍內的數據
+
+    Args:
+        stock_code: 股票代碼
+        start, end: 起訖日期（含），None 表示不限
+        columns: 要讀取的欄位（預設全部）
+        tail: 只取最後 N 筆（從最新的分區往回讀）
+        root: 倉儲資料夾
+        catalog: 已載入的目錄
+
+    Returns:
+        以 Date 為索引的 DataFrame；股票不存在時回傳 None
+    """
+    if catalog is None:
+        catalog = load_catalog(root)
+    entry = catalog.get(str(stock_code))
+    if entry is None:
+        return None
+
+    columns = list(columns) if columns is not None else VALUE_COLUMNS
+    start = None if start is None else np.datetime64(pd.Timestamp(start).date(), 'D')
+    end = None if end is None else np.datetime64(pd.Timestamp(end).date(), 'D')
+
+    years = sorted(int(y) for y in entry['partitions'])
+    if start is not None:
+        years = [y for y in years if y >= start.astype(object).year]
+    if end is not None:
+        years = [y for y in years if y <= end.astype(object).year]
+    if tail is not None:
+        years = years[::-1]
+
+    pieces = []
+    rows = 0
+    for year in years:
+        part = _read_partition(root, stock_code, year, ['Date'] + columns)
+        dates = part['Date']
+        lo = 0 if start is None else np.searchsorted(dates, start, side='left')
+        hi = len(dates) if end is None else np.searchsorted(dates, end, side='right')
+        if tail is not None:
+            lo = max(lo, hi - (tail - rows))
+        # 只複製需要的資料列，其餘頁面不會從磁碟讀入
+        pieces.append({col: np.array(values[lo:hi]) for col, values in part.items()})
+        rows += hi - lo
+        if tail is not None and rows >= tail:
+            break
+
+    if tail is not None:
+        pieces = pieces[::-1]
+    if not pieces:
+        pieces = [{col: np.array([], dtype=COLUMN_TYPES[col]) for col in ['Date'] + columns}]
+
+    data = {col: np.concatenate([piece[col] for piece in pieces]) for col in ['Date'] + columns}
+    index = pd.DatetimeIndex(data.pop('Date').astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame(data, index=index)
+
+
+def read_many(stock_codes, start=None, end=None, columns=None, tail=None, root=STORE_DIR):
+    """
+    讀取多檔股票（例如「500 檔股票最近 60 天」）
+
+    Returns:
+        {股票代碼: DataFrame}，DataFrame 含 Stock_Code、Stock_Name 欄位
+    """
+    catalog = load_catalog(root)
+    stocks_data = {}
+    for code in stock_codes:
+        df = read_stock(code, start=start, end=end, columns=columns, tail=tail,
+                        root=root, catalog=catalog)
+        if df is None:
+            continue
+        df['Stock_Code'] = code
+        df['Stock_Name'] = catalog[str(code)]['name']
+        stocks_data[code] = df
+    return stocks_data
+
+
+def import_csv_files(data_dir='data', root=STORE_DIR):
+    """將 data/{代碼}_{名稱}.csv 匯入倉儲"""
+    catalog = load_catalog(root)
+    for filename in sorted(os.listdir(data_dir)):
+        stem, ext = os.path.splitext(filename)
+        if ext != '.csv' or '_' not in stem:
+            continue
+        stock_code, stock_name = stem.split('_', 1)
+        if not stock_code.isdigit():
+            continue
+        df = pd.read_csv(os.path.join(data_dir, filename), parse_dates=['Date'])
+        write_stock(df, stock_code, stock_name, root=root, catalog=catalog)
+        print(f"[OK] 已匯入：{filename}（{len(df)} 筆）")
+    save_catalog(catalog, root)
+
+
+if __name__ == "__main__":
+    import_csv_files()
+    print(f"\n[完成] 數據倉儲位於 '{STORE_DIR}'")
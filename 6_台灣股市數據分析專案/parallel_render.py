@@ -0,0 +1,121 @@
+"""
+多行程平行繪製個股分析圖
+========================
+每個 worker 各自建立、儲存一檔股票的 4 格分析圖（300 dpi PNG）。
+
+- 指標面板放在共享記憶體（shared memory），worker 直接以 NumPy 檢視讀取，
+  不必把整個 DataFrame pickle 給每個 worker
+- worker 回傳 pickle 後的 Figure，主程式再依股票順序組合成 PDF（保留向量圖）
+"""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+
+RENDER_FIELDS = ['Open', 'Close', 'Volume', 'MA5', 'MA10', 'MA20', 'BB_Upper', 'BB_Lower',
+                 'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI']
+
+# worker 端的共享數據（由 _init_worker 設定）
+_worker = {}
+
+
+def _init_worker(shm_name, shape, dates, codes, names, days, output_dir, dpi):
+    """worker 初始化：連接共享記憶體，改用不開視窗的 Agg 後端"""
+    plt.switch_backend('Agg')
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker.update(
+        shm=shm,
+        values=np.ndarray(shape, dtype=np.float64, buffer=shm.buf),
+        dates=pd.DatetimeIndex(dates, name='Date'),
+        codes=codes,
+        names=names,
+        days=days,
+        output_dir=output_dir,
+        dpi=dpi,
+    )
+
+
+def _render_stock(j):
+    """繪製第 j 檔股票並儲存 PNG，回傳 (檔名, pickle 後的 Figure)"""
+    from main import plot_candlestick_with_indicators
+
+    values = _worker['values'][:, :, j]
+    close = values[RENDER_FIELDS.index('Close')]
+    rows = np.flatnonzero(~np.isnan(close))[-_worker['days']:]
+
+    # 只複製最近 days 天的數據
+    df = pd.DataFrame(values[:, rows].T, index=_worker['dates'][rows], columns=RENDER_FIELDS)
+
+    code = _worker['codes'][j]
+    name = _worker['names'][code]
+    fig = plot_candlestick_with_indicators(df, name, code)
+
+    filename = f"{_worker['output_dir']}/{code}_{name}_分析圖.png"
+    fig.savefig(filename, dpi=_worker['dpi'], bbox_inches='tight', facecolor='white')
+    data = pickle.dumps(fig)
+    plt.close(fig)
+    return filename, data
+
+
+def render_reports_parallel(panel, fig_compare, workers=None, output_dir='output',
+                            days=60, dpi=300):
+    """
+    平行繪製所有個股圖表，並依序組合 PDF 報表
+
+    Args:
+        panel: 已計算指標的 StockPanel
+        fig_compare: 股票比較圖（由主程式繪製）
+        workers: worker 數量（預設為 CPU 核心數）
+        output_dir: 輸出資料夾
+        days: 個股圖顯示最近幾天
+        dpi: PNG 解析度
+
+    Returns:
+        依序排列的所有 Figure（個股圖 + 比較圖）
+    """
+    print("\n正在平行繪製個股圖表...")
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    shape = (len(RENDER_FIELDS), len(panel.dates), len(panel.codes))
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for i, field in enumerate(RENDER_FIELDS):
+            values[i] = panel.fields[field]
+
+        init_args = (shm.name, shape, panel.dates.asi8, panel.codes, panel.names,
+                     days, output_dir, dpi)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=init_args) as pool:
+            results = list(pool.map(_render_stock, range(len(panel.codes))))
+        del values
+    finally:
+        shm.close()
+        shm.unlink()
+
+    figures = []
+    for filename, data in results:
+        figures.append(pickle.loads(data))
+        print(f"[OK] 已儲存：{filename}")
+
+    filename = f'{output_dir}/股票比較分析.png'
+    fig_compare.savefig(filename, dpi=dpi, bbox_inches='tight', facecolor='white')
+    print(f"[OK] 已儲存：{filename}")
+    figures.append(fig_compare)
+
+    # 依股票順序組合 PDF 報表
+    with PdfPages(f'{output_dir}/台股分析報告.pdf') as pdf:
+        for fig in figures:
+            pdf.savefig(fig, bbox_inches='tight')
+        print(f"[OK] 已儲存：{output_dir}/台股分析報告.pdf")
+
+    print(f"\n[完成] 所有檔案已儲存至 '{output_dir}' 資料夾")
+    return figures
@@ -0,0 +1,227 @@
+"""
+投資組合蒙地卡羅最佳化
+======================
+把追蹤的股票視為一個投資組合：
+
+1. 由 stocks_data 建立年化報酬率向量與共變異數矩陣
+2. 分批抽樣數十萬組權重，每批以矩陣運算一次算出報酬率、波動率與 Sharpe
+3. 描繪效率前緣，找出最大 Sharpe 與最小變異數的配置
+
+每批只保留 (批次大小 × 股票數) 的權重矩陣，股票數很多時記憶體用量仍有上限；
+效率前緣以固定的波動率區間記錄各區間報酬率最高的權重。
+"""
+
+import numpy as np
+import pandas as pd
+
+from cross_section import daily_returns
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.015       # 無風險利率（年化）
+
+
+def return_statistics(stocks_data, periods_per_year=TRADING_DAYS):
+    """
+    年化報酬率與共變異數矩陣
+
+    只使用所有股票都有交易的日期
+
+    Args:
+        stocks_data: {股票代碼: DataFrame}（load_stock_data 的結果）
+        periods_per_year: 每年期數
+
+    Returns:
+        (年化報酬率 Series, 年化共變異數 DataFrame)
+    """
+    close = pd.DataFrame({code: df['Close'] for code, df in stocks_data.items()})
+    returns = daily_returns(close).dropna()
+    return returns.mean() * periods_per_year, returns.cov() * periods_per_year
+
+
+def _portfolio_stats(weights, mean, cov, risk_free):
+    """一批權重（組數 × 股票數）的報酬率、波動率、Sharpe"""
+    ret = weights @ mean
+    vol = np.sqrt(np.einsum('ij,ij->i', weights @ cov, weights))
+    return ret, vol, (ret - risk_free) / vol
+
+
+def sample_portfolios(mean, cov, n_portfolios=300_000, chunk_size=50_000,
+                      risk_free=RISK_FREE_RATE, concentration=1.0, frontier_bins=200, seed=42):
+    """
+    分批抽樣隨機權重並描繪效率前緣
+
+    Args:
+        mean: 年化報酬率 Series
+        cov: 年化共變異數 DataFrame
+        n_portfolios: 抽樣組數
+        chunk_size: 每批組數（權重矩陣大小 = chunk_size × 股票數）
+        risk_free: 無風險利率
+        concentration: Dirichlet 參數；< 1 時權重較集中在少數股票，
+                       股票數多時較容易抽到前緣附近的組合
+        frontier_bins: 效率前緣的波動率區間數
+        seed: 亂數種子
+
+    Returns:
+        dict：codes、returns / volatility / sharpe（每組一個值，float32）、
+        max_sharpe / min_variance（權重 Series 與績效）、frontier（DataFrame）
+    """
+    codes = list(mean.index)
+    mu = mean.to_numpy(dtype=float)
+    sigma = cov.loc[codes, codes].to_numpy(dtype=float)
+    rng = np.random.default_rng(seed)
+
+    # 任何組合的波動率都不超過個股的最大波動率，區間邊界可以事先決定
+    edges = np.linspace(0, np.sqrt(sigma.diagonal().max()), frontier_bins + 1)
+    bin_return = np.full(frontier_bins, -np.inf)
+    bin_weights = np.zeros((frontier_bins, len(codes)))
+
+    returns = np.empty(n_portfolios, dtype=np.float32)
+    volatility = np.empty(n_portfolios, dtype=np.float32)
+    sharpe = np.empty(n_portfolios, dtype=np.float32)
+    best = {'max_sharpe': (-np.inf, None), 'min_variance': (np.inf, None)}
+
+    for start in range(0, n_portfolios, chunk_size):
+        n = min(chunk_size, n_portfolios - start)
+
+        # Gamma 抽樣後正規化 = Dirichlet 分布，權重皆 >= 0 且總和為 1
+        weights = rng.standard_gamma(concentration, size=(n, len(codes)))
+        weights /= weights.sum(axis=1, keepdims=True)
+        ret, vol, shp = _portfolio_stats(weights, mu, sigma, risk_free)
+        returns[start:start + n] = ret
+        volatility[start:start + n] = vol
+        sharpe[start:start + n] = shp
+
+        i = int(np.argmax(shp))
+        if shp[i] > best['max_sharpe'][0]:
+            best['max_sharpe'] = (shp[i], weights[i].copy())
+        i = int(np.argmin(vol))
+        if vol[i] < best['min_variance'][0]:
+            best['min_variance'] = (vol[i], weights[i].copy())
+
+        # 每個波動率區間保留報酬率最高的組合
+        bins = np.clip(np.searchsorted(edges, vol, side='right') - 1, 0, frontier_bins - 1)
+        order = np.lexsort((ret, bins))
+        last = np.flatnonzero(np.append(bins[order][1:] != bins[order][:-1], True))
+        top = order[last]
+        better = ret[top] > bin_return[bins[top]]
+        bin_return[bins[top][better]] = ret[top][better]
+        bin_weights[bins[top][better]] = weights[top][better]
+
+    result = {'codes': codes, 'returns': returns, 'volatility': volatility, 'sharpe': sharpe}
+    for key, (_, weights) in best.items():
+        ret, vol, shp = _portfolio_stats(weights[None, :], mu, sigma, risk_free)
+        result[key] = {'weights': pd.Series(weights, index=codes), 'return': float(ret[0]),
+                       'volatility': float(vol[0]), 'sharpe': float(shp[0])}
+    result['frontier'] = _efficient_frontier(bin_weights[np.isfinite(bin_return)],
+                                             mu, sigma, codes, risk_free)
+    return result
+
+
+def _efficient_frontier(weights, mu, sigma, codes, risk_free):
+    """由各區間最佳組合取出效率前緣：波動率遞增時報酬率也必須創新高"""
+    ret, vol, shp = _portfolio_stats(weights, mu, sigma, risk_free)
+    order = np.argsort(vol)
+    ret, vol, shp, weights = ret[order], vol[order], shp[order], weights[order]
+
+    previous_max = np.maximum.accumulate(np.concatenate([[-np.inf], ret[:-1]]))
+    keep = ret > previous_max
+    frontier = pd.DataFrame(weights[keep], columns=codes)
+    frontier.insert(0, 'Sharpe', shp[keep])
+    frontier.insert(0, 'Return', ret[keep])
+    frontier.insert(0, 'Volatility', vol[keep])
+    return frontier
+
+
+def optimize_portfolio(stocks_data, **kwargs):
+    """由 stocks_data 直接執行最佳化（參數見 sample_portfolios）"""
+    mean, cov = return_statistics(stocks_data)
+    result = sample_portfolios(mean, cov, **kwargs)
+    result['names'] = {code: df['Stock_Name'].iloc[0] for code, df in stocks_data.items()}
+    return result
+
+
+def print_allocation(result):
+    """輸出最大 Sharpe 與最小變異數配置"""
+    names = result.get('names', {})
+    titles = {'max_sharpe': '最大 Sharpe 配置', 'min_variance': '最小變異數配置'}
+    for key, title in titles.items():
+        best = result[key]
+        print(f"\n【{title}】")
+        print("-"*70)
+        for code, weight in best['weights'].items():
+            print(f"  {names.get(code, code)}({code})：{weight * 100:6.2f}%")
+        print(f"  預期年化報酬率：{best['return'] * 100:+.2f}%")
+        print(f"  年化波動率：{best['volatility'] * 100:.2f}%")
+        print(f"  Sharpe：{best['sharpe']:.2f}")
+
+
+def plot_efficient_frontier(result, max_points=20_000, seed=0):
+    """
+    繪製隨機組合散佈圖、效率前緣與兩種最佳配置
+
+    Args:
+        result: sample_portfolios / optimize_portfolio 的結果
+        max_points: 散佈圖最多顯示的組合數（隨機抽取）
+        seed: 抽取散佈點的亂數種子
+    """
+    import matplotlib.pyplot as plt
+
+    n = len(result['returns'])
+    idx = np.random.default_rng(seed).choice(n, size=min(n, max_points), replace=False)
+    names = result.get('names', {})
+    labels = [f'{names.get(code, code)}({code})' for code in result['codes']]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7), gridspec_kw={'width_ratios': [3, 2]})
+
+    points = ax1.scatter(result['volatility'][idx] * 100, result['returns'][idx] * 100,
+                         c=result['sharpe'][idx], cmap='viridis', s=4, alpha=0.5)
+    fig.colorbar(points, ax=ax1, label='Sharpe')
+    frontier = result['frontier']
+    ax1.plot(frontier['Volatility'] * 100, frontier['Return'] * 100, color='#FF6B6B',
+             linewidth=2.5, label='效率前緣')
+    for key, marker, label in [('max_sharpe', '*', '最大 Sharpe'), ('min_variance', 'D', '最小變異數')]:
+        best = result[key]
+        ax1.scatter(best['volatility'] * 100, best['return'] * 100, marker=marker, s=250,
+                    color='#FF6B6B' if key == 'max_sharpe' else '#45B7D1',
+                    edgecolors='black', zorder=5, label=label)
+    ax1.set_title(f'效率前緣（{n:,} 組隨機權重）', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('年化波動率 (%)', fontsize=12)
+    ax1.set_ylabel('預期年化報酬率 (%)', fontsize=12)
+    ax1.legend(fontsize=10)
+    ax1.grid(True, alpha=0.3)
+
+    y = np.arange(len(labels))
+    ax2.barh(y - 0.2, result['max_sharpe']['weights'] * 100, height=0.4,
+             color='#FF6B6B', label='最大 Sharpe')
+    ax2.barh(y + 0.2, result['min_variance']['weights'] * 100, height=0.4,
+             color='#45B7D1', label='最小變異數')
+    ax2.set_yticks(y)
+    ax2.set_yticklabels(labels)
+    ax2.invert_yaxis()
+    ax2.set_title('配置權重', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('權重 (%)', fontsize=12)
+    ax2.legend(fontsize=10)
+    ax2.grid(True, alpha=0.3, axis='x')
+
+    plt.tight_layout()
+    return fig
+
+
+if __name__ == "__main__":
+    import os
+    import main
+
+    stocks_data = {}
+    for code in ['2330', '2317', '2454']:
+        df = main.load_stock_data(code)
+        if df is None:
+            raise SystemExit(1)
+        stocks_data[code] = df
+
+    result = optimize_portfolio(stocks_data)
+    print_allocation(result)
+
+    fig = plot_efficient_frontier(result)
+    os.makedirs('output', exist_ok=True)
+    fig.savefig('output/投資組合效率前緣.png', dpi=300, bbox_inches='tight', facecolor='white')
+    print("\n[OK] 已儲存：output/投資組合效率前緣.png")
@@ -0,0 +1,218 @@
+"""
+選股篩選器
+==========
+以「每檔股票最新指標值」的快照表回答篩選條件，例如：
+
+    RSI < 30 and Close > MA20 and Volume > 2×Avg_Volume
+
+常用欄位預先建立排序索引：「欄位 與 常數 比較」的條件以二分搜尋直接取得
+符合的股票，其餘條件只在候選股票上計算，不必重新掃描每檔股票的歷史數據。
+
+使用方式：python screener.py "RSI < 30 and Close > MA20"
+"""
+
+import operator
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import last_valid
+
+SNAPSHOT_FILE = 'output/指標快照.csv'
+
+SNAPSHOT_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume', 'MA5', 'MA10', 'MA20',
+                   'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI',
+                   'BB_Upper', 'BB_Middle', 'BB_Lower']
+INDEXED_FIELDS = ['Close', 'Volume', 'Avg_Volume', 'Change', 'RSI', 'MACD', 'MACD_Hist',
+                  'MA5', 'MA20']
+
+OPERATORS = {
+    '<=': operator.le,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+}
+
+_CONDITION = re.compile(r'^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(.+?)\s*$')
+_NUMBER = r'[-+]?\d+(?:\.\d+)?'
+_SCALED = re.compile(rf'^(?:({_NUMBER})\s*[*×]\s*(\w+)|(\w+)\s*[*×]\s*({_NUMBER}))$')
+
+
+def build_snapshot(panel, volume_window=20):
+    """
+    建立最新指標快照表
+
+    Args:
+        panel: 已計算指標的 StockPanel
+        volume_window: 平均成交量的天數
+
+    Returns:
+        DataFrame（索引為股票代碼）：Name、SNAPSHOT_FIELDS、Avg_Volume、Change（日漲跌 %）
+    """
+    snapshot = pd.DataFrame({field: last_valid(panel[field])
+                             for field in SNAPSHOT_FIELDS if field in panel})
+    snapshot.insert(0, 'Name', pd.Series(panel.names).reindex(panel.codes))
+    snapshot['Avg_Volume'] = last_valid(panel['Volume'].rolling(volume_window).mean())
+
+    close = panel['Close']
+    snapshot['Change'] = last_valid(close.pct_change(fill_method=None) * 100)
+    snapshot.index.name = 'Stock_Code'
+    return snapshot
+
+
+class Screener:
+    """
+    快照表上的篩選器
+
+    Args:
+        snapshot: build_snapshot() 的結果
+        indexed_fields: 建立排序索引的欄位
+    """
+
+    def __init__(self, snapshot, indexed_fields=INDEXED_FIELDS):
+        self.snapshot = snapshot
+        self.columns = {col: snapshot[col].to_numpy(dtype=float)
+                        for col in snapshot.columns if col != 'Name'}
+
+        # 排序索引：只收錄非缺值，(排序後的值, 對應的列位置)
+        self.indexes = {}
+        for field in indexed_fields:
+            if field not in self.columns:
+                continue
+            values = self.columns[field]
+            rows = np.flatnonzero(~np.isnan(values))
+            order = rows[np.argsort(values[rows], kind='stable')]
+            self.indexes[field] = (values[order], order)
+
+    @classmethod
+    def from_panel(cls, panel, **kwargs):
+        """由指標面板直接建立"""
+        return cls(build_snapshot(panel, **kwargs))
+
+    def _field(self, name):
+        if name not in self.columns:
+            raise ValueError(f"未知的欄位：{name}（可用欄位：{', '.join(self.columns)}）")
+        return name
+
+    def _parse(self, text):
+        """解析單一條件為 (欄位, 運算子, 常數 或 (係數, 欄位))"""
+        match = _CONDITION.match(text)
+        if match is None:
+            raise ValueError(f"無法解析的條件：{text}")
+        field, op, rhs = match.groups()
+        field = self._field(field)
+
+        if re.fullmatch(_NUMBER, rhs):
+            return field, op, float(rhs)
+        scaled = _SCALED.match(rhs)
+        if scaled:
+            coef, other, other_rev, coef_rev = scaled.groups()
+            if other is None:
+                coef, other = coef_rev, other_rev
+            return field, op, (float(coef), self._field(other))
+        return field, op, (1.0, self._field(rhs))
+
+    def _range(self, field, op, value):
+        """以排序索引取得「欄位 op 常數」成立的列位置"""
+        sorted_values, order = self.indexes[field]
+        if op == '<':
+            return order[:np.searchsorted(sorted_values, value, side='left')]
+        if op == '<=':
+            return order[:np.searchsorted(sorted_values, value, side='right')]
+        if op == '>':
+            return order[np.searchsorted(sorted_values, value, side='right'):]
+        if op == '>=':
+            return order[np.searchsorted(sorted_values, value, side='left'):]
+        lo = np.searchsorted(sorted_values, value, side='left')
+        hi = np.searchsorted(sorted_values, value, side='right')
+        return order[lo:hi]
+
+    def query(self, expression):
+        """
+        執行篩選
+
+        Args:
+            expression: 以 and 連接的條件，每個條件為
+                        「欄位 運算子 常數」或「欄位 運算子 [係數×]欄位」
+
+        Returns:
+            符合條件的快照列（依股票代碼原順序）
+        """
+        parts = re.split(r'\s+(?:and|AND)\s+|\s*&\s*', expression.strip())
+        conditions = [self._parse(part) for part in parts if part]
+
+        # 先用排序索引處理「欄位 與 常數」的條件，候選集合越來越小
+        candidates = None
+        remaining = []
+        for field, op, rhs in conditions:
+            if isinstance(rhs, float) and field in self.indexes and op != '!=':
+                rows = np.sort(self._range(field, op, rhs))
+                candidates = rows if candidates is None else \
+                    np.intersect1d(candidates, rows, assume_unique=True)
+            else:
+                remaining.append((field, op, rhs))
+
+        if candidates is None:
+            candidates = np.arange(len(self.snapshot))
+
+        # 其餘條件只在候選列上計算
+        for field, op, rhs in remaining:
+            if not len(candidates):
+                break
+            left = self.columns[field][candidates]
+            if isinstance(rhs, float):
+                right = rhs
+            else:
+                coef, other = rhs
+                right = coef * self.columns[other][candidates]
+            candidates = candidates[OPERATORS[op](left, right)]
+
+        return self.snapshot.iloc[candidates]
+
+    def save(self, path=SNAPSHOT_FILE):
+        """將快照表存成 CSV"""
+        self.snapshot.to_csv(path, encoding='utf-8-sig')
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_FILE, **kwargs):
+        """從 CSV 載入快照表"""
+        snapshot = pd.read_csv(path, dtype={'Stock_Code': str}, index_col='Stock_Code')
+        return cls(snapshot, **kwargs)
+
+
+if __name__ == "__main__":
+    import os
+    from main import load_stock_data
+    from indicator_engine import build_panel, compute_indicators
+
+    stocks_data = {}
+    for code in ['2330', '2317', '2454']:
+        df = load_stock_data(code)
+        if df is None:
+            sys.exit(1)
+        stocks_data[code] = df
+
+    screener = Screener.from_panel(compute_indicators(build_panel(stocks_data)))
+    os.makedirs('output', exist_ok=True)
+    screener.save()
+    print(f"[OK] 已儲存：{SNAPSHOT_FILE}")
+
+    queries = sys.argv[1:] or [
+        'RSI < 30 and Close > MA20',
+        'RSI > 50 and Close > MA20',
+        'MACD_Hist > 0 and Volume > 1.2×Avg_Volume',
+        'Close > BB_Upper',
+    ]
+    for expression in queries:
+        start = time.perf_counter()
+        result = screener.query(expression)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n篩選：{expression}（{len(result)} 檔，{elapsed:.2f} ms）")
+        if len(result):
+            print(result[['Name', 'Close', 'MA20', 'RSI', 'MACD_Hist', 'Volume', 'Avg_Volume']]
+                  .to_string(float_format=lambda x: f'{x:,.2f}'))
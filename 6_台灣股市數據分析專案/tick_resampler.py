@@ -0,0 +1,156 @@
+"""
+逐筆成交資料轉 K 棒
+===================
+分段（chunk）讀取逐筆成交 CSV，彙總成每檔股票的 OHLCV K 棒
+（1 分、5 分、日 K 皆可），記憶體用量只與 chunk 大小和股票數有關。
+
+逐筆成交 CSV 欄位：
+
+    Timestamp,Stock_Code,Price,Volume
+    2024-12-16 09:00:00.125,2330,1085.0,12
+
+輸出的 DataFrame 以 Date 為索引、含 Open / High / Low / Close / Volume /
+Stock_Code / Stock_Name，可直接交給 main.py 的 calculate_* 函式或
+indicator_engine.build_panel 使用。
+
+使用方式：python tick_resampler.py ticks.csv 5min
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+TICK_DTYPES = {'Stock_Code': str, 'Price': 'float64', 'Volume': 'int64'}
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+BAR_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def _ticks_to_bars(chunk, freq):
+    """將一段逐筆成交彙總成 (股票代碼, K 棒時間) 為索引的 OHLCV"""
+    chunk = chunk.assign(Date=pd.to_datetime(chunk['Timestamp']).dt.floor(freq))
+    return chunk.groupby(['Stock_Code', 'Date'], sort=True).agg(
+        Open=('Price', 'first'),
+        High=('Price', 'max'),
+        Low=('Price', 'min'),
+        Close=('Price', 'last'),
+        Volume=('Volume', 'sum'),
+    )
+
+
+def resample_ticks(path, freq='1min', chunksize=1_000_000):
+    """
+    分段讀取逐筆成交並產生已完成的 K 棒
+
+    每檔股票在每個 chunk 的最後一根 K 棒可能還沒結束，會保留到下一個
+    chunk 再合併，因此每檔股票的逐筆成交需依時間排序（不同股票可交錯）。
+
+    Args:
+        path: 逐筆成交 CSV 路徑
+        freq: K 棒週期，例如 '1min'、'5min'、'1D'
+        chunksize: 每次讀取的筆數
+
+    Yields:
+        以 (Stock_Code, Date) 為索引的 OHLCV DataFrame
+    """
+    pending = None
+    reader = pd.read_csv(path, chunksize=chunksize, dtype=TICK_DTYPES,
+                         usecols=['Timestamp', 'Stock_Code', 'Price', 'Volume'])
+
+    for chunk in reader:
+        bars = _ticks_to_bars(chunk, freq)
+
+        # 與上一段尚未完成的 K 棒合併（pending 在前，Open 取 pending、Close 取新數據）
+        if pending is not None:
+            bars = pd.concat([pending, bars]).groupby(level=[0, 1], sort=True).agg(BAR_AGG)
+
+        # 每檔股票最後一根 K 棒保留到下一段
+        codes = bars.index.get_level_values(0)
+        dates = bars.index.get_level_values(1)
+        last_date = pd.Series(dates, index=codes).groupby(level=0).transform('max').to_numpy()
+        is_open = dates.to_numpy() == last_date
+
+        pending = bars[is_open]
+        if (~is_open).any():
+            yield bars[~is_open]
+
+    if pending is not None and len(pending):
+        yield pending
+
+
+def _split_by_stock(bars, names):
+    """將 (股票代碼, 日期) 索引的 K 棒拆成 {股票代碼: DataFrame}"""
+    stocks_data = {}
+    for code, df in bars.groupby(level=0, sort=False):
+        df = df.droplevel(0)
+        df['Volume'] = df['Volume'].astype('int64')
+        df['Stock_Code'] = code
+        df['Stock_Name'] = names.get(code, code)
+        stocks_data[code] = df
+    return stocks_data
+
+
+def _stock_names():
+    """從數據倉儲目錄取得股票名稱"""
+    from ohlcv_store import load_catalog
+    return {code: entry['name'] for code, entry in load_catalog().items()}
+
+
+def load_bars(path, freq='1min', chunksize=1_000_000, names=None):
+    """
+    讀取逐筆成交並轉成 {股票代碼: K 棒 DataFrame}
+
+    K 棒數量遠少於逐筆成交，因此只保留 K 棒結果在記憶體中
+
+    Args:
+        path: 逐筆成交 CSV 路徑
+        freq: K 棒週期
+        chunksize: 每次讀取的筆數
+        names: {股票代碼: 股票名稱}，預設從數據倉儲目錄讀取
+    """
+    names = _stock_names() if names is None else names
+    bars = pd.concat(list(resample_ticks(path, freq, chunksize))).sort_index()
+    return _split_by_stock(bars, names)
+
+
+def resample_to_csv(path, output_path, freq='1min', chunksize=1_000_000):
+    """
+    逐筆成交轉 K 棒後直接分段寫入 CSV（K 棒也不全部留在記憶體）
+
+    輸出欄位：Date,Stock_Code,Open,High,Low,Close,Volume
+    """
+    directory = os.path.dirname(output_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    rows = 0
+    header = True
+    for bars in resample_ticks(path, freq, chunksize):
+        out = bars.reset_index()[['Date', 'Stock_Code'] + BAR_COLUMNS]
+        out.to_csv(output_path, mode='w' if header else 'a', header=header,
+                   index=False, encoding='utf-8-sig' if header else 'utf-8')
+        header = False
+        rows += len(out)
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("使用方式：python tick_resampler.py 逐筆成交.csv [K棒週期，預設 1min]")
+        sys.exit(1)
+
+    from main import calculate_bollinger_bands, calculate_ma, calculate_macd, calculate_rsi
+
+    freq = sys.argv[2] if len(sys.argv) > 2 else '1min'
+    stocks_data = load_bars(sys.argv[1], freq)
+
+    for code, df in stocks_data.items():
+        df = calculate_ma(df)
+        df = calculate_macd(df)
+        df = calculate_rsi(df)
+        df = calculate_bollinger_bands(df)
+
+        print(f"\n【{df['Stock_Name'].iloc[0]}({code})】{freq} K 棒 {len(df)} 根")
+        print(f"  時間範圍：{df.index[0]} 至 {df.index[-1]}")
+        print(f"  最新收盤：{df['Close'].iloc[-1]:.2f}  RSI(14)：{df['RSI'].iloc[-1]:.2f}  "
+              f"MACD：{df['MACD'].iloc[-1]:.2f}")